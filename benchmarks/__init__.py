@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Performance benchmarks. Run all suites with ``python -m benchmarks`` or one
+with ``python -m benchmarks.<name>``; results are saved as JSON under
+``benchmarks/results/`` and compared with ``python -m benchmarks.compare``.
+"""
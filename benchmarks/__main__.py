@@ -0,0 +1,32 @@
+# benchmarks/__main__.py
+"""
+Run every benchmark suite and save the results to one file.
+
+    python -m benchmarks --quick
+    python -m benchmarks --suites metrics prompt --output baseline.json
+"""
+import argparse
+from . import end_to_end, event_loop_bridge, metrics, prompt, serialization
+from .results import add_common_arguments, save_results
+
+SUITES = {
+    'metrics': metrics,
+    'prompt': prompt,
+    'serialization': serialization,
+    'end_to_end': end_to_end,
+    'event_loop': event_loop_bridge
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    add_common_arguments(parser)
+    parser.add_argument('--suites', nargs='+', choices=list(SUITES), default=list(SUITES))
+    for module in SUITES.values():
+        module.add_arguments(parser)
+    args = parser.parse_args()
+
+    suites = [SUITES[name].run(args) for name in args.suites]
+    print(f"\nResults saved to {save_results(suites, args.output)}")
+
+if __name__ == "__main__":
+    main()
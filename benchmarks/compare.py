@@ -0,0 +1,60 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files and flag regressions.
+
+Cases are matched by suite, name and parameters. A case regresses when its
+median grew by more than ``--threshold`` (relative) and by more than
+``--min-delta`` milliseconds, so sub-microsecond noise is not reported. The
+exit status is 1 when anything regressed, for use as a pre-deploy check.
+
+    python -m benchmarks.compare baseline.json benchmarks/results/all-20240514-100000.json
+"""
+from typing import List, Tuple
+import argparse
+import sys
+from .results import load_cases
+
+def compare(
+    baseline_path: str,
+    current_path: str,
+    threshold: float,
+    min_delta: float,
+    statistic: str = 'median_ms'
+) -> Tuple[List[Tuple[str, float, float]], List[str]]:
+    """Return (key, baseline, current) of regressed cases and keys missing from the current run."""
+    baseline = load_cases(baseline_path)
+    current = load_cases(current_path)
+    regressions = []
+    for key, case in current.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key][statistic], case[statistic]
+        if after > before * (1 + threshold) and after - before > min_delta:
+            regressions.append((key, before, after))
+    missing = [key for key in baseline if key not in current]
+    return regressions, missing
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative slowdown that counts as a regression")
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help="milliseconds a case must slow down by to count")
+    parser.add_argument('--statistic', default='median_ms', choices=['median_ms', 'mean_ms', 'p95_ms', 'min_ms'])
+    args = parser.parse_args()
+
+    regressions, missing = compare(
+        args.baseline, args.current, args.threshold, args.min_delta, args.statistic
+    )
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: {before:.3f} ms -> {after:.3f} ms ({(after / before - 1) * 100:+.1f}%)")
+    for key in missing:
+        print(f"missing    {key}")
+    if not regressions:
+        print("No regressions")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/end_to_end.py
+"""
+End-to-end CodeAnalyzer.analyze_commit against the local stub servers.
+
+The GitHub and OpenAI stubs run on their own event loop with the configured
+latencies; the analyzer is wired exactly as the dashboard wires it, against a
+fresh cache directory, and called through the dashboard's background loop.
+Cases: analyses of new commits one at a time, several new commits at once,
+and repeat requests answered from the result store. Request counts per
+analysis are recorded next to the timings.
+
+    python -m benchmarks.end_to_end --github-latency 0.05 --openai-latency 0.5
+"""
+from typing import Dict
+import argparse
+import asyncio
+import itertools
+import tempfile
+from aiohttp import web
+from src.config.settings import Settings
+from src.testing.github_stub import create_github_stub_app, history_sha
+from src.testing.openai_stub import create_openai_stub_app
+from src.ui.dashboard import Dashboard
+from src.utils.event_loop import BackgroundEventLoop
+from .results import Suite, run_module
+
+# Commits analyzed together in the concurrent case
+CONCURRENT_COMMITS = 8
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--github-latency', type=float, default=0.05,
+                        help="seconds the GitHub stub waits per request")
+    parser.add_argument('--openai-latency', type=float, default=0.5,
+                        help="seconds the OpenAI stub waits per completion")
+    parser.add_argument('--files', type=int, default=4, help="changed files per commit")
+    parser.add_argument('--lines', type=int, default=200, help="lines per changed file")
+    parser.add_argument('--github-port', type=int, default=8097)
+    parser.add_argument('--openai-port', type=int, default=8098)
+
+async def _start(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+def _request_counts(github_app: web.Application, openai_app: web.Application) -> Dict[str, int]:
+    return {
+        'github_requests': github_app['state']['requests'],
+        'openai_requests': openai_app['state']['requests']
+    }
+
+def run(args: argparse.Namespace) -> Suite:
+    suite = Suite('end_to_end', args.repeat, args.budget)
+    params = {
+        'github_latency': args.github_latency,
+        'openai_latency': args.openai_latency,
+        'files': args.files,
+        'lines': args.lines
+    }
+    github_app = create_github_stub_app(args.github_latency, args.files, args.lines)
+    openai_app = create_openai_stub_app(latency=args.openai_latency)
+    servers = BackgroundEventLoop('benchmark-stubs')
+    runners = [
+        servers.run(_start(github_app, args.github_port)),
+        servers.run(_start(openai_app, args.openai_port))
+    ]
+    commits = (history_sha(index) for index in itertools.count())
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings = Settings(
+            github_token='benchmark',
+            repository_name='benchmark/repo',
+            github_api_url=f"http://127.0.0.1:{args.github_port}",
+            github_commits_backend='rest',
+            github_requests_per_hour=10 ** 9,
+            github_burst_size=10 ** 6,
+            openai_api_key='benchmark',
+            openai_base_url=f"http://127.0.0.1:{args.openai_port}/v1",
+            openai_requests_per_minute=10 ** 9,
+            openai_tokens_per_minute=10 ** 12,
+            cache_dir=cache_dir,
+            _env_file=None
+        )
+        dashboard = Dashboard(settings, warm_up=False)
+        analyzer = dashboard.analyzer
+        bridge = dashboard.event_loop
+
+        def measured(name: str, fn, commits_per_call: int = 1, **extra_params) -> None:
+            calls = 0
+
+            def counted():
+                nonlocal calls
+                calls += 1
+                fn()
+
+            before = _request_counts(github_app, openai_app)
+            case = suite.time(name, counted, **params, **extra_params)
+            after = _request_counts(github_app, openai_app)
+            # Per analyzed commit, warm-up included since it does the same work
+            case.extra = {
+                key: round((after[key] - before[key]) / (calls * commits_per_call), 2)
+                for key in after
+            }
+
+        try:
+            measured('analyze_commit', lambda: bridge.run(analyzer.analyze_commit(next(commits))))
+
+            async def analyze_many():
+                await asyncio.gather(*(
+                    analyzer.analyze_commit(next(commits)) for _ in range(CONCURRENT_COMMITS)
+                ))
+            measured(
+                'analyze_commits_concurrent',
+                lambda: bridge.run(analyze_many()),
+                commits_per_call=CONCURRENT_COMMITS,
+                commits=CONCURRENT_COMMITS
+            )
+
+            stored = next(commits)
+            bridge.run(analyzer.analyze_commit(stored))
+            measured('analyze_commit_stored', lambda: bridge.run(analyzer.analyze_commit(stored)))
+        finally:
+            bridge.run(dashboard.github_service.close())
+            bridge.run(dashboard.openai_service.close())
+            bridge.stop()
+            dashboard.analysis_store.close()
+            for runner in runners:
+                servers.run(runner.cleanup())
+            servers.stop()
+    return suite
+
+def main() -> None:
+    run_module(__doc__.split('\n\n')[0].strip(), add_arguments, run)
+
+if __name__ == "__main__":
+    main()
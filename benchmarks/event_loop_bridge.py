@@ -0,0 +1,68 @@
+# benchmarks/event_loop_bridge.py
+"""
+Per-callback overhead of running async service code from sync Dash callbacks.
+
+Compares a fresh ``asyncio.run()`` per callback, which also needs a new HTTP
+session each time, with dispatching to a shared BackgroundEventLoop whose
+GitHubClient keeps its connection pool. Requests go to the local OpenAI stub's
+``/stats`` route, so the numbers are dominated by bridge and connection cost
+rather than network latency.
+
+    python -m benchmarks.event_loop_bridge --repeat 500
+"""
+import argparse
+import asyncio
+from aiohttp import web
+from src.api.github_client import GitHubClient
+from src.testing.openai_stub import create_openai_stub_app
+from src.utils.event_loop import BackgroundEventLoop
+from .results import Suite, run_module
+
+async def _noop() -> None:
+    return None
+
+async def _start_server(port: int) -> web.AppRunner:
+    runner = web.AppRunner(create_openai_stub_app(latency=0))
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--port', type=int, default=8091)
+
+def run(args: argparse.Namespace) -> Suite:
+    suite = Suite('event_loop', args.repeat, args.budget)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    server_loop = BackgroundEventLoop('stub-server')
+    runner = server_loop.run(_start_server(args.port))
+    bridge = BackgroundEventLoop('benchmark-bridge')
+    shared_client = GitHubClient('benchmark', base_url=base_url)
+
+    async def fresh_request() -> object:
+        client = GitHubClient('benchmark', base_url=base_url)
+        try:
+            return await client.request('GET', 'stats')
+        finally:
+            await client.close()
+
+    try:
+        suite.time('noop_asyncio_run', lambda: asyncio.run(_noop()))
+        suite.time('noop_background_loop', lambda: bridge.run(_noop()))
+        suite.time('http_asyncio_run_new_pool', lambda: asyncio.run(fresh_request()))
+        suite.time(
+            'http_background_loop_shared_pool',
+            lambda: bridge.run(shared_client.request('GET', 'stats'))
+        )
+    finally:
+        bridge.run(shared_client.close())
+        bridge.stop()
+        server_loop.run(runner.cleanup())
+        server_loop.stop()
+    return suite
+
+def main() -> None:
+    run_module(__doc__.split('\n\n')[0].strip(), add_arguments, run)
+
+if __name__ == "__main__":
+    main()
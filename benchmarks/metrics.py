@@ -0,0 +1,70 @@
+# benchmarks/metrics.py
+"""
+MetricsCalculator cost per metric, language and diff size.
+
+Each metric method is timed on the post-image of a synthetic patch, then the
+whole ``calculate_metrics`` pipeline on the patch alone, with both file
+versions attached (as FileContentResolver provides them), and with a clone
+index. Sizes are lines per file.
+
+    python -m benchmarks.metrics --quick
+"""
+from typing import Dict
+import argparse
+import asyncio
+import os
+import tempfile
+from src.analysis.clone_index import CloneIndex
+from src.analysis.metric_engine import patch_post_image
+from src.analysis.metrics_calculator import MetricsCalculator
+from src.testing.synthetic import LANGUAGES, make_change
+from .results import Suite, run_module
+
+SIZES = (10, 100, 1000, 10000, 50000)
+QUICK_SIZES = (10, 100, 1000)
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--languages', nargs='+', choices=LANGUAGES, default=list(LANGUAGES))
+
+def run(args: argparse.Namespace) -> Suite:
+    suite = Suite('metrics', args.repeat, args.budget)
+    calculator = MetricsCalculator()
+    loop = asyncio.new_event_loop()
+    with tempfile.TemporaryDirectory() as work_dir:
+        indexed = MetricsCalculator(
+            clone_index=CloneIndex(os.path.join(work_dir, 'clones.sqlite3'))
+        )
+        try:
+            for lines in (QUICK_SIZES if args.quick else SIZES):
+                for language in args.languages:
+                    change = make_change(language, lines)
+                    code = patch_post_image(change.patch)
+                    params: Dict = {'language': language, 'lines': lines}
+
+                    suite.time('complexity', lambda: calculator._calculate_complexity(code), **params)
+                    suite.time('maintainability', lambda: calculator._calculate_maintainability(code), **params)
+                    suite.time('duplication', lambda: calculator._find_duplications(code), **params)
+                    suite.time('line_count', lambda: calculator._count_lines(code), **params)
+                    suite.time('comment_ratio', lambda: calculator._calculate_comment_ratio(code), **params)
+
+                    patch_only = [change.as_change()]
+                    with_contents = [change.as_change(with_contents=True)]
+                    suite.time('calculate_metrics', lambda: loop.run_until_complete(
+                        calculator.calculate_metrics(patch_only)
+                    ), **params)
+                    suite.time('calculate_metrics_contents', lambda: loop.run_until_complete(
+                        calculator.calculate_metrics(with_contents)
+                    ), **params)
+                    suite.time('calculate_metrics_clone_index', lambda: loop.run_until_complete(
+                        indexed.calculate_metrics(with_contents)
+                    ), **params)
+        finally:
+            indexed.clone_index.close()
+            loop.close()
+    return suite
+
+def main() -> None:
+    run_module(__doc__.split('\n\n')[0].strip(), add_arguments, run)
+
+if __name__ == "__main__":
+    main()
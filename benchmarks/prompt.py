@@ -0,0 +1,53 @@
+# benchmarks/prompt.py
+"""
+Prompt construction cost by diff size.
+
+Times ``OpenAIService._create_analysis_prompt`` on commits whose changes add
+up to the given number of patch lines, spread over files of at most
+``FILE_LINES`` lines in rotating languages. No requests are sent.
+
+    python -m benchmarks.prompt
+"""
+import argparse
+from src.api.openai_service import OpenAIService
+from src.config.settings import Settings
+from src.testing.synthetic import LANGUAGES, make_change
+from .results import Suite, run_module
+
+SIZES = (10, 100, 1000, 10000, 50000)
+QUICK_SIZES = (10, 100, 1000)
+FILE_LINES = 1000
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    pass
+
+def run(args: argparse.Namespace) -> Suite:
+    suite = Suite('prompt', args.repeat, args.budget)
+    service = OpenAIService(Settings(
+        github_token='benchmark',
+        repository_name='benchmark/repo',
+        openai_api_key='benchmark',
+        _env_file=None
+    ))
+    for lines in (QUICK_SIZES if args.quick else SIZES):
+        changes = [
+            make_change(
+                LANGUAGES[index % len(LANGUAGES)],
+                min(FILE_LINES, lines - start),
+                seed=index
+            ).as_change()
+            for index, start in enumerate(range(0, lines, FILE_LINES))
+        ]
+        suite.time(
+            'create_analysis_prompt',
+            lambda: service._create_analysis_prompt(changes),
+            lines=lines,
+            files=len(changes)
+        )
+    return suite
+
+def main() -> None:
+    run_module(__doc__.split('\n\n')[0].strip(), add_arguments, run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/results.py
+"""
+Timing helpers and the JSON result format shared by the benchmark modules.
+
+A results file holds metadata about the run (time, git revision, Python,
+platform) and one entry per case: suite, case name, parameters and summary
+statistics in milliseconds. Cases are matched across files by suite, name and
+parameters, which is what ``python -m benchmarks.compare`` relies on.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Samples per case unless the time budget runs out first
+DEFAULT_REPEAT = 7
+# Seconds spent on one case before it stops at MIN_SAMPLES
+DEFAULT_BUDGET = 3.0
+MIN_SAMPLES = 3
+# Calls faster than this are repeated within a sample and averaged
+MIN_SAMPLE_SECONDS = 0.01
+MAX_NUMBER = 100000
+
+@dataclass
+class Case:
+    suite: str
+    name: str
+    params: Dict[str, Any]
+    samples_ms: List[float]
+    # Counters recorded alongside the timings, e.g. requests per analysis
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.suite}/{self.name}{json.dumps(self.params, sort_keys=True)}"
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples_ms)
+        return {
+            'n': len(ordered),
+            'mean_ms': statistics.mean(ordered),
+            'median_ms': statistics.median(ordered),
+            'p95_ms': ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)],
+            'min_ms': ordered[0],
+            'stdev_ms': statistics.stdev(ordered) if len(ordered) > 1 else 0.0
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'suite': self.suite,
+            'name': self.name,
+            'params': self.params,
+            **self.summary(),
+            'extra': self.extra,
+            'samples_ms': self.samples_ms
+        }
+
+class Suite:
+    """Collects the cases of one benchmark module and prints each as it finishes."""
+
+    def __init__(self, name: str, repeat: int = DEFAULT_REPEAT, budget: float = DEFAULT_BUDGET):
+        self.name = name
+        self.repeat = repeat
+        self.budget = budget
+        self.cases: List[Case] = []
+
+    def add(self, name: str, samples_ms: List[float], extra: Optional[Dict] = None, **params: Any) -> Case:
+        case = Case(self.name, name, params, samples_ms, extra or {})
+        self.cases.append(case)
+        summary = case.summary()
+        described = ' '.join(f"{key}={value}" for key, value in params.items())
+        print(
+            f"{self.name:<14} {name:<34} {described:<34} "
+            f"median {summary['median_ms']:10.3f} ms   p95 {summary['p95_ms']:10.3f} ms   n={summary['n']}"
+        )
+        return case
+
+    def _should_continue(self, samples: List[float], started: float) -> bool:
+        if len(samples) >= self.repeat:
+            return False
+        return len(samples) < MIN_SAMPLES or time.perf_counter() - started < self.budget
+
+    def time(self, name: str, fn: Callable[[], Any], warmup: int = 1, **params: Any) -> Case:
+        """Time repeated calls of fn; fast calls are looped so each sample spans MIN_SAMPLE_SECONDS."""
+        call_seconds = 0.0
+        for _ in range(warmup):
+            call_started = time.perf_counter()
+            fn()
+            call_seconds = time.perf_counter() - call_started
+        number = max(1, min(MAX_NUMBER, int(MIN_SAMPLE_SECONDS / max(call_seconds, 1e-9))))
+        samples: List[float] = []
+        started = time.perf_counter()
+        while self._should_continue(samples, started):
+            call_started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - call_started) * 1000 / number)
+        return self.add(name, samples, **params)
+
+    async def time_async(
+        self, name: str, fn: Callable[[], Awaitable[Any]], warmup: int = 1, **params: Any
+    ) -> Case:
+        """Time repeated awaits of fn() on the running loop."""
+        for _ in range(warmup):
+            await fn()
+        samples: List[float] = []
+        started = time.perf_counter()
+        while self._should_continue(samples, started):
+            call_started = time.perf_counter()
+            await fn()
+            samples.append((time.perf_counter() - call_started) * 1000)
+        return self.add(name, samples, **params)
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_metadata() -> Dict[str, Any]:
+    return {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def save_results(suites: List[Suite], path: Optional[str] = None) -> str:
+    """Write the suites' cases as JSON and return the file path."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        label = suites[0].name if len(suites) == 1 else 'all'
+        path = os.path.join(RESULTS_DIR, f"{label}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    results = {
+        'meta': run_metadata(),
+        'cases': [case.to_dict() for suite in suites for case in suite.cases]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1)
+    return path
+
+def load_cases(path: str) -> Dict[str, Dict]:
+    """Cases of a results file by key."""
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    return {
+        Case(case['suite'], case['name'], case['params'], []).key: case
+        for case in results['cases']
+    }
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--quick', action='store_true',
+                        help="skip the largest inputs, for a fast smoke run")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="samples per case")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help="seconds per case before stopping at the minimum sample count")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<suite>-<time>.json)")
+
+def run_module(
+    description: str,
+    add_arguments: Callable[[argparse.ArgumentParser], None],
+    run: Callable[[argparse.Namespace], Suite]
+) -> None:
+    """Command-line entry point of a single benchmark module."""
+    parser = argparse.ArgumentParser(description=description)
+    add_common_arguments(parser)
+    add_arguments(parser)
+    args = parser.parse_args()
+    suite = run(args)
+    print(f"\nResults saved to {save_results([suite], args.output)}")
@@ -0,0 +1,83 @@
+# benchmarks/serialization.py
+"""
+AnalysisResult serialization cost by number of findings.
+
+Times ``to_dict``, ``from_dict`` and the JSON round trip behind the result
+store, then a put/get through AnalysisStore itself, for results with the
+given number of issues (and as many security concerns and recommendations).
+
+    python -m benchmarks.serialization
+"""
+from datetime import datetime
+import argparse
+import json
+import os
+import tempfile
+from src.models.analysis_result import AnalysisResult, CodeIssue, SecurityConcern
+from src.storage.analysis_store import AnalysisStore
+from .results import Suite, run_module
+
+SIZES = (0, 10, 100, 1000)
+QUICK_SIZES = (0, 10, 100)
+
+def make_result(findings: int, index: int = 0) -> AnalysisResult:
+    return AnalysisResult(
+        commit_sha=f"{index:040x}",
+        quality_score=7.5,
+        issues=[
+            CodeIssue('style', 'low', f"Issue {n}: variable name shadows a builtin")
+            for n in range(findings)
+        ],
+        security_concerns=[
+            SecurityConcern('medium', f"Concern {n}: unvalidated input reaches a query")
+            for n in range(findings)
+        ],
+        performance_impact='minimal',
+        recommendations=[f"Recommendation {n}: extract a helper" for n in range(findings)],
+        analyzed_at=datetime(2024, 5, 14, 10, 0),
+        metrics={
+            'avg_complexity': 3.2,
+            'maintainability_index': 71.5,
+            'duplication_percentage': 4.0,
+            'total_lines': 1200,
+            'avg_comment_ratio': 0.12,
+            'complexity_delta': 2,
+            'halstead_volume': 5400.0
+        },
+        committed_at=datetime(2024, 5, 14, 8, 2)
+    )
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    pass
+
+def run(args: argparse.Namespace) -> Suite:
+    suite = Suite('serialization', args.repeat, args.budget)
+    with tempfile.TemporaryDirectory() as work_dir:
+        store = AnalysisStore(os.path.join(work_dir, 'analyses.sqlite3'))
+        try:
+            for findings in (QUICK_SIZES if args.quick else SIZES):
+                result = make_result(findings)
+                data = result.to_dict()
+                text = json.dumps(data)
+                suite.time('to_dict', result.to_dict, findings=findings)
+                suite.time('from_dict', lambda: AnalysisResult.from_dict(data), findings=findings)
+                suite.time('json_dumps', lambda: json.dumps(result.to_dict()), findings=findings)
+                suite.time(
+                    'json_loads',
+                    lambda: AnalysisResult.from_dict(json.loads(text)),
+                    findings=findings
+                )
+
+                def store_round_trip():
+                    store.put(result, 'benchmark', '1')
+                    return store.get(result.commit_sha, 'benchmark', '1')
+                suite.time('store_put_get', store_round_trip, findings=findings)
+        finally:
+            store.close()
+    return suite
+
+def main() -> None:
+    run_module(__doc__.split('\n\n')[0].strip(), add_arguments, run)
+
+if __name__ == "__main__":
+    main()
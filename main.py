@@ -1,18 +1,25 @@
 from github import Github
 from openai import OpenAI
-import json
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 from dash import Dash, html, dcc, Input, Output, State
 import plotly.graph_objects as go
 import time
+from concurrent.futures import ThreadPoolExecutor
 from tenacity import retry, stop_after_attempt, wait_exponential
+from src.api.prompt_chunker import merge_analyses, pack_changes
+from src.api.response_parser import RESPONSE_SCHEMA, ResponseParser
+
+# Changes beyond this are split across several requests
+MAX_PROMPT_TOKENS = 3000
+MAX_PARALLEL_CHUNKS = 4
 
 class GitAnalyzer:
    def __init__(self, github_token: str, openai_key: str):
        self.github = Github(github_token)
        self.ai = OpenAI(api_key=openai_key)
+       self.parser = ResponseParser()
        self.repo = self.github.get_repo("InfiniteJas/docintel")
 
    def get_commit_list(self):
@@ -24,33 +31,57 @@ class GitAnalyzer:
        print(f"\nAnalyzing commit {commit.sha[:7]}...")
        
        changes = [
-           {'file': f.filename, 'patch': f.patch[:500]}
+           {'filename': f.filename, 'patch': f.patch}
            for f in commit.files 
            if f.patch and f.filename.endswith(('.py', '.js', '.ts', '.java'))
-       ][:3]
+       ]
 
        print(f"Found {len(changes)} code files to analyze")
        if not changes:
            return {"issues": [], "score": 0, "recommendations": []}
 
+       chunks = pack_changes(changes, MAX_PROMPT_TOKENS)
+       print(f"Analyzing {len(chunks)} chunk(s)...")
+       with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHUNKS, len(chunks))) as pool:
+           partials = [
+               (partial, chunk.tokens)
+               for partial, chunk in zip(pool.map(self.analyze_chunk, chunks), chunks)
+               if partial is not None
+           ]
+
+       if not partials:
+           return {"issues": [], "score": 0, "recommendations": []}
+       print(f"Analysis complete! Parse stats: {self.parser.stats.as_dict()}")
+       merged = merge_analyses(partials)
+       return {
+           "issues": merged['issues'],
+           "score": round(merged['quality_score'] or 0, 1),
+           "recommendations": merged['recommendations']
+       }
+
+   def analyze_chunk(self, chunk):
        try:
-           print("Attempting analysis...")
            response = self.ai.chat.completions.create(
                model="gpt-3.5-turbo",
                messages=[{
                    "role": "system",
-                   "content": "You are a code review expert."
+                   "content": "You are a code review expert. Respond with only a JSON "
+                              f"object of this form:\n{RESPONSE_SCHEMA}"
                }, {
                    "role": "user",
-                   "content": f"Changes:\n{json.dumps(changes)}"
+                   "content": f"Changes:\n{chunk.text}"
                }],
-               temperature=0.3
+               temperature=0.3,
+               response_format={"type": "json_object"}
            )
-           print("Analysis complete!")
-           return json.loads(response.choices[0].message.content)
+           # Malformed JSON is repaired here rather than by asking again
+           analysis = self.parser.parse(response.choices[0].message.content)
+           if 'unparseable' in analysis.repairs:
+               return None
+           return analysis.to_dict()
        except Exception as e:
-           print(f"Analysis failed: {e}")
-           return {"issues": [], "score": 0, "recommendations": []}
+           print(f"Analysis of {', '.join(chunk.filenames)} failed: {e}")
+           return None
 
 class Dashboard:
    def __init__(self):
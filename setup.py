@@ -13,9 +13,11 @@ setup(
         'pydantic>=2.5.2',
         'pydantic-settings>=2.1.0',
         'pandas>=2.1.3',
+        'numpy>=1.26.0',
         'plotly>=5.18.0',
         'asyncio>=3.4.3',
         'aiohttp>=3.9.1',
+        'httpx>=0.25.2',
         'tenacity>=8.2.3',
         'loguru>=0.7.2'
     ],
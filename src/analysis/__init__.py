@@ -2,7 +2,28 @@
 """
 Code analysis and metrics calculation modules.
 """
-from .code_analyzer import CodeAnalyzer
-from .metrics_calculator import MetricsCalculator
+from importlib import import_module
 
-__all__ = ['CodeAnalyzer', 'MetricsCalculator']
\ No newline at end of file
+# Loaded on first access, so metric helpers can be imported (e.g. by worker
+# processes) without the analyzer's service dependencies
+_EXPORTS = {
+    'CodeAnalyzer': '.code_analyzer',
+    'MetricsCalculator': '.metrics_calculator',
+    'DuplicationDetector': '.duplication',
+    'CloneIndex': '.clone_index',
+    'CloneMatch': '.clone_index',
+    'FileContentResolver': '.file_contents',
+    'PromptContextBuilder': '.prompt_context',
+    'ContextStats': '.prompt_context',
+    'BatchBackfill': '.backfill',
+    'BackfillReport': '.backfill',
+    'AnalysisJobQueue': '.job_queue',
+    'AnalysisJob': '.job_queue'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
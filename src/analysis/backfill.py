@@ -0,0 +1,207 @@
+# src/analysis/backfill.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+from ..api.openai_batch import OpenAIBatchClient
+from ..utils.logging import get_logger
+from .code_analyzer import CodeAnalyzer
+
+logger = get_logger(__name__)
+
+@dataclass
+class BackfillReport:
+    requested: int = 0
+    skipped: int = 0
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+
+class BatchBackfill:
+    """Analyze commit history offline through batch jobs.
+
+    Commits are prepared (changes fetched, metrics computed) and their
+    prompts written as JSONL batch files, which are submitted and polled
+    until done; results are then loaded into the analysis store. Progress is
+    kept in a manifest under cache_dir, keyed by commit SHA, so an
+    interrupted backfill picks up its submitted batches and only prepares
+    commits that are neither stored nor in flight.
+    """
+
+    def __init__(
+        self,
+        analyzer: CodeAnalyzer,
+        batch_client: OpenAIBatchClient,
+        work_dir: str,
+        batch_size: int = 500,
+        poll_seconds: float = 60.0,
+        prepare_concurrency: int = 8
+    ):
+        if analyzer.result_store is None:
+            raise ValueError("Backfill needs an analyzer with a result store")
+        self.analyzer = analyzer
+        self.batch_client = batch_client
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.prepare_concurrency = prepare_concurrency
+        # Separate directories per model and analysis version
+        settings = analyzer.openai_service.settings
+        run_key = hashlib.sha256(
+            f"{settings.repository_name}:{settings.openai_model}:{analyzer.analysis_version}".encode('utf-8')
+        ).hexdigest()[:12]
+        self.work_dir = os.path.join(work_dir, run_key)
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.work_dir, 'manifest.json')
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'batches': {}, 'failed': {}, 'next_file': 1}
+
+    def _save_manifest(self) -> None:
+        # Write then rename, so an interrupted save keeps the previous manifest
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(temp_path, self.manifest_path)
+
+    async def run(self, commit_shas: List[str]) -> BackfillReport:
+        """Analyze every commit without a stored result and wait for the batches."""
+        report = BackfillReport(requested=len(commit_shas))
+        store = self.analyzer.result_store
+        if len(commit_shas) > store.max_entries:
+            logger.warning(
+                f"Backfilling {len(commit_shas)} commits into a store capped at "
+                f"{store.max_entries} entries; raise analysis_cache_max_entries to keep them all"
+            )
+
+        in_flight = {
+            sha for batch in self.manifest['batches'].values() for sha in batch['shas']
+        }
+        pending = []
+        for sha in commit_shas:
+            if sha in in_flight or self.analyzer.has_stored_result(sha):
+                report.skipped += 1
+            else:
+                pending.append(sha)
+        logger.info(
+            f"Backfill: {len(pending)} commits to prepare, "
+            f"{len(self.manifest['batches'])} batches already submitted"
+        )
+
+        try:
+            for start in range(0, len(pending), self.batch_size):
+                report.submitted += await self._submit(pending[start:start + self.batch_size], report)
+
+            results = await asyncio.gather(*(
+                self._collect(batch_id) for batch_id in list(self.manifest['batches'])
+            ))
+            for completed, failed in results:
+                report.completed += completed
+                report.failed += failed
+        finally:
+            self._save_manifest()
+        logger.info(f"Backfill finished: {vars(report)}")
+        return report
+
+    async def _submit(self, shas: List[str], report: BackfillReport) -> int:
+        """Prepare commits and submit them as one batch; returns how many were submitted."""
+        semaphore = asyncio.Semaphore(self.prepare_concurrency)
+
+        async def prepare(sha: str) -> Tuple[str, Optional[Tuple]]:
+            async with semaphore:
+                try:
+                    return sha, await self.analyzer.prepare_batch(sha)
+                except Exception as e:
+                    logger.error(f"Error preparing commit {sha} for backfill: {str(e)}")
+                    self.manifest['failed'][sha] = str(e)
+                    return sha, None
+
+        lines = []
+        commits = {}
+        for sha, prepared in await asyncio.gather(*(prepare(sha) for sha in shas)):
+            if prepared is None:
+                report.failed += 1
+                continue
+            requests, metrics, committed_at = prepared
+            if not requests:
+                # Nothing for the model to review
+                self.analyzer.complete_batch(sha, [], metrics, committed_at)
+                report.completed += 1
+                continue
+            commits[sha] = {
+                'metrics': metrics,
+                'chunks': [tokens for _, tokens in requests],
+                'committed_at': committed_at.isoformat() if committed_at else None
+            }
+            for index, (body, _) in enumerate(requests):
+                lines.append({
+                    'custom_id': f"{sha}:{index}",
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': body
+                })
+            self.manifest['failed'].pop(sha, None)
+        if not commits:
+            return 0
+
+        name = f"batch-{self.manifest['next_file']:05d}"
+        self.manifest['next_file'] += 1
+        with open(os.path.join(self.work_dir, f"{name}.jsonl"), 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(line) + '\n' for line in lines)
+        with open(os.path.join(self.work_dir, f"{name}.commits.json"), 'w', encoding='utf-8') as f:
+            json.dump(commits, f)
+
+        file_id = await self.batch_client.upload_requests(lines, f"{name}.jsonl")
+        batch = await self.batch_client.create_batch(file_id, metadata={'backfill': name})
+        self.manifest['batches'][batch['id']] = {'name': name, 'shas': list(commits)}
+        self._save_manifest()
+        logger.info(f"Submitted {name} as {batch['id']}: {len(commits)} commits, {len(lines)} requests")
+        return len(commits)
+
+    async def _collect(self, batch_id: str) -> Tuple[int, int]:
+        """Wait for a batch and store its results; returns completed and failed commit counts."""
+        entry = self.manifest['batches'][batch_id]
+        batch = await self.batch_client.wait_for_batch(batch_id, self.poll_seconds)
+
+        responses: Dict[str, Dict[int, str]] = {}
+        if batch['status'] == 'completed' and batch.get('output_file_id'):
+            for line in await self.batch_client.download_results(batch['output_file_id']):
+                response = line.get('response') or {}
+                if response.get('status_code') != 200:
+                    continue
+                sha, index = line['custom_id'].rsplit(':', 1)
+                content = response['body']['choices'][0]['message']['content']
+                responses.setdefault(sha, {})[int(index)] = content
+        else:
+            logger.error(f"Batch {batch_id} ({entry['name']}) ended as {batch['status']}")
+
+        with open(os.path.join(self.work_dir, f"{entry['name']}.commits.json"), encoding='utf-8') as f:
+            commits = json.load(f)
+        completed = failed = 0
+        for sha in entry['shas']:
+            chunks = commits[sha]['chunks']
+            received = responses.get(sha, {})
+            if len(received) < len(chunks):
+                # Left for the next run to resubmit
+                self.manifest['failed'][sha] = f"{len(chunks) - len(received)} requests failed in {batch_id}"
+                failed += 1
+                continue
+            committed_at = commits[sha].get('committed_at')
+            self.analyzer.complete_batch(
+                sha,
+                [(received[index], tokens) for index, tokens in enumerate(chunks)],
+                commits[sha]['metrics'],
+                datetime.fromisoformat(committed_at) if committed_at else None
+            )
+            completed += 1
+
+        del self.manifest['batches'][batch_id]
+        self._save_manifest()
+        logger.info(f"Loaded {entry['name']}: {completed} commits stored, {failed} failed")
+        return completed, failed
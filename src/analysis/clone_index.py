@@ -0,0 +1,271 @@
+# src/analysis/clone_index.py
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from .duplication import normalize_line, window_hashes, HASH_MOD
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (post-image line number, text)
+NumberedLine = Tuple[int, str]
+
+@dataclass
+class CloneMatch:
+    filename: str
+    hunk_start: int
+    hunk_end: int
+    path: str
+    start_line: int
+    end_line: int
+
+    def describe(self) -> str:
+        return (
+            f"{self.filename} lines {self.hunk_start}-{self.hunk_end} duplicate "
+            f"lines {self.start_line}-{self.end_line} of {self.path}"
+        )
+
+def _stable_hash(text: str) -> int:
+    # Python's hash() is salted per process, so persisted fingerprints need a stable one
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % HASH_MOD
+
+class CloneIndex:
+    """Persistent winnowing index of code fingerprints across files and commits.
+
+    Each file is reduced to k-grams of `min_block_lines` consecutive non-blank
+    normalized lines; winnowing keeps the minimum k-gram hash of every window
+    of `winnow_window` k-grams, which guarantees that any shared run of at
+    least min_block_lines + winnow_window - 1 lines is found. Fingerprints are
+    stored per path, so re-indexing a file replaces only its own rows.
+
+    Each path remembers the date of the commit it was indexed from. Older
+    commits never replace newer rows, patch fragments never replace a whole
+    file of the same commit, and deleted files leave a marker so history
+    cannot bring them back.
+    """
+
+    # Bump when stored rows must be rebuilt
+    SCHEMA_VERSION = 2
+    # Hashes per lookup query; SQLite caps bound parameters at 999 before 3.32
+    QUERY_BATCH = 500
+
+    def __init__(self, path: str, min_block_lines: int = 4, winnow_window: int = 4):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.min_block_lines = min_block_lines
+        self.winnow_window = winnow_window
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            # Older indexes did not record commit dates, so their rows may be stale
+            self._conn.execute("DROP TABLE IF EXISTS fingerprints")
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprints (
+                hash INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                start_line INTEGER NOT NULL,
+                end_line INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fp_hash ON fingerprints (hash)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fp_path ON fingerprints (path)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                ref TEXT,
+                committed_at REAL,
+                complete INTEGER NOT NULL,
+                removed INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def fingerprint(self, lines: Sequence[NumberedLine]) -> List[Tuple[int, int, int]]:
+        """Return winnowed (hash, start_line, end_line) fingerprints of a line run."""
+        numbered = [
+            (line_no, normalized)
+            for line_no, normalized in (
+                (line_no, normalize_line(text)) for line_no, text in lines
+            )
+            if normalized
+        ]
+        k = self.min_block_lines
+        grams = window_hashes([_stable_hash(text) for _, text in numbered], k)
+        if not grams:
+            return []
+
+        selected = {}
+        window = min(self.winnow_window, len(grams))
+        for start in range(len(grams) - window + 1):
+            # Rightmost minimum, as in the winnowing paper
+            best = start
+            for i in range(start + 1, start + window):
+                if grams[i] <= grams[best]:
+                    best = i
+            selected[best] = grams[best]
+
+        return [
+            (gram_hash, numbered[i][0], numbered[i + k - 1][0])
+            for i, gram_hash in sorted(selected.items())
+        ]
+
+    def _supersedes(self, path: str, committed_at: Optional[float], complete: bool) -> bool:
+        """Whether a version of path from a commit at committed_at may replace the indexed one."""
+        row = self._conn.execute(
+            "SELECT committed_at, complete FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return True
+        indexed_at, indexed_complete = row
+        # An undated version is older than any dated one
+        if committed_at is None and indexed_at is not None:
+            return False
+        if indexed_at is None and committed_at is not None:
+            return True
+        if committed_at != indexed_at:
+            return committed_at > indexed_at
+        # Same commit: fragments of the patch do not replace the whole file
+        return complete or not indexed_complete
+
+    def index_segments(
+        self,
+        path: str,
+        segments: Iterable[Sequence[NumberedLine]],
+        ref: Optional[str] = None,
+        committed_at: Optional[float] = None,
+        complete: bool = False
+    ) -> int:
+        """Replace the fingerprints of a file with those of the given line runs.
+
+        Segments are fingerprinted separately so k-grams never span the gap
+        between two diff hunks. Nothing changes if the index already holds a
+        newer version of the file; returns the number of fingerprints stored.
+        """
+        rows = [
+            (gram_hash, path, start, end)
+            for segment in segments
+            for gram_hash, start, end in self.fingerprint(segment)
+        ]
+        with self._lock:
+            if not self._supersedes(path, committed_at, complete):
+                return 0
+            self._conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+            self._conn.executemany(
+                "INSERT INTO fingerprints (hash, path, start_line, end_line) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, ref, committed_at, complete, removed, indexed_at) "
+                "VALUES (?, ?, ?, ?, 0, ?)",
+                (path, ref, committed_at, int(complete), time.time())
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def index_file(
+        self,
+        path: str,
+        content: str,
+        ref: Optional[str] = None,
+        committed_at: Optional[float] = None
+    ) -> int:
+        """Index the complete content of a file."""
+        lines = list(enumerate(content.split('\n'), start=1))
+        return self.index_segments(path, [lines], ref, committed_at, complete=True)
+
+    def remove_file(self, path: str, committed_at: Optional[float] = None) -> None:
+        """Drop a file deleted by a commit, unless a newer version is indexed."""
+        with self._lock:
+            if not self._supersedes(path, committed_at, complete=True):
+                return
+            self._conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, ref, committed_at, complete, removed, indexed_at) "
+                "VALUES (?, NULL, ?, 1, 1, ?)",
+                (path, committed_at, time.time())
+            )
+            self._conn.commit()
+
+    def find_clones(
+        self,
+        filename: str,
+        lines: Sequence[NumberedLine],
+        exclude_path: Optional[str] = None
+    ) -> List[CloneMatch]:
+        """Report indexed code that the given line run duplicates."""
+        fingerprints = self.fingerprint(lines)
+        if not fingerprints:
+            return []
+        by_hash: Dict[int, List[Tuple[int, int]]] = {}
+        for gram_hash, start, end in fingerprints:
+            by_hash.setdefault(gram_hash, []).append((start, end))
+
+        hashes = list(by_hash)
+        rows = []
+        with self._lock:
+            for i in range(0, len(hashes), self.QUERY_BATCH):
+                batch = hashes[i:i + self.QUERY_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows.extend(self._conn.execute(
+                    f"SELECT hash, path, start_line, end_line FROM fingerprints "
+                    f"WHERE hash IN ({placeholders})",
+                    batch
+                ).fetchall())
+
+        hits: Dict[str, List[Tuple[int, int, int, int]]] = {}
+        for gram_hash, path, start, end in rows:
+            if path == exclude_path:
+                continue
+            for hunk_start, hunk_end in by_hash[gram_hash]:
+                hits.setdefault(path, []).append((hunk_start, hunk_end, start, end))
+
+        return [
+            match
+            for path, path_hits in hits.items()
+            for match in self._merge_hits(filename, path, path_hits)
+        ]
+
+    @staticmethod
+    def _merge_hits(
+        filename: str,
+        path: str,
+        hits: List[Tuple[int, int, int, int]]
+    ) -> List[CloneMatch]:
+        """Merge overlapping fingerprint hits into contiguous line ranges."""
+        merged: List[CloneMatch] = []
+        for hunk_start, hunk_end, start, end in sorted(hits):
+            last = merged[-1] if merged else None
+            if (
+                last is not None
+                and hunk_start <= last.hunk_end + 1
+                and last.start_line <= start <= last.end_line + 1
+            ):
+                last.hunk_end = max(last.hunk_end, hunk_end)
+                last.end_line = max(last.end_line, end)
+            else:
+                merged.append(CloneMatch(filename, hunk_start, hunk_end, path, start, end))
+        return merged
+
+    def stats(self) -> Dict:
+        """Return the number of indexed files and fingerprints."""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files WHERE removed = 0").fetchone()[0]
+            fingerprints = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+        return {'files': files, 'fingerprints': fingerprints}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,59 +1,368 @@
 # src/analysis/code_analyzer.py
-from typing import List, Dict
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, List, Dict, Optional, Tuple, TypeVar
+import asyncio
 from ..models.analysis_result import AnalysisResult, CodeIssue, SecurityConcern
 from ..api.github_service import GitHubService
 from ..api.openai_service import OpenAIService
+from ..api.response_parser import parse_concern, parse_issue, parse_recommendation
+from ..storage.analysis_store import AnalysisStore
+from .file_contents import FileContentResolver
+from .prompt_context import PromptContextBuilder
 from ..utils.logging import get_logger
+from ..utils.single_flight import SingleFlight
+from ..utils.telemetry import Telemetry, get_telemetry
 from .metrics_calculator import MetricsCalculator
 
+if TYPE_CHECKING:
+    # Imported for annotations only; the trend store loads numpy
+    from ..storage.trend_store import TrendStore
+
 logger = get_logger(__name__)
 
+T = TypeVar('T')
+
+class _PartialResults:
+    """Latest partial result of a streamed analysis, for callers following it."""
+
+    def __init__(self):
+        self.latest: Optional[AnalysisResult] = None
+        self.changed = asyncio.Event()
+
+    def publish(self, result: AnalysisResult) -> None:
+        self.latest = result
+        # Wake the current waiters; later ones wait on a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
 class CodeAnalyzer:
+    MAX_CLONE_RECOMMENDATIONS = 5
+
     def __init__(
         self,
         github_service: GitHubService,
         openai_service: OpenAIService,
-        metrics_calculator: MetricsCalculator
+        metrics_calculator: MetricsCalculator,
+        result_store: Optional[AnalysisStore] = None,
+        content_resolver: Optional[FileContentResolver] = None,
+        context_builder: Optional[PromptContextBuilder] = None,
+        trend_store: Optional['TrendStore'] = None,
+        telemetry: Optional[Telemetry] = None
     ):
         self.github_service = github_service
         self.openai_service = openai_service
         self.metrics_calculator = metrics_calculator
+        self.result_store = result_store
+        self.content_resolver = content_resolver
+        self.context_builder = context_builder
+        self.trend_store = trend_store
+        self.telemetry = telemetry or get_telemetry()
+        # Concurrent requests for the same commit share one analysis
+        self._flights = SingleFlight('analyses')
+        # Partial results of streamed analyses in flight, by the same key
+        self._streams: Dict[Tuple[str, str], _PartialResults] = {}
+
+    @property
+    def analysis_version(self) -> str:
+        """Fingerprint of everything that shapes an analysis besides the model."""
+        version = (
+            f"prompt-{self.openai_service.prompt_fingerprint}"
+            f":metrics-{self.metrics_calculator.VERSION}"
+        )
+        if self.context_builder is not None:
+            version += f":context-{self.context_builder.fingerprint}"
+        return version
+
+    def coalescing_stats(self) -> Dict:
+        """Return how many analyses were shared with an identical one in flight."""
+        return self._flights.stats()
+
+    async def analyze_commit(self, commit_sha: str, update_index: bool = True) -> AnalysisResult:
+        """Perform comprehensive analysis of a commit, using the result store when available.
+
+        Calls for a commit that is already being analyzed wait for that analysis.
+        Historical analyses pass update_index=False to leave the clone index alone.
+        """
+        version = self.analysis_version
+        # Includes time spent waiting on a coalesced analysis
+        with self.telemetry.span('analyze_commit'):
+            return await self._flights.run(
+                (commit_sha, version),
+                lambda: self._analyze_or_load(commit_sha, version, update_index)
+            )
+
+    async def _timed(self, stage: str, awaitable: Awaitable[T]) -> T:
+        with self.telemetry.span(stage):
+            return await awaitable
+
+    async def _analyze_or_load(
+        self, commit_sha: str, version: str, update_index: bool = True
+    ) -> AnalysisResult:
+        if self.result_store is None:
+            result = await self._run_analysis(commit_sha, update_index)
+            self._save(result)
+            return result
+            
+        model = self.openai_service.settings.openai_model
+        with self.telemetry.span('load_stored'):
+            cached = self.result_store.get(commit_sha, model, version)
+        if cached is not None:
+            logger.info(f"Using cached analysis for commit {commit_sha}")
+            self._track_cached(cached)
+            return cached
+            
+        result = await self._run_analysis(commit_sha, update_index)
+        self._save(result)
+        return result
+
+    def _save(self, result: AnalysisResult) -> None:
+        """Store a finished analysis and add it to the trend series."""
+        with self.telemetry.span('save'):
+            if self.result_store is not None:
+                self.result_store.put(result, self.openai_service.settings.openai_model, self.analysis_version)
+            if self.trend_store is not None:
+                self.trend_store.append(result)
+
+    def _track_cached(self, result: AnalysisResult) -> None:
+        """Add a stored analysis to the trend series if it is missing there."""
+        if self.trend_store is not None and not self.trend_store.contains(result.commit_sha):
+            self.trend_store.append(result)
+
+    async def stream_commit(
+        self, commit_sha: str, update_index: bool = True
+    ) -> AsyncIterator[AnalysisResult]:
+        """Analyze a commit, yielding a partial result whenever the model reports a finding.
+
+        Partial results carry the AI findings received so far and a score of 0.
+        The last result yielded is the complete one, which is also stored.
+        Streams share the in-flight analysis of analyze_commit(): a caller
+        that joins a streamed analysis gets its latest partial result and
+        follows it from there, and one that joins a plain analysis gets
+        only the final result. As in analyze_commit(), update_index=False
+        leaves the clone index alone.
+        """
+        model = self.openai_service.settings.openai_model
+        version = self.analysis_version
+        if self.result_store is not None:
+            with self.telemetry.span('load_stored'):
+                cached = self.result_store.get(commit_sha, model, version)
+            if cached is not None:
+                logger.info(f"Using cached analysis for commit {commit_sha}")
+                self._track_cached(cached)
+                yield cached
+                return
+
+        key = (commit_sha, version)
+        stream = self._streams.get(key)
+        if stream is None:
+            # Only fed if this call starts the analysis, not if it joins a plain one
+            stream = self._streams[key] = _PartialResults()
+        flight = self._flights.start(
+            key, lambda: self._publish_stream(key, stream, commit_sha, update_index)
+        )
+        flight.add_done_callback(lambda _: self._drop_stream(key, stream))
+
+        # The flight is shared, so a follower that goes away leaves it running
+        last = None
+        while not flight.done():
+            changed = stream.changed
+            if stream.latest is not None and stream.latest is not last:
+                last = stream.latest
+                yield last
+                continue
+            waiter = asyncio.ensure_future(changed.wait())
+            try:
+                await asyncio.wait({flight, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+        result = flight.result()
+        if result is not last:
+            yield result
 
-    async def analyze_commit(self, commit_sha: str) -> AnalysisResult:
+    def _drop_stream(self, key: Tuple[str, str], stream: '_PartialResults') -> None:
+        if self._streams.get(key) is stream:
+            del self._streams[key]
+
+    async def _publish_stream(
+        self,
+        key: Tuple[str, str],
+        stream: '_PartialResults',
+        commit_sha: str,
+        update_index: bool = True
+    ) -> AnalysisResult:
+        """Run a streamed analysis as the shared flight, publishing its partial results."""
+        result = None
+        try:
+            async for result in self._stream_analysis(commit_sha, update_index):
+                stream.publish(result)
+        finally:
+            self._drop_stream(key, stream)
+        return result
+
+    async def _stream_analysis(
+        self, commit_sha: str, update_index: bool = True
+    ) -> AsyncIterator[AnalysisResult]:
+        metrics_task = None
+        try:
+            changes, ai_changes, committed_at = await self._prepare_changes(commit_sha)
+            metrics_task = asyncio.create_task(
+                self._timed('metrics', self.metrics_calculator.calculate_metrics(
+                    changes, committed_at, update_index
+                ))
+            )
+            
+            partial = {'issues': [], 'security_concerns': [], 'recommendations': [], 'performance_impact': ''}
+            ai_analysis = None
+            with self.telemetry.span('llm_stream'):
+                async for field, value in self.openai_service.stream_analysis(ai_changes):
+                    if field == 'analysis':
+                        ai_analysis = value
+                        continue
+                    if isinstance(partial.get(field), list):
+                        partial[field].append(value)
+                    elif field == 'performance_impact' and isinstance(value, str):
+                        partial[field] = value
+                    else:
+                        continue
+                    yield self._partial_result(commit_sha, partial)
+            
+            metrics = await metrics_task
+            with self.telemetry.span('build_result'):
+                result = self._build_result(commit_sha, ai_analysis, metrics, committed_at)
+            self._save(result)
+            yield result
+            
+        except Exception as e:
+            logger.error(f"Error streaming analysis of commit {commit_sha}: {str(e)}")
+            raise
+        finally:
+            if metrics_task is not None and not metrics_task.done():
+                metrics_task.cancel()
+
+    def has_stored_result(self, commit_sha: str) -> bool:
+        """Whether the result store already has a current analysis of the commit."""
+        if self.result_store is None:
+            return False
+        model = self.openai_service.settings.openai_model
+        return self.result_store.get(commit_sha, model, self.analysis_version) is not None
+
+    async def prepare_batch(
+        self, commit_sha: str
+    ) -> Tuple[List[Tuple[Dict, int]], Dict, Optional[datetime]]:
+        """Batch request bodies for a commit, with their token weights, its metrics and date.
+
+        Backfills walk history, so the clone index is queried but not updated.
+        """
+        changes, ai_changes, committed_at = await self._prepare_changes(commit_sha)
+        metrics = await self._timed('metrics', self.metrics_calculator.calculate_metrics(
+            changes, committed_at, update_index=False
+        ))
+        return self.openai_service.batch_requests(ai_changes), metrics, committed_at
+
+    def complete_batch(
+        self,
+        commit_sha: str,
+        responses: List[Tuple[Optional[str], int]],
+        metrics: Dict,
+        committed_at: Optional[datetime] = None
+    ) -> AnalysisResult:
+        """Build and store the result of a commit analyzed by a batch job."""
+        ai_analysis = self.openai_service.merge_responses(responses)
+        result = self._build_result(commit_sha, ai_analysis, metrics, committed_at)
+        self._save(result)
+        return result
+
+    async def _run_analysis(self, commit_sha: str, update_index: bool = True) -> AnalysisResult:
         """Perform comprehensive analysis of a commit."""
         try:
-            # Get commit changes
-            changes = await self.github_service.get_commit_changes(commit_sha)
+            changes, ai_changes, committed_at = await self._prepare_changes(commit_sha)
             
             # Parallel analysis
-            ai_analysis_task = self.openai_service.analyze_code(changes)
-            metrics_task = self.metrics_calculator.calculate_metrics(changes)
+            ai_analysis_task = self._timed('llm', self.openai_service.analyze_code(ai_changes))
+            metrics_task = self._timed('metrics', self.metrics_calculator.calculate_metrics(
+                changes, committed_at, update_index
+            ))
             
             # Wait for both analyses to complete
             ai_analysis, metrics = await asyncio.gather(ai_analysis_task, metrics_task)
             
-            # Combine AI analysis with metrics
-            quality_score = self._calculate_final_score(ai_analysis['quality_score'], metrics)
-            
-            return AnalysisResult(
-                commit_sha=commit_sha,
-                quality_score=quality_score,
-                issues=[
-                    CodeIssue(**issue) for issue in ai_analysis['issues']
-                ],
-                security_concerns=[
-                    SecurityConcern(**concern) 
-                    for concern in ai_analysis['security_concerns']
-                ],
-                performance_impact=ai_analysis['performance_impact'],
-                recommendations=ai_analysis['recommendations'] + 
-                              self._generate_metric_recommendations(metrics)
-            )
+            with self.telemetry.span('build_result'):
+                return self._build_result(commit_sha, ai_analysis, metrics, committed_at)
             
         except Exception as e:
             logger.error(f"Error analyzing commit {commit_sha}: {str(e)}")
             raise
 
+    async def _prepare_changes(
+        self, commit_sha: str
+    ) -> Tuple[List[Dict], List[Dict], Optional[datetime]]:
+        """Fetch a commit's changes, the reduced version of them sent to the model, and its date."""
+        with self.telemetry.span('fetch_changes'):
+            changes = await self.github_service.get_commit_changes(commit_sha)
+            # Served from the commit payload cached by get_commit_changes
+            committed_at = (await self.github_service.get_commit(commit_sha)).date
+        if self.content_resolver is not None:
+            with self.telemetry.span('attach_contents'):
+                changes = await self.content_resolver.attach_contents(commit_sha, changes)
+        
+        # The model only gets the changed parts of each function
+        ai_changes = changes
+        if self.context_builder is not None:
+            with self.telemetry.span('prompt_context'):
+                ai_changes, context_stats = self.context_builder.build(changes)
+            logger.info(
+                f"Prompt context for {commit_sha[:7]}: {context_stats.tokens_after} tokens "
+                f"({context_stats.tokens_saved} saved)"
+            )
+        return changes, ai_changes, committed_at
+
+    def _build_result(
+        self,
+        commit_sha: str,
+        ai_analysis: Dict,
+        metrics: Dict,
+        committed_at: Optional[datetime] = None
+    ) -> AnalysisResult:
+        """Combine AI analysis with metrics."""
+        quality_score = self._calculate_final_score(ai_analysis['quality_score'], metrics)
+        
+        return AnalysisResult(
+            commit_sha=commit_sha,
+            quality_score=quality_score,
+            issues=[
+                CodeIssue(**issue) for issue in ai_analysis['issues']
+            ],
+            security_concerns=[
+                SecurityConcern(**concern) 
+                for concern in ai_analysis['security_concerns']
+            ],
+            performance_impact=ai_analysis['performance_impact'],
+            recommendations=ai_analysis['recommendations'] + 
+                          self._generate_metric_recommendations(metrics),
+            metrics={key: value for key, value in metrics.items() if key != 'clones'},
+            committed_at=committed_at
+        )
+
+    @staticmethod
+    def _partial_result(commit_sha: str, partial: Dict) -> AnalysisResult:
+        """Snapshot of a streaming analysis; findings are validated like complete ones."""
+        return AnalysisResult(
+            commit_sha=commit_sha,
+            quality_score=0.0,
+            issues=[
+                issue for issue in map(parse_issue, partial['issues']) if issue is not None
+            ],
+            security_concerns=[
+                concern for concern in map(parse_concern, partial['security_concerns'])
+                if concern is not None
+            ],
+            performance_impact=partial['performance_impact'],
+            recommendations=[
+                item for item in map(parse_recommendation, partial['recommendations'])
+                if item is not None
+            ]
+        )
+
     def _calculate_final_score(self, ai_score: float, metrics: Dict) -> float:
         """Calculate final quality score combining AI and metrics analysis."""
         # Weights for different components
@@ -81,6 +390,12 @@ class CodeAnalyzer:
                 "Consider reducing function complexity in highlighted areas"
             )
         
+        if metrics.get('complexity_delta', 0) > 10:
+            recommendations.append(
+                f"This commit adds {metrics['complexity_delta']:.0f} decision points. "
+                "Consider splitting the new logic into smaller functions"
+            )
+        
         if metrics['duplication_percentage'] > 10:
             recommendations.append(
                 "Significant code duplication detected. Consider refactoring"
@@ -91,6 +406,14 @@ class CodeAnalyzer:
                 "Code maintainability is low. Consider simplifying complex parts"
             )
             
+        clones = metrics.get('clones', [])
+        for clone in clones[:self.MAX_CLONE_RECOMMENDATIONS]:
+            recommendations.append(
+                f"{clone['filename']} lines {clone['hunk_start']}-{clone['hunk_end']} "
+                f"duplicate lines {clone['start_line']}-{clone['end_line']} of "
+                f"{clone['path']}. Consider reusing the existing code"
+            )
+            
         return recommendations
 
     async def analyze_multiple_commits(
@@ -0,0 +1,99 @@
+# src/analysis/diff_parser.py
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import re
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: List[Tuple[str, str]] = field(default_factory=list)  # (marker, text)
+
+    @property
+    def new_end(self) -> int:
+        """Last line of the hunk in the post-image."""
+        return self.new_start + max(self.new_count, 1) - 1
+
+    def post_image(self) -> List[Tuple[int, str]]:
+        """Context and added lines with their post-image line numbers."""
+        result = []
+        line_no = self.new_start
+        for marker, text in self.lines:
+            if marker == '-':
+                continue
+            result.append((line_no, text))
+            line_no += 1
+        return result
+
+    def added_lines(self) -> List[Tuple[int, str]]:
+        """Added lines with their post-image line numbers."""
+        result = []
+        line_no = self.new_start
+        for marker, text in self.lines:
+            if marker == '-':
+                continue
+            if marker == '+':
+                result.append((line_no, text))
+            line_no += 1
+        return result
+
+def parse_patch(patch: str) -> List[Hunk]:
+    """Split a unified diff (as returned by GitHub for one file) into hunks."""
+    hunks: List[Hunk] = []
+    current = None
+    for line in patch.split('\n'):
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_start, old_count, new_start, new_count = match.groups()
+            current = Hunk(
+                old_start=int(old_start),
+                old_count=int(old_count) if old_count is not None else 1,
+                new_start=int(new_start),
+                new_count=int(new_count) if new_count is not None else 1
+            )
+            hunks.append(current)
+        elif current is not None and line and line[0] in ' +-':
+            current.lines.append((line[0], line[1:]))
+        elif current is not None and line == '':
+            # Some producers drop the leading space of empty context lines
+            current.lines.append((' ', ''))
+        # "\ No newline at end of file" and other lines are ignored
+    for hunk in hunks:
+        # A trailing empty line from the final newline is not part of the hunk
+        while hunk.lines and hunk.lines[-1] == (' ', '') and len(
+            [m for m, _ in hunk.lines if m != '+']
+        ) > hunk.old_count:
+            hunk.lines.pop()
+    return hunks
+
+def reconstruct_pre_image(post_image: str, patch: str) -> Optional[str]:
+    """Rebuild the parent version of a file from its new content and its patch.
+
+    Returns None if the patch does not line up with the content (e.g. GitHub
+    truncated it), in which case the parent has to be fetched instead.
+    """
+    new_lines = post_image.split('\n') if post_image else []
+    result: List[str] = []
+    cursor = 0
+    for hunk in parse_patch(patch):
+        # With an empty new side, new_start names the line *before* the hunk
+        start = hunk.new_start - 1 if hunk.new_count > 0 else hunk.new_start
+        if start < cursor or start > len(new_lines):
+            return None
+        result.extend(new_lines[cursor:start])
+        cursor = start
+        for marker, text in hunk.lines:
+            if marker == '-':
+                result.append(text)
+                continue
+            if cursor >= len(new_lines) or new_lines[cursor] != text:
+                return None
+            if marker == ' ':
+                result.append(text)
+            cursor += 1
+    result.extend(new_lines[cursor:])
+    return '\n'.join(result)
@@ -0,0 +1,84 @@
+# src/analysis/duplication.py
+from typing import List, Set
+
+# Polynomial rolling hash over per-line hashes, modulo a Mersenne prime
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1_000_003
+
+def normalize_line(line: str, normalize_whitespace: bool = True) -> str:
+    """Normalize a line for comparison; optionally collapse all whitespace runs."""
+    if normalize_whitespace:
+        return ' '.join(line.split())
+    return line.rstrip('\r')
+
+def line_hashes(lines: List[str], normalize_whitespace: bool = True) -> List[int]:
+    """Hash every normalized line into the rolling-hash field."""
+    return [
+        hash(normalize_line(line, normalize_whitespace)) % HASH_MOD
+        for line in lines
+    ]
+
+def window_hashes(hashes: List[int], window: int) -> List[int]:
+    """Return the rolling hash of every run of `window` consecutive line hashes."""
+    if len(hashes) < window:
+        return []
+    top = pow(HASH_BASE, window - 1, HASH_MOD)
+    current = 0
+    for value in hashes[:window]:
+        current = (current * HASH_BASE + value) % HASH_MOD
+    result = [current]
+    for i in range(window, len(hashes)):
+        current = ((current - hashes[i - window] * top) * HASH_BASE + hashes[i]) % HASH_MOD
+        result.append(current)
+    return result
+
+class DuplicationDetector:
+    """Find repeated blocks of lines in linear time.
+
+    Every block of `min_block_lines` consecutive lines is hashed with a
+    rolling hash; blocks whose hash was already seen (and whose lines really
+    match) mark all their lines as duplicated. Memory is proportional to the
+    input and released after each call.
+    """
+
+    def __init__(self, min_block_lines: int = 3, normalize_whitespace: bool = True):
+        if min_block_lines < 1:
+            raise ValueError("min_block_lines must be at least 1")
+        self.min_block_lines = min_block_lines
+        self.normalize_whitespace = normalize_whitespace
+
+    def duplicated_lines(self, lines: List[str]) -> Set[int]:
+        """Return indexes of lines that belong to a repeated block."""
+        return self.duplicated_from_hashes(line_hashes(lines, self.normalize_whitespace))
+
+    def duplicated_from_hashes(self, hashes: List[int]) -> Set[int]:
+        """Same as duplicated_lines, for callers that already hashed each line."""
+        window = self.min_block_lines
+        first_seen = {}
+        duplicated: Set[int] = set()
+
+        for start, block_hash in enumerate(window_hashes(hashes, window)):
+            first = first_seen.get(block_hash)
+            if first is None:
+                first_seen[block_hash] = start
+                continue
+            # Guard against hash collisions before reporting a match
+            if hashes[first:first + window] != hashes[start:start + window]:
+                continue
+            duplicated.update(range(first, first + window))
+            duplicated.update(range(start, start + window))
+
+        return duplicated
+
+    def duplication_score(self, code: str) -> float:
+        """Percentage of lines that belong to a repeated block."""
+        lines = code.split('\n')
+        if len(lines) < self.min_block_lines:
+            return 0
+        return len(self.duplicated_lines(lines)) / len(lines) * 100
+
+    def score_from_hashes(self, hashes: List[int]) -> float:
+        """Same as duplication_score, for callers that already hashed each line."""
+        if len(hashes) < self.min_block_lines:
+            return 0
+        return len(self.duplicated_from_hashes(hashes)) / len(hashes) * 100
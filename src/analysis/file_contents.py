@@ -0,0 +1,83 @@
+# src/analysis/file_contents.py
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+from ..api.github_service import GitHubService
+from ..storage.blob_store import BlobStore, git_blob_sha
+from ..utils.logging import get_logger
+from .diff_parser import reconstruct_pre_image
+
+logger = get_logger(__name__)
+
+class FileContentResolver:
+    """Attach the parent and child versions of changed files to commit changes.
+
+    Only the child blob is downloaded: the parent is rebuilt locally by
+    reversing the patch, and falls back to a fetch at the parent commit when
+    the patch is truncated. Both versions are stored by blob SHA, so a file
+    version seen in an earlier commit is never downloaded again.
+    """
+
+    def __init__(
+        self,
+        github_service: GitHubService,
+        blob_store: BlobStore,
+        max_file_bytes: int = 1024 * 1024
+    ):
+        self.github_service = github_service
+        self.blob_store = blob_store
+        self.max_file_bytes = max_file_bytes
+
+    async def attach_contents(self, commit_sha: str, changes: List[Dict]) -> List[Dict]:
+        """Add content_before/content_after and their blob SHAs to each change."""
+        parents = await self.github_service.get_commit_parents(commit_sha)
+        parent_sha = parents[0] if parents else None
+        await asyncio.gather(*(
+            self._attach(change, parent_sha) for change in changes
+        ))
+        return changes
+
+    async def _attach(self, change: Dict, parent_sha: Optional[str]) -> None:
+        try:
+            status = change.get('status')
+            after = None
+            if status != 'removed' and change.get('sha'):
+                after = await self._load_blob(change['sha'])
+                change['blob_after'] = change['sha']
+
+            before = None
+            if status != 'added':
+                before = await self._in_thread(reconstruct_pre_image, after or '', change['patch'])
+                if before is not None:
+                    change['blob_before'] = git_blob_sha(before)
+                    await self._in_thread(self.blob_store.put, change['blob_before'], before)
+                elif parent_sha is not None:
+                    path = change.get('previous_filename') or change['filename']
+                    blob_sha, before = await self._load_file(path, parent_sha)
+                    change['blob_before'] = blob_sha
+
+            if after is not None and len(after) > self.max_file_bytes:
+                after = None
+            if before is not None and len(before) > self.max_file_bytes:
+                before = None
+            change['content_after'] = after
+            change['content_before'] = before
+        except Exception as e:
+            # Metrics fall back to the patch alone
+            logger.warning(f"Could not load contents of {change['filename']}: {str(e)}")
+
+    @staticmethod
+    async def _in_thread(fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking SQLite or parsing work on the loop's default thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _load_blob(self, blob_sha: str) -> str:
+        content = await self._in_thread(self.blob_store.get, blob_sha)
+        if content is None:
+            content = await self.github_service.get_blob(blob_sha)
+            await self._in_thread(self.blob_store.put, blob_sha, content)
+        return content
+
+    async def _load_file(self, path: str, ref: str):
+        blob_sha, content = await self.github_service.get_file_content(path, ref)
+        await self._in_thread(self.blob_store.put, blob_sha, content)
+        return blob_sha, content
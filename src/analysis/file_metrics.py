@@ -0,0 +1,146 @@
+# src/analysis/file_metrics.py
+"""
+Pure per-file metric functions.
+
+Nothing here touches the network, the event loop or shared state, so
+analyze_files can run in a worker process.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .duplication import DuplicationDetector
+from .languages import spec_for
+from .metric_engine import scan_file, scan_source
+
+@dataclass
+class FileMetrics:
+    complexity: float
+    maintainability: float
+    duplication_score: float
+    lines_of_code: int
+    comment_ratio: float
+    complexity_delta: float = 0.0
+    halstead_volume: float = 0.0
+
+@dataclass(frozen=True)
+class MetricOptions:
+    min_duplicate_lines: int = 3
+    normalize_whitespace: bool = True
+
+# Keys of a change dict that the metrics actually read; everything else stays
+# in the parent process instead of being pickled to workers
+WORKER_KEYS = (
+    'filename',
+    'patch',
+    'content_before',
+    'content_after',
+    'content_stats_before',
+    'content_stats_after'
+)
+
+def content_complexity(filename: str, content: str) -> Dict:
+    """Complexity, size and maintainability of a full file version."""
+    stats = scan_file(filename, content)
+    return {
+        'total': stats.complexity,
+        'average': stats.average_complexity,
+        'maintainability': stats.maintainability_index,
+        'halstead_volume': stats.halstead_volume,
+        'lines_of_code': stats.lines_of_code
+    }
+
+def analyze_file(change: Dict, options: MetricOptions) -> Tuple[FileMetrics, Dict]:
+    """Compute the metrics of one changed file.
+
+    Returns the metrics and the content complexity stats computed for the
+    before/after versions, so the caller can memoize them by blob SHA. Stats
+    already present in the change (content_stats_before/after) are reused.
+    """
+    detector = DuplicationDetector(
+        min_block_lines=options.min_duplicate_lines,
+        normalize_whitespace=options.normalize_whitespace
+    )
+    code = change['patch']
+    # One pass over the patch gives size, comments, complexity, Halstead
+    # counts and (with whitespace normalization) the duplication line hashes
+    patch_stats = scan_source(
+        code,
+        spec_for(change['filename']),
+        is_patch=True,
+        with_line_hashes=options.normalize_whitespace
+    )
+    if options.normalize_whitespace:
+        duplication_score = detector.score_from_hashes(patch_stats.line_hashes)
+    else:
+        duplication_score = detector.duplication_score(code)
+
+    complexity = patch_stats.average_complexity
+    maintainability = patch_stats.maintainability_index
+    halstead_volume = patch_stats.halstead_volume
+    complexity_delta = 0.0
+    content_stats = {}
+
+    # With full file versions, complexity and maintainability describe the
+    # real source instead of the patch text
+    for side in ('after', 'before'):
+        content = change.get(f"content_{side}")
+        if content is None:
+            continue
+        stats = change.get(f"content_stats_{side}")
+        if stats is None:
+            stats = content_complexity(change['filename'], content)
+        content_stats[side] = stats
+
+    if content_stats:
+        after = content_stats.get('after')
+        before = content_stats.get('before')
+        if after is not None:
+            complexity = after['average']
+            maintainability = after['maintainability']
+            halstead_volume = after['halstead_volume']
+        complexity_delta = (
+            (after['total'] if after else 0) - (before['total'] if before else 0)
+        )
+
+    metrics = FileMetrics(
+        complexity=complexity,
+        maintainability=maintainability,
+        duplication_score=duplication_score,
+        lines_of_code=patch_stats.lines_of_code,
+        comment_ratio=patch_stats.comment_ratio,
+        complexity_delta=complexity_delta,
+        halstead_volume=halstead_volume
+    )
+    return metrics, content_stats
+
+def analyze_files(
+    changes: List[Dict],
+    options: MetricOptions
+) -> List[Tuple[FileMetrics, Dict]]:
+    """Worker entry point: compute metrics for a chunk of changed files."""
+    return [analyze_file(change, options) for change in changes]
+
+def chunk_changes(changes: List[Dict], target_bytes: int) -> List[List[Dict]]:
+    """Group small files into chunks of roughly target_bytes of source each."""
+    chunks: List[List[Dict]] = []
+    current: List[Dict] = []
+    size = 0
+    for change in changes:
+        change_size = sum(
+            len(change.get(key) or '')
+            for key in ('patch', 'content_before', 'content_after')
+        )
+        if current and size + change_size > target_bytes:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(change)
+        size += change_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+def worker_payload(change: Dict, stats_before: Optional[Dict], stats_after: Optional[Dict]) -> Dict:
+    """Strip a change down to what analyze_file reads."""
+    payload = {key: change.get(key) for key in WORKER_KEYS}
+    payload['content_stats_before'] = stats_before
+    payload['content_stats_after'] = stats_after
+    return payload
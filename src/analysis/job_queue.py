@@ -0,0 +1,155 @@
+# src/analysis/job_queue.py
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from ..models.analysis_result import AnalysisResult
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from .code_analyzer import CodeAnalyzer
+
+logger = get_logger(__name__)
+
+# Lower runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+@dataclass
+class AnalysisJob:
+    id: str
+    commit_sha: str
+    priority: int
+    stream: bool
+    # Off for historical analyses, which must not overwrite the clone index
+    update_index: bool = True
+    status: str = QUEUED
+    progress: str = 'Waiting for a worker'
+    # Partial while a streamed job runs, complete once done
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+class AnalysisJobQueue:
+    """Run commit analyses on a pool of async workers, outside request threads.
+
+    submit() may be called from any thread and returns a job id right away;
+    callers poll get() for status, progress and (partial) results. Jobs with
+    a lower priority number run first, so interactive requests overtake
+    queued background work. A commit with an unfinished job is not queued
+    twice; resubmitting it with a more urgent priority moves it ahead.
+    """
+
+    def __init__(
+        self,
+        analyzer: 'CodeAnalyzer',
+        loop: asyncio.AbstractEventLoop,
+        workers: int = 4,
+        retention_seconds: float = 600.0
+    ):
+        self.analyzer = analyzer
+        self.loop = loop
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._active: Dict[str, str] = {}  # commit SHA -> unfinished job id
+        self._lock = threading.Lock()
+        self._order = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        asyncio.run_coroutine_threadsafe(self._start(workers), loop).result()
+
+    async def _start(self, workers: int) -> None:
+        self._queue = asyncio.PriorityQueue()
+        for index in range(workers):
+            self.loop.create_task(self._worker(index))
+
+    def submit(
+        self,
+        commit_sha: str,
+        priority: int = INTERACTIVE,
+        stream: bool = False,
+        update_index: bool = True
+    ) -> str:
+        """Queue an analysis and return its job id."""
+        with self._lock:
+            self._drop_expired()
+            job = self._jobs.get(self._active.get(commit_sha, ''))
+            if job is not None:
+                job.stream = job.stream or stream
+                job.update_index = job.update_index or update_index
+                if priority >= job.priority or job.status != QUEUED:
+                    return job.id
+                # The older, less urgent entry is skipped when it comes up
+                job.priority = priority
+            else:
+                job = AnalysisJob(uuid.uuid4().hex, commit_sha, priority, stream, update_index)
+                self._jobs[job.id] = job
+                self._active[commit_sha] = job.id
+            entry = (priority, next(self._order), job.id)
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, entry)
+        return job.id
+
+    def get(self, job_id: Optional[str]) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id) if job_id else None
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def _drop_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            priority, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED or job.priority != priority:
+                continue
+            job.status = RUNNING
+            job.progress = 'Analyzing'
+            try:
+                if job.stream:
+                    await self._run_streamed(job)
+                else:
+                    job.result = await self.analyzer.analyze_commit(job.commit_sha, job.update_index)
+                self._finish(job, DONE, 'Done')
+            except Exception as e:
+                logger.error(f"Analysis job for commit {job.commit_sha} failed: {str(e)}")
+                job.error = str(e)
+                self._finish(job, FAILED, 'Failed')
+
+    def _finish(self, job: AnalysisJob, status: str, progress: str) -> None:
+        job.finished_at = time.monotonic()
+        job.progress = progress
+        job.status = status
+        with self._lock:
+            if self._active.get(job.commit_sha) == job.id:
+                del self._active[job.commit_sha]
+
+    async def _run_streamed(self, job: AnalysisJob) -> None:
+        async for result in self.analyzer.stream_commit(job.commit_sha, job.update_index):
+            job.result = result
+            findings = len(result.issues) + len(result.security_concerns) + len(result.recommendations)
+            job.progress = f"Analyzing, {findings} findings received"
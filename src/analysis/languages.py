@@ -0,0 +1,201 @@
+# src/analysis/languages.py
+"""
+Lexer tables for the languages the metric engine understands.
+
+Each table lists the comment and string syntax to skip, the keywords and
+operators that count as decision points, and how to find function bodies.
+Adding a language means adding a table here, not changing the scanner.
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+import keyword
+import os
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    name: str
+    decision_keywords: FrozenSet[str]
+    decision_operators: FrozenSet[str]
+    keywords: FrozenSet[str]
+    line_comments: Tuple[str, ...] = ('//',)
+    block_comment: Optional[Tuple[str, str]] = ('/*', '*/')
+    # Each pattern must start with a literal character and have no groups
+    strings: Tuple[str, ...] = (
+        r'"(?:\\.|[^"\\\n])*"',
+        r"'(?:\\.|[^'\\\n])*'"
+    )
+    # Strings with a letter or symbol prefix, tokenized before identifiers
+    prefixed_strings: Tuple[str, ...] = ()
+    identifier: str = r'[A-Za-z_]\w*'
+    # 'indent' finds def blocks by indentation, 'brace' matches function_header
+    # and the braces that follow it, None reports no functions
+    functions: Optional[str] = None
+    function_header: Optional[str] = None
+
+_DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+_SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+
+# A named declaration with a parameter list and an opening brace, as in
+# Java, C# and C++ methods; control statements are excluded by name
+_C_STYLE_FUNCTION = (
+    r'^[ \t]*[\w<>\[\],.:*&~ \t]*?\b'
+    r'(?!(?:if|for|foreach|while|switch|catch|return|else|do|try|using|lock|'
+    r'new|sizeof|synchronized|fixed)\b)'
+    r'[A-Za-z_~][\w]*[ \t]*\([^;{}()]*(?:\([^;{}()]*\)[^;{}()]*)*\)[^;{}()]*\{'
+)
+
+GENERIC = LanguageSpec(
+    name='generic',
+    decision_keywords=frozenset({
+        'if', 'elif', 'for', 'while', 'except', 'catch', 'case', 'and', 'or'
+    }),
+    decision_operators=frozenset({'&&', '||', '?'}),
+    keywords=frozenset(keyword.kwlist) | frozenset({
+        'function', 'var', 'let', 'const', 'catch', 'case', 'switch', 'do',
+        'new', 'this', 'public', 'private', 'protected', 'static', 'void',
+        'int', 'func', 'go', 'defer', 'struct', 'interface', 'package',
+        'throw', 'throws', 'typeof', 'instanceof', 'default', 'goto'
+    }),
+    line_comments=('#', '//')
+)
+
+PYTHON = LanguageSpec(
+    name='python',
+    decision_keywords=frozenset({'if', 'elif', 'for', 'while', 'except', 'and', 'or'}),
+    decision_operators=frozenset(),
+    keywords=frozenset(keyword.kwlist),
+    line_comments=('#',),
+    block_comment=None,
+    strings=(
+        r'"""[\s\S]*?"""',
+        r"'''[\s\S]*?'''",
+        _DOUBLE_QUOTED,
+        _SINGLE_QUOTED
+    ),
+    functions='indent'
+)
+
+JAVASCRIPT = LanguageSpec(
+    name='javascript',
+    decision_keywords=frozenset({'if', 'for', 'while', 'case', 'catch'}),
+    decision_operators=frozenset({'&&', '||', '??', '?'}),
+    keywords=frozenset({
+        'break', 'case', 'catch', 'class', 'const', 'continue', 'debugger',
+        'default', 'delete', 'do', 'else', 'export', 'extends', 'finally',
+        'for', 'function', 'if', 'import', 'in', 'instanceof', 'let', 'new',
+        'return', 'super', 'switch', 'this', 'throw', 'try', 'typeof', 'var',
+        'void', 'while', 'with', 'yield', 'async', 'await', 'of', 'static',
+        'interface', 'type', 'enum', 'implements', 'private', 'protected',
+        'public', 'readonly', 'abstract', 'declare', 'namespace', 'as'
+    }),
+    strings=(
+        r'`(?:\\[\s\S]|[^`\\])*`',
+        _DOUBLE_QUOTED,
+        _SINGLE_QUOTED
+    ),
+    identifier=r'[A-Za-z_$][\w$]*',
+    functions='brace',
+    function_header=(
+        r'\bfunction\b[^{;]*\{|=>[ \t]*\{|'
+        r'^[ \t]*(?:(?:async|static|get|set|public|private|protected)[ \t]+)*'
+        r'(?!(?:if|for|while|switch|catch|return|function)\b)'
+        r'[A-Za-z_$][\w$]*[ \t]*\([^;{}()]*\)[ \t]*(?::[^{;]*)?\{'
+    )
+)
+
+JAVA = LanguageSpec(
+    name='java',
+    decision_keywords=frozenset({'if', 'for', 'while', 'case', 'catch'}),
+    decision_operators=frozenset({'&&', '||', '?'}),
+    keywords=frozenset({
+        'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch',
+        'char', 'class', 'continue', 'default', 'do', 'double', 'else', 'enum',
+        'extends', 'final', 'finally', 'float', 'for', 'if', 'implements',
+        'import', 'instanceof', 'int', 'interface', 'long', 'native', 'new',
+        'package', 'private', 'protected', 'public', 'return', 'short',
+        'static', 'super', 'switch', 'synchronized', 'this', 'throw',
+        'throws', 'try', 'void', 'volatile', 'while', 'var', 'record'
+    }),
+    strings=(r'"""[\s\S]*?"""', _DOUBLE_QUOTED, _SINGLE_QUOTED),
+    functions='brace',
+    function_header=_C_STYLE_FUNCTION
+)
+
+CSHARP = LanguageSpec(
+    name='csharp',
+    decision_keywords=frozenset({'if', 'for', 'foreach', 'while', 'case', 'catch'}),
+    decision_operators=frozenset({'&&', '||', '??', '?'}),
+    keywords=frozenset({
+        'abstract', 'as', 'async', 'await', 'base', 'bool', 'break', 'case',
+        'catch', 'class', 'const', 'continue', 'default', 'delegate', 'do',
+        'else', 'enum', 'event', 'finally', 'for', 'foreach', 'if', 'in',
+        'int', 'interface', 'internal', 'is', 'lock', 'namespace', 'new',
+        'null', 'out', 'override', 'private', 'protected', 'public',
+        'readonly', 'ref', 'return', 'sealed', 'static', 'string', 'struct',
+        'switch', 'this', 'throw', 'try', 'typeof', 'using', 'var',
+        'virtual', 'void', 'while', 'yield'
+    }),
+    prefixed_strings=(r'@"(?:""|[^"])*"', r'\$@"(?:""|[^"])*"'),
+    strings=(_DOUBLE_QUOTED, _SINGLE_QUOTED),
+    functions='brace',
+    function_header=_C_STYLE_FUNCTION
+)
+
+CPP = LanguageSpec(
+    name='cpp',
+    decision_keywords=frozenset({'if', 'for', 'while', 'case', 'catch'}),
+    decision_operators=frozenset({'&&', '||', '?'}),
+    keywords=frozenset({
+        'auto', 'bool', 'break', 'case', 'catch', 'char', 'class', 'const',
+        'constexpr', 'continue', 'default', 'delete', 'do', 'double', 'else',
+        'enum', 'explicit', 'extern', 'float', 'for', 'friend', 'goto', 'if',
+        'inline', 'int', 'long', 'namespace', 'new', 'noexcept', 'nullptr',
+        'operator', 'private', 'protected', 'public', 'return', 'short',
+        'signed', 'sizeof', 'static', 'struct', 'switch', 'template', 'this',
+        'throw', 'try', 'typedef', 'typename', 'union', 'unsigned', 'using',
+        'virtual', 'void', 'volatile', 'while'
+    }),
+    # Raw strings with a custom delimiter are not recognized
+    prefixed_strings=(r'R"\((?:[^)]|\)(?!"))*\)"',),
+    strings=(_DOUBLE_QUOTED, _SINGLE_QUOTED),
+    functions='brace',
+    function_header=_C_STYLE_FUNCTION
+)
+
+GO = LanguageSpec(
+    name='go',
+    decision_keywords=frozenset({'if', 'for', 'case'}),
+    decision_operators=frozenset({'&&', '||'}),
+    keywords=frozenset({
+        'break', 'case', 'chan', 'const', 'continue', 'default', 'defer',
+        'else', 'fallthrough', 'for', 'func', 'go', 'goto', 'if', 'import',
+        'interface', 'map', 'package', 'range', 'return', 'select', 'struct',
+        'switch', 'type', 'var'
+    }),
+    strings=(r'`[^`]*`', _DOUBLE_QUOTED, _SINGLE_QUOTED),
+    functions='brace',
+    function_header=r'\bfunc\b[^{\n]*\{'
+)
+
+LANGUAGES: Dict[str, LanguageSpec] = {
+    '.py': PYTHON,
+    '.js': JAVASCRIPT,
+    '.jsx': JAVASCRIPT,
+    '.mjs': JAVASCRIPT,
+    '.cjs': JAVASCRIPT,
+    '.ts': JAVASCRIPT,
+    '.tsx': JAVASCRIPT,
+    '.java': JAVA,
+    '.cs': CSHARP,
+    '.c': CPP,
+    '.h': CPP,
+    '.cc': CPP,
+    '.cpp': CPP,
+    '.cxx': CPP,
+    '.hpp': CPP,
+    '.go': GO
+}
+
+def spec_for(filename: str) -> LanguageSpec:
+    """Pick the lexer table for a file name by its extension."""
+    return LANGUAGES.get(os.path.splitext(filename)[1].lower(), GENERIC)
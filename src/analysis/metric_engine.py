@@ -0,0 +1,325 @@
+# src/analysis/metric_engine.py
+"""
+Single-pass source scanner.
+
+Source is tokenized once with a compiled regex and the tokens are tallied
+with a Counter, so the per-token work happens in C. Complexity, Halstead
+counts and comment/line statistics are all derived from that one tally plus
+a few whole-text regex counts; no list of line strings is built. The
+syntax of each language comes from the tables in languages.py.
+"""
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Tuple
+import math
+import re
+from .duplication import HASH_MOD
+from .languages import GENERIC, LanguageSpec, spec_for
+
+@dataclass
+class CodeStats:
+    lines_of_code: int = 0
+    comment_lines: int = 0
+    total_chars: int = 0
+    decisions: int = 0
+    function_complexities: List[int] = field(default_factory=list)
+    distinct_operators: int = 0
+    total_operators: int = 0
+    distinct_operands: int = 0
+    total_operands: int = 0
+    line_hashes: Optional[List[int]] = None
+
+    @property
+    def complexity(self) -> int:
+        """Cyclomatic complexity of the whole text."""
+        return 1 + self.decisions
+
+    @property
+    def average_complexity(self) -> float:
+        """Mean complexity per function, or the whole text if it has none."""
+        if not self.function_complexities:
+            return self.complexity
+        return sum(self.function_complexities) / len(self.function_complexities)
+
+    @property
+    def comment_ratio(self) -> float:
+        return self.comment_lines / (self.lines_of_code or 1)
+
+    @property
+    def halstead_volume(self) -> float:
+        """Halstead volume N * log2(n)."""
+        length = self.total_operators + self.total_operands
+        vocabulary = self.distinct_operators + self.distinct_operands
+        if vocabulary < 2:
+            return 0.0
+        return length * math.log2(vocabulary)
+
+    @property
+    def maintainability_index(self) -> float:
+        """Maintainability index on a 0-100 scale (SEI variant with comment weight)."""
+        volume = self.halstead_volume
+        if volume <= 0 or self.lines_of_code <= 0:
+            return 100.0
+        comments_percent = self.comment_ratio * 100
+        raw = (
+            171
+            - 5.2 * math.log(volume)
+            - 0.23 * self.complexity
+            - 16.2 * math.log(self.lines_of_code)
+            + 50 * math.sin(math.sqrt(2.46 * math.radians(comments_percent)))
+        )
+        return max(0.0, min(100.0, raw * 100 / 171))
+
+_OPERATORS = (
+    r'===|!==|\*\*=|<<=|>>=|>>>|&&|\|\||\?\?|\?\.|==|!=|<=|>=|\+\+|--|'
+    r'\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|>>|->|=>|::|\*\*|[^\s\w]'
+)
+
+# Removed lines, hunk headers and the leading diff marker of kept lines
+_PATCH_NOISE = re.compile(r'^(?:-[^\n]*\n?|@@[^\n]*\n?|[+ ])', re.MULTILINE)
+_WHITESPACE_RUN = re.compile(r'[ \t\r\f\v]+')
+_LINE = re.compile(r'^.*$', re.MULTILINE)
+_NEWLINE = re.compile(r'\n')
+
+@dataclass
+class _CompiledSpec:
+    tokens: Pattern
+    line_kinds: Pattern
+    comment_markers: Tuple[str, ...]
+    string_leads: str
+    structure: Pattern
+    function_starts: Optional[Pattern]
+
+_COMPILED: Dict[str, _CompiledSpec] = {}
+
+def _lead(pattern: str) -> str:
+    """The literal first character of a string pattern."""
+    return pattern[1] if pattern[0] == '\\' else pattern[0]
+
+def _compile(spec: LanguageSpec) -> _CompiledSpec:
+    compiled = _COMPILED.get(spec.name)
+    if compiled is not None:
+        return compiled
+    string_patterns = spec.prefixed_strings + spec.strings
+    strings = '|'.join(string_patterns)
+    comments = [re.escape(marker) + r'[^\n]*' for marker in spec.line_comments]
+    comment_starts = [re.escape(marker) for marker in spec.line_comments]
+    comment_markers = tuple(spec.line_comments)
+    if spec.block_comment:
+        start, end = spec.block_comment
+        comments.insert(0, re.escape(start) + r'[\s\S]*?' + re.escape(end))
+        # Continuation lines of block comments usually start with '*'
+        comment_starts += [re.escape(start), re.escape(end[0])]
+        comment_markers += (start,)
+    comments = '|'.join(comments)
+    decision_words = sorted(spec.decision_keywords | spec.decision_operators, key=len, reverse=True)
+    decision_alternatives = '|'.join(
+        r'\b' + re.escape(word) + r'\b' if word[0].isalpha()
+        # A ternary '?', not optional chaining or null coalescing
+        else r'\?(?![.?])' if word == '?'
+        else re.escape(word)
+        for word in decision_words
+    ) or r'(?!x)x'
+    # Cheap first-character checks so most positions are rejected immediately
+    skip_leads = {_lead(pattern) for pattern in string_patterns} | {
+        marker[0] for marker in comment_markers
+    }
+    structure_leads = skip_leads | {word[0] for word in decision_words}
+    brace_group = ''
+    if spec.functions == 'brace':
+        structure_leads |= set('{}')
+        brace_group = '|(?P<b>[{}])'
+    structure_leads = re.escape(''.join(sorted(structure_leads)))
+    prefixed = ''.join(pattern + '|' for pattern in spec.prefixed_strings)
+    compiled = _CompiledSpec(
+        # Names first since they are by far the most common token; comments
+        # come before operators so they are tallied whole and skipped
+        tokens=re.compile(
+            f"{prefixed}{spec.identifier}|\\d[\\w.]*|{comments}|{strings}|{_OPERATORS}"
+        ),
+        # Matches every blank line (as '') and every comment line (as its marker)
+        line_kinds=re.compile(
+            r'^[ \t\r\f\v]*(?:(' + '|'.join(comment_starts) + r')|$)', re.MULTILINE
+        ),
+        comment_markers=comment_markers,
+        string_leads=''.join(sorted({_lead(pattern) for pattern in string_patterns})),
+        # Group 'd' is a decision and group 'b' a brace; comments and strings
+        # are matched so that nothing inside them counts
+        structure=re.compile(
+            f"(?=[{structure_leads}])(?:{comments}|{strings}{brace_group}|(?P<d>{decision_alternatives}))"
+        ),
+        function_starts=(
+            re.compile(r'^([ \t]*)(?:async[ \t]+)?def\b', re.MULTILINE)
+            if spec.functions == 'indent'
+            else re.compile(spec.function_header, re.MULTILINE)
+            if spec.functions == 'brace'
+            else None
+        )
+    )
+    _COMPILED[spec.name] = compiled
+    return compiled
+
+_BLOCK_ENDS: Dict[int, Pattern] = {}
+
+def _block_end(indent: int) -> Pattern:
+    """Pattern for the first code line indented at most `indent` columns.
+
+    Comment lines and lines starting with a closing bracket (the end of a
+    multi-line signature) do not close a block.
+    """
+    pattern = _BLOCK_ENDS.get(indent)
+    if pattern is None:
+        pattern = _BLOCK_ENDS[indent] = re.compile(
+            r'\n[ \t]{0,%d}(?=[^ \t\n#)\]}])' % indent
+        )
+    return pattern
+
+def _indent_blocks(compiled: _CompiledSpec, code: str) -> List[Tuple[int, int]]:
+    """Spans of def blocks, found by indentation."""
+    spans = []
+    for match in compiled.function_starts.finditer(code):
+        indent = len(match.group(1))
+        body_start = code.find('\n', match.end())
+        if body_start == -1:
+            end = len(code)
+        else:
+            block_end = _block_end(indent).search(code, body_start)
+            end = block_end.start() if block_end else len(code)
+        spans.append((match.start(), end))
+    return spans
+
+def _brace_blocks(
+    compiled: _CompiledSpec,
+    code: str,
+    openings: List[Tuple[int, int]],
+    closing: Dict[int, int]
+) -> List[Tuple[int, int]]:
+    """Spans of function bodies, from each header's opening brace to its match.
+
+    Headers are only tried on the text between an opening brace and the
+    previous brace or semicolon, so the whole file is never searched for them.
+    Unclosed braces (in a patch fragment) run to the end of the text.
+    """
+    spans = []
+    for previous, opening in openings:
+        start = max(code.rfind(';', previous, opening), previous) + 1
+        header = compiled.function_starts.search(code, start, opening + 1)
+        if header is not None and header.end() == opening + 1:
+            spans.append((header.start(), closing.get(opening, len(code))))
+    return spans
+
+def _scan_structure(
+    compiled: _CompiledSpec,
+    code: str,
+    functions: str
+) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Offsets of decision points and character spans of functions."""
+    decision_offsets = []
+    openings: List[Tuple[int, int]] = []  # (previous brace, opening brace)
+    closing: Dict[int, int] = {}
+    stack: List[int] = []
+    previous = -1
+    # One scan finds decisions and matches braces; comments and strings are
+    # matched too so that nothing inside them counts
+    for match in compiled.structure.finditer(code):
+        kind = match.lastgroup
+        if kind == 'd':
+            decision_offsets.append(match.start())
+        elif kind == 'b':
+            position = match.start()
+            if match.group() == '{':
+                openings.append((previous, position))
+                stack.append(position)
+            elif stack:
+                closing[stack.pop()] = position
+            previous = position
+    if functions == 'indent':
+        spans = _indent_blocks(compiled, code)
+    else:
+        spans = _brace_blocks(compiled, code, openings, closing)
+    return decision_offsets, spans
+
+def _function_complexities(compiled: _CompiledSpec, code: str, functions: str) -> List[int]:
+    """Complexity of each function: one plus the decisions inside its span."""
+    decision_offsets, spans = _scan_structure(compiled, code, functions)
+    return [
+        1 + bisect_left(decision_offsets, end) - bisect_left(decision_offsets, start)
+        for start, end in spans
+    ]
+
+def function_spans(filename: str, text: str) -> List[Tuple[int, int]]:
+    """First and last line (1-based, inclusive) of every function in a file."""
+    spec = spec_for(filename)
+    if not spec.functions:
+        return []
+    _, spans = _scan_structure(_compile(spec), text, spec.functions)
+    newlines = [match.start() for match in _NEWLINE.finditer(text)]
+    lines = []
+    for start, end in spans:
+        # Brace spans end on the closing brace; trailing blank lines are dropped
+        last = start + max(0, len(text[start:end + 1].rstrip()) - 1)
+        lines.append((bisect_left(newlines, start) + 1, bisect_left(newlines, last) + 1))
+    return lines
+
+def patch_post_image(patch: str) -> str:
+    """The kept and added lines of a unified-diff patch, without diff markers."""
+    return _PATCH_NOISE.sub('', patch)
+
+def scan_source(
+    text: str,
+    spec: LanguageSpec = GENERIC,
+    is_patch: bool = False,
+    with_line_hashes: bool = False
+) -> CodeStats:
+    """Scan source code (or the post-image of a patch) in one tokenizer pass."""
+    if is_patch:
+        text = patch_post_image(text)
+    compiled = _compile(spec)
+    stats = CodeStats(total_chars=len(text))
+
+    kinds = compiled.line_kinds.findall(text)
+    blank_lines = kinds.count('')
+    stats.lines_of_code = text.count('\n') + 1 - blank_lines
+    stats.comment_lines = len(kinds) - blank_lines
+
+    tally = Counter(compiled.tokens.findall(text))
+
+    decision_words = spec.decision_keywords | spec.decision_operators
+    keywords = spec.keywords
+    comment_markers = compiled.comment_markers
+    string_leads = compiled.string_leads
+    for value, count in tally.items():
+        first = value[0]
+        if value.startswith(comment_markers):
+            continue
+        if first.isalpha() or first in '_$':
+            if value in keywords:
+                stats.distinct_operators += 1
+                stats.total_operators += count
+            else:
+                stats.distinct_operands += 1
+                stats.total_operands += count
+        elif first.isdigit() or first in string_leads:
+            stats.distinct_operands += 1
+            stats.total_operands += count
+        else:
+            stats.distinct_operators += 1
+            stats.total_operators += count
+        if value in decision_words:
+            stats.decisions += count
+
+    if spec.functions:
+        stats.function_complexities = _function_complexities(compiled, text, spec.functions)
+
+    if with_line_hashes:
+        normalized = _WHITESPACE_RUN.sub(' ', text)
+        stats.line_hashes = [
+            hash(match.group().strip()) % HASH_MOD
+            for match in _LINE.finditer(normalized)
+        ]
+    return stats
+
+def scan_file(filename: str, text: str) -> CodeStats:
+    """Scan a complete file version with the table for its language."""
+    return scan_source(text, spec_for(filename))
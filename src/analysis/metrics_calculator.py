@@ -1,135 +1,195 @@
 # src/analysis/metrics_calculator.py
-from typing import List, Dict
-import ast
-import re
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, Callable, List, Dict, Optional
+import asyncio
+from ..storage.blob_store import BlobStore
 from ..utils.logging import get_logger
-from dataclasses import dataclass
-from collections import defaultdict
+from .clone_index import CloneIndex, CloneMatch
+from .diff_parser import parse_patch
+from .duplication import DuplicationDetector
+from .file_metrics import (
+    FileMetrics,
+    MetricOptions,
+    analyze_files,
+    chunk_changes,
+    worker_payload
+)
+from .metric_engine import scan_source
 
 logger = get_logger(__name__)
 
-@dataclass
-class FileMetrics:
-    complexity: float
-    maintainability: float
-    duplication_score: float
-    lines_of_code: int
-    comment_ratio: float
-
 class MetricsCalculator:
-    def __init__(self):
-        self.pattern_cache = {}
+    # Bump whenever metric definitions change so cached analyses are recomputed
+    VERSION = "6"
+
+    def __init__(
+        self,
+        min_duplicate_lines: int = 3,
+        normalize_whitespace: bool = True,
+        clone_index: Optional[CloneIndex] = None,
+        blob_store: Optional[BlobStore] = None,
+        executor: Optional[Executor] = None,
+        chunk_bytes: int = 256 * 1024
+    ):
+        self.options = MetricOptions(
+            min_duplicate_lines=min_duplicate_lines,
+            normalize_whitespace=normalize_whitespace
+        )
+        self.duplication_detector = DuplicationDetector(
+            min_block_lines=min_duplicate_lines,
+            normalize_whitespace=normalize_whitespace
+        )
+        self.clone_index = clone_index
+        self.blob_store = blob_store
+        # A ProcessPoolExecutor runs CPU-bound parsing in parallel; without
+        # one it runs on a thread. SQLite work always runs on a thread.
+        self.executor = executor
+        self.chunk_bytes = chunk_bytes
 
-    async def calculate_metrics(self, changes: List[Dict]) -> Dict:
-        """Calculate various code metrics for changes."""
+    async def calculate_metrics(
+        self,
+        changes: List[Dict],
+        committed_at: Optional[datetime] = None,
+        update_index: bool = True
+    ) -> Dict:
+        """Calculate various code metrics for changes.
+
+        Historical runs (backfills, trend jobs) pass update_index=False so
+        they query the clone index without rewriting it.
+        """
         try:
-            file_metrics = []
-            
-            for change in changes:
-                metrics = await self._analyze_file(change)
-                file_metrics.append(metrics)
+            file_metrics = await self._analyze_files(changes)
             
-            return self._aggregate_metrics(file_metrics)
+            result = self._aggregate_metrics(file_metrics)
+            if self.clone_index is not None:
+                matches = await self._in_thread(self._find_clones, changes, committed_at, update_index)
+                result['clones'] = [vars(match) for match in matches]
+            return result
             
         except Exception as e:
             logger.error(f"Error calculating metrics: {str(e)}")
             raise
 
+    @staticmethod
+    async def _in_thread(fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking work on the loop's default thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _payloads(self, changes: List[Dict]) -> List[Dict]:
+        return [
+            worker_payload(
+                change,
+                self._cached_content_stats(change.get('blob_before')),
+                self._cached_content_stats(change.get('blob_after'))
+            )
+            for change in changes
+        ]
+
+    def _store_results(self, changes: List[Dict], results: List) -> List[FileMetrics]:
+        file_metrics = []
+        for change, (metrics, content_stats) in zip(changes, results):
+            for side, stats in content_stats.items():
+                self._store_content_stats(change.get(f"blob_{side}"), stats)
+            file_metrics.append(metrics)
+        return file_metrics
+
+    async def _analyze_files(self, changes: List[Dict]) -> List[FileMetrics]:
+        """Compute per-file metrics off the event loop, in worker processes when an executor is set."""
+        payloads = await self._in_thread(self._payloads, changes)
+        
+        if self.executor is None:
+            results = await self._in_thread(analyze_files, payloads, self.options)
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = chunk_changes(payloads, self.chunk_bytes)
+            chunk_results = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, analyze_files, chunk, self.options)
+                for chunk in chunks
+            ))
+            results = [result for chunk in chunk_results for result in chunk]
+        
+        return await self._in_thread(self._store_results, changes, results)
+
     async def _analyze_file(self, change: Dict) -> FileMetrics:
         """Analyze metrics for a single file."""
-        code = change['patch']
-        
-        return FileMetrics(
-            complexity=self._calculate_complexity(code),
-            maintainability=self._calculate_maintainability(code),
-            duplication_score=self._find_duplications(code),
-            lines_of_code=self._count_lines(code),
-            comment_ratio=self._calculate_comment_ratio(code)
-        )
+        return (await self._analyze_files([change]))[0]
+
+    def _cached_content_stats(self, blob_sha: Optional[str]) -> Optional[Dict]:
+        """Content complexity memoized by blob SHA, so a file version is parsed once."""
+        if self.blob_store is None or not blob_sha:
+            return None
+        return self.blob_store.get_metrics(blob_sha, self.VERSION)
+
+    def _store_content_stats(self, blob_sha: Optional[str], stats: Dict) -> None:
+        if self.blob_store is None or not blob_sha:
+            return
+        self.blob_store.put_metrics(blob_sha, self.VERSION, stats)
+
+    def _find_clones(
+        self,
+        changes: List[Dict],
+        committed_at: Optional[datetime] = None,
+        update_index: bool = True
+    ) -> List[CloneMatch]:
+        """Index the touched files, then look up added code from other files.
+
+        Full post-images are indexed when available, otherwise the fragments
+        visible in the patch; everything is indexed before querying so copies
+        between files of the same commit are found too. The index keeps the
+        newest version of each file, so analyzing an older commit leaves it as is.
+        """
+        timestamp = committed_at.timestamp() if committed_at is not None else None
+        hunks_by_file = {}
+        for change in changes:
+            filename = change['filename']
+            if change.get('status') == 'removed':
+                if update_index:
+                    self.clone_index.remove_file(filename, committed_at=timestamp)
+                continue
+            hunks_by_file[filename] = parse_patch(change['patch'])
+            if not update_index:
+                continue
+            if change.get('content_after') is not None:
+                self.clone_index.index_file(
+                    filename, change['content_after'],
+                    ref=change.get('blob_after'), committed_at=timestamp
+                )
+            else:
+                self.clone_index.index_segments(
+                    filename, [hunk.post_image() for hunk in hunks_by_file[filename]],
+                    ref=change.get('blob_after'), committed_at=timestamp
+                )
+
+        matches: List[CloneMatch] = []
+        for filename, hunks in hunks_by_file.items():
+            for hunk in hunks:
+                added = hunk.added_lines()
+                if added:
+                    matches.extend(
+                        self.clone_index.find_clones(filename, added, exclude_path=filename)
+                    )
+        return matches
 
     def _calculate_complexity(self, code: str) -> float:
         """Calculate cyclomatic complexity."""
-        try:
-            tree = ast.parse(code)
-            complexity = 1  # Base complexity
-            
-            for node in ast.walk(tree):
-                # Increment for control flow statements
-                if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                    complexity += 1
-                # Increment for logical operators
-                elif isinstance(node, ast.BoolOp):
-                    complexity += len(node.values) - 1
-                # Increment for comprehensions
-                elif isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp)):
-                    complexity += 1
-                    
-            return complexity
-            
-        except SyntaxError:
-            # If we can't parse as Python, use simplified metric
-            return code.count('if ') + code.count('while ') + code.count('for ')
+        return scan_source(code).complexity
 
     def _calculate_maintainability(self, code: str) -> float:
         """Calculate maintainability index."""
-        # Simplified implementation of maintainability index
-        loc = self._count_lines(code)
-        avg_line_length = len(code) / (loc or 1)
-        comment_ratio = self._calculate_comment_ratio(code)
-        
-        # Higher is better, scale 0-100
-        maintainability = 100 - (
-            (loc * 0.25) +
-            (avg_line_length * 0.3) +
-            (100 - comment_ratio * 100) * 0.2
-        )
-        
-        return max(0, min(100, maintainability))
+        return scan_source(code).maintainability_index
 
     def _find_duplications(self, code: str) -> float:
         """Detect code duplications."""
-        MIN_DUPLICATE_LENGTH = 3  # minimum lines to consider as duplication
-        lines = code.split('\n')
-        total_lines = len(lines)
-        
-        if total_lines < MIN_DUPLICATE_LENGTH:
-            return 0
-            
-        duplicated_lines = set()
-        
-        for i in range(len(lines) - MIN_DUPLICATE_LENGTH + 1):
-            chunk = '\n'.join(lines[i:i + MIN_DUPLICATE_LENGTH])
-            pattern = self.pattern_cache.get(chunk)
-            
-            if not pattern:
-                pattern = re.compile(re.escape(chunk))
-                self.pattern_cache[chunk] = pattern
-                
-            matches = pattern.finditer(code)
-            match_count = sum(1 for _ in matches)
-            
-            if match_count > 1:
-                for j in range(i, i + MIN_DUPLICATE_LENGTH):
-                    duplicated_lines.add(j)
-                    
-        duplication_percentage = len(duplicated_lines) / total_lines * 100
-        return duplication_percentage
+        return self.duplication_detector.duplication_score(code)
 
     def _count_lines(self, code: str) -> int:
         """Count non-empty lines of code."""
-        return len([line for line in code.split('\n') if line.strip()])
+        return scan_source(code).lines_of_code
 
     def _calculate_comment_ratio(self, code: str) -> float:
         """Calculate ratio of comments to code."""
-        lines = code.split('\n')
-        comment_lines = sum(
-            1 for line in lines 
-            if line.strip().startswith(('#', '//')) or 
-               '/*' in line or 
-               '*/' in line
-        )
-        total_lines = self._count_lines(code)
-        return comment_lines / (total_lines or 1)
+        return scan_source(code).comment_ratio
 
     def _aggregate_metrics(self, file_metrics: List[FileMetrics]) -> Dict:
         """Aggregate metrics from multiple files."""
@@ -139,7 +199,9 @@ class MetricsCalculator:
                 'maintainability_index': 100,
                 'duplication_percentage': 0,
                 'total_lines': 0,
-                'avg_comment_ratio': 0
+                'avg_comment_ratio': 0,
+                'complexity_delta': 0,
+                'halstead_volume': 0
             }
             
         return {
@@ -147,5 +209,7 @@ class MetricsCalculator:
             'maintainability_index': sum(m.maintainability for m in file_metrics) / len(file_metrics),
             'duplication_percentage': max(m.duplication_score for m in file_metrics),
             'total_lines': sum(m.lines_of_code for m in file_metrics),
-            'avg_comment_ratio': sum(m.comment_ratio for m in file_metrics) / len(file_metrics)
-        }
\ No newline at end of file
+            'avg_comment_ratio': sum(m.comment_ratio for m in file_metrics) / len(file_metrics),
+            'complexity_delta': sum(m.complexity_delta for m in file_metrics),
+            'halstead_volume': sum(m.halstead_volume for m in file_metrics)
+        }
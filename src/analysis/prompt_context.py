@@ -0,0 +1,322 @@
+# src/analysis/prompt_context.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+import re
+from .diff_parser import Hunk, parse_patch
+from .metric_engine import function_spans
+from ..api.prompt_chunker import estimate_tokens, render_section
+
+# (marker, text, old line number, new line number)
+Row = Tuple[str, str, int, int]
+
+CALLED_NAME = re.compile(r'([A-Za-z_$][\w$]*)\s*\(')
+DEFINITION_LINE = re.compile(
+    r'^\s*(?:(?:public|private|protected|static|async|export|override|virtual)\s+)*'
+    r'(?:def|class|func|function|interface|struct)\b'
+)
+# Words that precede a parameter list in a signature without being its name
+SIGNATURE_KEYWORDS = frozenset({'def', 'func', 'function', 'async', 'if', 'for', 'while', 'switch'})
+
+@dataclass
+class ContextStats:
+    files: int = 0
+    minimized_files: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def add(self, other: 'ContextStats') -> None:
+        self.files += other.files
+        self.minimized_files += other.minimized_files
+        self.tokens_before += other.tokens_before
+        self.tokens_after += other.tokens_after
+
+def _definition_name(signature: str) -> Optional[str]:
+    for name in CALLED_NAME.findall(signature):
+        if name not in SIGNATURE_KEYWORDS:
+            return name
+    return None
+
+class PromptContextBuilder:
+    """Reduce each patch to what the model needs to review it.
+
+    Changes inside a function of the post-image are sent as that whole
+    function, with the changes marked, so the model reviews complete units
+    instead of diff fragments; a function nested in another changed one is
+    sent as part of the outer function. Functions longer than
+    `max_unit_lines` or larger than the patch itself, and changes outside
+    any function, are cut down to the changed lines plus `context_lines` of
+    context from the same function, labelled with its
+    signature (like git's funcname hunk context). Long runs of removed lines
+    are summarized by their definitions. Signatures of functions in the same
+    file that the added lines call are appended, so the model sees their
+    parameters without their bodies.
+    """
+
+    # Bump when the minimized format changes so cached analyses are recomputed
+    VERSION = "3"
+    REMOVED_RUN_HEAD = 3
+
+    def __init__(
+        self,
+        context_lines: int = 1,
+        max_removed_lines: int = 12,
+        max_referenced: int = 10,
+        max_unit_lines: int = 60
+    ):
+        self.context_lines = context_lines
+        self.max_removed_lines = max_removed_lines
+        self.max_referenced = max_referenced
+        self.max_unit_lines = max_unit_lines
+        self.totals = ContextStats()
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the minimization settings in cache keys."""
+        return (
+            f"{self.VERSION}-{self.context_lines}-{self.max_removed_lines}"
+            f"-{self.max_referenced}-{self.max_unit_lines}"
+        )
+
+    def build(self, changes: List[Dict]) -> Tuple[List[Dict], ContextStats]:
+        """Return copies of the changes with minimized patches, and the token savings."""
+        stats = ContextStats()
+        minimized = []
+        for change in changes:
+            patch = self.minimize_patch(change['filename'], change['patch'], change.get('content_after'))
+            before = estimate_tokens(render_section(change['filename'], change['patch']))
+            after = estimate_tokens(render_section(change['filename'], patch))
+            if after > before:
+                # Referenced signatures can outgrow a small patch; send it as is
+                patch, after = change['patch'], before
+            stats.files += 1
+            stats.minimized_files += patch != change['patch']
+            stats.tokens_before += before
+            stats.tokens_after += after
+            minimized.append(dict(change, patch=patch))
+        self.totals.add(stats)
+        return minimized, stats
+
+    def minimize_patch(self, filename: str, patch: str, content_after: Optional[str] = None) -> str:
+        """Minimize one file's patch; the post-image, if given, provides function context."""
+        hunks = parse_patch(patch)
+        if not hunks:
+            return patch
+        lines = content_after.split('\n') if content_after is not None else []
+        spans = function_spans(filename, content_after) if content_after else []
+
+        # (post-image line, rendered text), put in file order at the end
+        pieces: List[Tuple[int, str]] = []
+        shown: Set[Tuple[int, int]] = set()
+        numbered = [self._number(hunk) for hunk in hunks]
+        units: Dict[Tuple[int, int], List[Row]] = {}
+        for rows in numbered:
+            for row in rows:
+                span = self._enclosing(spans, row[3]) if row[0] != ' ' else None
+                if span is not None and span[1] - span[0] < self.max_unit_lines:
+                    units.setdefault(span, []).append(row)
+
+        # A unit is only worth sending whole while it is no larger than the patch
+        budget = estimate_tokens(patch)
+        in_units: Set[Row] = set()
+        for span, (changed, nested) in self._merge_nested(units).items():
+            text = self._render_unit(span, changed, lines, hunks)
+            if estimate_tokens(text) > budget:
+                continue
+            in_units.update(changed)
+            shown.add(span)
+            shown.update(nested)
+            pieces.append((span[0], text))
+
+        added = []
+        for rows in numbered:
+            added.extend(text for marker, text, _, _ in rows if marker == '+')
+            trimmed = [i for i, row in enumerate(rows) if row[0] != ' ' and row not in in_units]
+            for run in self._runs(rows, spans, trimmed):
+                span = self._enclosing(spans, self._anchor(run))
+                if span is not None:
+                    shown.add(span)
+                signature = lines[span[0] - 1].strip() if span else ''
+                pieces.append((self._anchor(run), self._render_run(run, signature)))
+
+        pieces.sort(key=lambda piece: piece[0])
+        texts = [text for _, text in pieces]
+        referenced = self._referenced(spans, lines, shown, '\n'.join(added))
+        if referenced:
+            texts.append("Referenced definitions:\n" + '\n'.join(referenced))
+        return '\n'.join(texts)
+
+    @staticmethod
+    def _number(hunk: Hunk) -> List[Row]:
+        rows = []
+        old_no, new_no = hunk.old_start, hunk.new_start
+        for marker, text in hunk.lines:
+            rows.append((marker, text, old_no, new_no))
+            if marker != '+':
+                old_no += 1
+            if marker != '-':
+                new_no += 1
+        return rows
+
+    @staticmethod
+    def _enclosing(spans: List[Tuple[int, int]], line_no: int) -> Optional[Tuple[int, int]]:
+        """Innermost function containing a post-image line."""
+        containing = [span for span in spans if span[0] <= line_no <= span[1]]
+        return min(containing, key=lambda span: span[1] - span[0]) if containing else None
+
+    @staticmethod
+    def _merge_nested(
+        units: Dict[Tuple[int, int], List[Row]]
+    ) -> Dict[Tuple[int, int], Tuple[List[Row], List[Tuple[int, int]]]]:
+        """Fold units that sit inside another unit into the outermost one.
+
+        Maps each outermost span to its changed rows, in patch order, and the
+        nested spans it absorbed.
+        """
+        merged: Dict[Tuple[int, int], Tuple[List[Row], List[Tuple[int, int]]]] = {}
+        for span in sorted(units, key=lambda span: (span[0], -span[1])):
+            outer = next(
+                (known for known in merged if known[0] <= span[0] and span[1] <= known[1]),
+                None
+            )
+            if outer is None:
+                merged[span] = (list(units[span]), [])
+            else:
+                merged[outer][0].extend(units[span])
+                merged[outer][1].append(span)
+        for changed, _ in merged.values():
+            changed.sort(key=lambda row: (row[3], row[2]))
+        return merged
+
+    @staticmethod
+    def _anchor(run: List[Row]) -> int:
+        """Post-image line of the first change in a run."""
+        for marker, _, _, new_no in run:
+            if marker != ' ':
+                return new_no
+        return run[0][3]
+
+    def _runs(self, rows: List[Row], spans: List[Tuple[int, int]], changed: List[int]) -> List[List[Row]]:
+        """The given changed rows plus nearby context rows from the same function, split into runs."""
+        keep = set(changed)
+        for i in changed:
+            unit = self._enclosing(spans, rows[i][3])
+            for j in range(max(0, i - self.context_lines), min(len(rows), i + self.context_lines + 1)):
+                if rows[j][0] == ' ' and self._enclosing(spans, rows[j][3]) == unit:
+                    keep.add(j)
+        runs: List[List[Row]] = []
+        previous = None
+        for i in sorted(keep):
+            if previous is None or i != previous + 1:
+                runs.append([])
+            runs[-1].append(rows[i])
+            previous = i
+        return runs
+
+    def _render_run(self, run: List[Row], signature: str) -> str:
+        old_count = sum(1 for marker, _, _, _ in run if marker != '+')
+        new_count = sum(1 for marker, _, _, _ in run if marker != '-')
+        header = f"@@ -{run[0][2]},{old_count} +{run[0][3]},{new_count} @@"
+        if signature:
+            header += f" {signature}"
+        body = []
+        removed: List[str] = []
+        for marker, text, _, _ in run:
+            if marker == '-':
+                removed.append(text)
+                continue
+            body.extend(self._summarize_removed(removed))
+            removed = []
+            body.append(marker + text)
+        body.extend(self._summarize_removed(removed))
+        return '\n'.join([header] + body)
+
+    @staticmethod
+    def _old_number(hunks: List[Hunk], new_no: int) -> int:
+        """Parent line number of a post-image line that is not in any hunk."""
+        delta = 0
+        for hunk in hunks:
+            # With an empty new side, new_start names the line before the hunk
+            last = hunk.new_start + hunk.new_count - 1 if hunk.new_count else hunk.new_start
+            if last < new_no:
+                delta += hunk.old_count - hunk.new_count
+        return new_no + delta
+
+    def _render_unit(
+        self,
+        span: Tuple[int, int],
+        changed: List[Row],
+        lines: List[str],
+        hunks: List[Hunk]
+    ) -> str:
+        """A whole function of the post-image, with its added and removed lines marked."""
+        start, end = span
+        added = {new_no for marker, _, _, new_no in changed if marker == '+'}
+        removed: Dict[int, List[str]] = {}
+        old_numbers = []
+        for marker, text, old_no, new_no in changed:
+            if marker == '-':
+                removed.setdefault(new_no, []).append(text)
+                old_numbers.append(old_no)
+
+        context = {
+            new_no: old_no
+            for hunk in hunks
+            for marker, _, old_no, new_no in self._number(hunk)
+            if marker == ' '
+        }
+        body = []
+        unchanged = 0
+        for line_no in range(start, end + 1):
+            body.extend(self._summarize_removed(removed.get(line_no, [])))
+            if line_no in added:
+                body.append('+' + lines[line_no - 1])
+                continue
+            if unchanged == 0:
+                old_numbers.append(context.get(line_no) or self._old_number(hunks, line_no))
+            unchanged += 1
+            body.append(' ' + lines[line_no - 1])
+
+        old_count = unchanged + sum(len(texts) for texts in removed.values())
+        old_start = min(old_numbers) if old_numbers else self._old_number(hunks, start)
+        header = f"@@ -{old_start},{old_count} +{start},{end - start + 1} @@"
+        return '\n'.join([header] + body)
+
+    def _summarize_removed(self, removed: List[str]) -> List[str]:
+        """Keep short removals; reduce long ones to their first lines and definitions."""
+        if len(removed) <= self.max_removed_lines:
+            return ['-' + text for text in removed]
+        head = removed[:self.REMOVED_RUN_HEAD]
+        definitions = [
+            text for text in removed[self.REMOVED_RUN_HEAD:] if DEFINITION_LINE.match(text)
+        ][:self.max_removed_lines - self.REMOVED_RUN_HEAD]
+        omitted = len(removed) - len(head) - len(definitions)
+        return (
+            ['-' + text for text in head + definitions]
+            + [f"-... ({omitted} more removed lines)"]
+        )
+
+    def _referenced(
+        self,
+        spans: List[Tuple[int, int]],
+        lines: List[str],
+        shown: Set[Tuple[int, int]],
+        added: str
+    ) -> List[str]:
+        """Signatures of same-file functions called from added lines and not shown already."""
+        called = set(CALLED_NAME.findall(added))
+        if not called:
+            return []
+        referenced = []
+        for span in spans:
+            if span in shown:
+                continue
+            signature = lines[span[0] - 1].strip()
+            if _definition_name(signature) in called:
+                referenced.append(f"line {span[0]}: {signature}")
+                if len(referenced) >= self.max_referenced:
+                    break
+        return referenced
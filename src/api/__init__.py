@@ -2,7 +2,27 @@
 """
 API services for external integrations with GitHub and OpenAI.
 """
-from .github_service import GitHubService
-from .openai_service import OpenAIService
+from importlib import import_module
 
-__all__ = ['GitHubService', 'OpenAIService']
\ No newline at end of file
+# Loaded on first access: the GitHub modules should not import openai, nor the
+# OpenAI ones PyGithub
+_EXPORTS = {
+    'GitHubClient': '.github_client',
+    'GitHubAPIError': '.github_client',
+    'GitHubService': '.github_service',
+    'OpenAIService': '.openai_service',
+    'IncrementalJSONParser': '.json_stream',
+    'OpenAIBatchClient': '.openai_batch',
+    'BatchAPIError': '.openai_batch',
+    'ResponseParser': '.response_parser',
+    'ParsedAnalysis': '.response_parser',
+    'ParseStats': '.response_parser',
+    'GitHubWebhookReceiver': '.webhooks'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
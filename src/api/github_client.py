@@ -0,0 +1,232 @@
+# src/api/github_client.py
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import json as jsonlib
+import re
+import time
+import aiohttp
+from ..storage.response_cache import ResponseCache
+from ..utils.logging import get_logger
+from ..utils.rate_limiter import RateLimitScheduler, parse_retry_after
+from ..utils.telemetry import get_telemetry
+
+logger = get_logger(__name__)
+
+_responses = get_telemetry().counter(
+    'github_http_responses_total', "GitHub API responses by status code", ['status']
+)
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API answers with an error status."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict] = None):
+        super().__init__(f"GitHub API error {status}: {message}")
+        self.status = status
+        self.headers = headers or {}
+
+class GitHubClient:
+    """Minimal asyncio GitHub REST client on top of a pooled aiohttp session.
+
+    The session is created lazily inside the running event loop and reused for
+    every request, so concurrent calls share keep-alive connections instead of
+    opening a new TLS connection each time. With a ResponseCache, GET requests
+    are revalidated with ETag/Last-Modified and 304 answers reuse the stored
+    body, which GitHub does not count against the rate limit.
+    """
+
+    API_URL = "https://api.github.com"
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = API_URL,
+        pool_size: int = 20,
+        timeout: float = 30.0,
+        response_cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        max_rate_limit_retries: int = 3
+    ):
+        self.token = token
+        self.response_cache = response_cache
+        self.scheduler = scheduler
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _default_headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f"Bearer {self.token}",
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28',
+            'User-Agent': 'ShekaraCode'
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it for the current event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._default_headers(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self._session
+
+    def _url(self, path: str) -> str:
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict] = None
+    ) -> Tuple[int, Dict, str]:
+        """Send a request and return status, headers and body text.
+
+        With a scheduler, each request waits for rate-limit budget first and
+        rate-limited answers are retried once the reported window allows it.
+        """
+        session = await self._get_session()
+        bucket = 'github_graphql' if path == 'graphql' else 'github'
+        for attempt in range(self.max_rate_limit_retries + 1):
+            if self.scheduler is not None:
+                await self.scheduler.acquire(bucket)
+            async with session.request(
+                method, self._url(path), params=params, json=json, headers=headers
+            ) as response:
+                text = await response.text()
+                # Lower-cased so lookups do not depend on the server's header casing
+                response_headers = {k.lower(): v for k, v in response.headers.items()}
+                status = response.status
+            _responses.inc(status=status)
+            if self.scheduler is not None:
+                self.scheduler.update_from_github_headers(response_headers)
+                delay = self._rate_limit_delay(status, response_headers)
+                if delay is not None and attempt < self.max_rate_limit_retries:
+                    self.scheduler.pause(bucket, delay)
+                    continue
+            if status >= 400:
+                raise GitHubAPIError(status, text[:200], response_headers)
+            return status, response_headers, text
+        raise GitHubAPIError(status, text[:200], response_headers)
+
+    @staticmethod
+    def _rate_limit_delay(status: int, headers: Dict) -> Optional[float]:
+        """Return how long to wait before retrying a rate-limited response."""
+        if status not in (403, 429):
+            return None
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            return retry_after
+        if headers.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in headers:
+            return max(0.0, float(headers['x-ratelimit-reset']) - time.time())
+        # A plain 403 is a permission problem, not a rate limit
+        return None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict] = None
+    ) -> Any:
+        """Send a request and return the decoded JSON body."""
+        status, _, text = await self._send(method, path, params, json, headers)
+        if status == 204 or not text:
+            return None
+        return jsonlib.loads(text)
+
+    async def get_json(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        immutable: bool = False
+    ) -> Any:
+        """GET a REST resource and return the decoded JSON body.
+
+        immutable marks resources that never change once created (e.g. a
+        commit addressed by full SHA); cached copies are then served without
+        revalidation.
+        """
+        if self.response_cache is None:
+            return await self.request('GET', path, params=params)
+
+        cache = self.response_cache
+        key = self._cache_key(path, params)
+        cached = cache.get(key)
+        headers = {}
+        if cached is not None:
+            if immutable or cached.is_fresh:
+                cache.hits += 1
+                return jsonlib.loads(cached.body)
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        status, response_headers, text = await self._send(
+            'GET', path, params=params, headers=headers
+        )
+        max_age = self._max_age(response_headers)
+        if status == 304 and cached is not None:
+            cache.revalidated += 1
+            cache.refresh(key, max_age)
+            return jsonlib.loads(cached.body)
+
+        cache.misses += 1
+        etag = response_headers.get('etag')
+        last_modified = response_headers.get('last-modified')
+        if etag or last_modified:
+            cache.put(key, text, etag, last_modified, max_age)
+        return jsonlib.loads(text) if text else None
+
+    def _cache_key(self, path: str, params: Optional[Dict]) -> str:
+        url = self._url(path)
+        if params:
+            url += '?' + urlencode(sorted(params.items()))
+        # Responses depend on who is asking, so the token is part of the key
+        token_hash = hashlib.sha256(self.token.encode('utf-8')).hexdigest()[:16]
+        return hashlib.sha256(f"{token_hash}|{url}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _max_age(headers: Dict) -> float:
+        match = re.search(r'max-age=(\d+)', headers.get('cache-control', ''))
+        return float(match.group(1)) if match else 0.0
+
+    async def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Run a GraphQL query and return its data block."""
+        payload = await self.request(
+            'POST', 'graphql', json={'query': query, 'variables': variables or {}}
+        )
+        if payload.get('errors'):
+            messages = '; '.join(error.get('message', '') for error in payload['errors'])
+            raise GitHubAPIError(200, messages)
+        return payload['data']
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
@@ -1,33 +1,139 @@
 # src/api/github_service.py
-from typing import List, Dict, Optional
-from github import Github
-from github.Repository import Repository
-from github.GithubException import GithubException, UnknownObjectException
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 import asyncio
-from functools import lru_cache
+import base64
+import os
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import quote
 from ..models.commit import CommitModel
+from .github_client import GitHubClient
+from ..storage.response_cache import ResponseCache
+from ..utils.rate_limiter import RateLimitScheduler, get_rate_limiter
+from ..utils.single_flight import SingleFlight
 from ..utils.logging import get_logger
+from ..utils.telemetry import instrumented
 from ..config.settings import Settings
 
+if TYPE_CHECKING:
+    from github import Github
+    from github.Repository import Repository
+
 logger = get_logger(__name__)
 
+SUPPORTED_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.cs', '.go')
+
+# One page of default-branch history with everything CommitModel needs
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { name date }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+GRAPHQL_PAGE_SIZE = 100
+
 class GitHubService:
-    def __init__(self, settings: Settings):
+    COMMIT_CACHE_SIZE = 100
+
+    def __init__(
+        self,
+        settings: Settings,
+        client: Optional[GitHubClient] = None,
+        scheduler: Optional[RateLimitScheduler] = None
+    ):
         logger.info(f"Initializing GitHub service for repo: {settings.repository_name}")
         try:
-            self.github = Github(settings.github_token)
-            self._repo: Optional[Repository] = None
+            self._github: Optional['Github'] = None
+            self._repo: Optional['Repository'] = None
             self.settings = settings
-            # Проверяем валидность токена
-            self.github.get_user().login
-            logger.info("GitHub authentication successful")
+            self.scheduler = scheduler or get_rate_limiter()
+            self.scheduler.configure(
+                'github',
+                capacity=settings.github_burst_size,
+                rate_per_second=settings.github_requests_per_hour / 3600
+            )
+            self.client = client or GitHubClient(
+                settings.github_token,
+                base_url=settings.github_api_url,
+                pool_size=settings.github_pool_size,
+                timeout=settings.github_timeout,
+                response_cache=self._create_response_cache(settings),
+                scheduler=self.scheduler
+            )
+            # Commit payloads are immutable per SHA, so they are safe to keep
+            self._commit_cache: OrderedDict = OrderedDict()
+            # Concurrent requests for the same commit or file share one fetch
+            self._commit_flights = SingleFlight('github_commits')
+            self._content_flights = SingleFlight('github_contents')
+            # Set by validate_credentials(), which callers run in the background
+            self.authenticated_as: Optional[str] = None
         except Exception as e:
             logger.error(f"Failed to initialize GitHub service: {str(e)}")
             raise
         
+    @staticmethod
+    def _create_response_cache(settings: Settings) -> Optional[ResponseCache]:
+        if not settings.github_response_cache:
+            return None
+        return ResponseCache(
+            os.path.join(settings.cache_dir, 'github_responses.sqlite3'),
+            max_entries=settings.github_response_cache_max_entries
+        )
+
+    def cache_stats(self) -> Dict:
+        """Return hit/revalidate/miss counts of the HTTP response cache."""
+        if self.client.response_cache is None:
+            return {}
+        return self.client.response_cache.stats()
+
+    def coalescing_stats(self) -> Dict:
+        """Return how many fetches were shared with an identical one in flight."""
+        return {
+            flight.name: flight.stats()
+            for flight in (self._commit_flights, self._content_flights)
+        }
+
+    @instrumented('github')
+    async def validate_credentials(self) -> str:
+        """Check the token against the API and return the login it belongs to."""
+        try:
+            user = await self.client.request('GET', 'user')
+            self.authenticated_as = user['login']
+            logger.info(f"GitHub authentication successful as {self.authenticated_as}")
+            return self.authenticated_as
+        except Exception as e:
+            logger.error(f"GitHub authentication failed: {str(e)}")
+            raise
+
+    @property
+    def github(self) -> 'Github':
+        """PyGithub client, imported and created on first use."""
+        if self._github is None:
+            from github import Github
+            self._github = Github(self.settings.github_token)
+        return self._github
+
     @property
-    def repo(self) -> Repository:
+    def repo(self) -> 'Repository':
         if not self._repo:
+            from github.GithubException import GithubException, UnknownObjectException
             try:
                 logger.info(f"Attempting to get repository: {self.settings.repository_name}")
                 self._repo = self.github.get_repo(self.settings.repository_name)
@@ -43,39 +149,75 @@ class GitHubService:
                 raise
         return self._repo
         
-    @lru_cache(maxsize=100)
+    @property
+    def repo_path(self) -> str:
+        """REST path of the configured repository."""
+        return f"repos/{self.settings.repository_name}"
+
+    async def _fetch_commit(self, commit_sha: str) -> Dict:
+        """Fetch the full commit payload (stats and files), cached by SHA."""
+        cached = self._commit_cache.get(commit_sha)
+        if cached is not None:
+            self._commit_cache.move_to_end(commit_sha)
+            return cached
+        return await self._commit_flights.run(
+            commit_sha, lambda: self._download_commit(commit_sha)
+        )
+
+    async def _download_commit(self, commit_sha: str) -> Dict:
+        # Only full SHAs are immutable; branch names and short SHAs are not cached
+        payload = await self.client.get_json(
+            f"{self.repo_path}/commits/{commit_sha}",
+            immutable=len(commit_sha) == 40
+        )
+        if payload.get('sha') == commit_sha:
+            self._commit_cache[commit_sha] = payload
+            if len(self._commit_cache) > self.COMMIT_CACHE_SIZE:
+                self._commit_cache.popitem(last=False)
+        return payload
+
+    @staticmethod
+    def _parse_datetime(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+    def _to_commit_model(self, payload: Dict) -> CommitModel:
+        author = payload['commit']['author']
+        return CommitModel(
+            sha=payload['sha'],
+            message=payload['commit']['message'],
+            author=author['name'],
+            date=self._parse_datetime(author['date']),
+            stats=payload.get('stats', {})
+        )
+
+    @instrumented('github')
     async def get_commit(self, commit_sha: str) -> CommitModel:
         """Get commit details with caching."""
         try:
             logger.info(f"Fetching commit: {commit_sha}")
-            commit = self.repo.get_commit(commit_sha)
-            return CommitModel(
-                sha=commit.sha,
-                message=commit.commit.message,
-                author=commit.commit.author.name,
-                date=commit.commit.author.date,
-                stats=commit.stats
-            )
+            payload = await self._fetch_commit(commit_sha)
+            return self._to_commit_model(payload)
         except Exception as e:
             logger.error(f"Error fetching commit {commit_sha}: {str(e)}")
             raise
             
+    @instrumented('github')
     async def get_commit_changes(self, commit_sha: str) -> List[Dict]:
         """Get code changes from commit."""
         try:
-            commit = self.repo.get_commit(commit_sha)
+            payload = await self._fetch_commit(commit_sha)
             changes = []
             
-            for file in commit.files:
-                if file.patch and file.filename.endswith(
-                    ('.py', '.js', '.ts', '.java', '.cpp', '.cs', '.go')
-                ):
+            for file in payload.get('files', []):
+                if file.get('patch') and file['filename'].endswith(SUPPORTED_EXTENSIONS):
                     changes.append({
-                        'filename': file.filename,
-                        'patch': file.patch,
-                        'additions': file.additions,
-                        'deletions': file.deletions,
-                        'status': file.status
+                        'filename': file['filename'],
+                        'patch': file['patch'],
+                        'additions': file['additions'],
+                        'deletions': file['deletions'],
+                        'status': file['status'],
+                        'sha': file.get('sha'),
+                        'previous_filename': file.get('previous_filename')
                     })
             logger.info(f"Found {len(changes)} files with changes in commit {commit_sha}")
             return changes
@@ -83,42 +225,161 @@ class GitHubService:
             logger.error(f"Error getting commit changes: {str(e)}")
             raise
         
-    async def get_recent_commits(self, limit: int = 10) -> List[CommitModel]:
-        """Get recent commits."""
+    @instrumented('github')
+    async def get_commit_parents(self, commit_sha: str) -> List[str]:
+        """Return the parent SHAs of a commit."""
+        payload = await self._fetch_commit(commit_sha)
+        return [parent['sha'] for parent in payload.get('parents', [])]
+
+    @instrumented('github')
+    async def get_blob(self, blob_sha: str) -> str:
+        """Download a file's content by git blob SHA."""
         try:
-            logger.info(f"Fetching {limit} recent commits")
-            commits = []
-            for commit in self.repo.get_commits()[:limit]:
-                commits.append(
-                    CommitModel(
-                        sha=commit.sha,
-                        message=commit.commit.message,
-                        author=commit.commit.author.name,
-                        date=commit.commit.author.date,
-                        stats=commit.stats
-                    )
+            # Blobs are cached by the caller's BlobStore, not the response cache
+            payload = await self._content_flights.run(
+                ('blob', blob_sha),
+                lambda: self.client.request('GET', f"{self.repo_path}/git/blobs/{blob_sha}")
+            )
+            return self._decode_content(payload)
+        except Exception as e:
+            logger.error(f"Error fetching blob {blob_sha}: {str(e)}")
+            raise
+
+    @instrumented('github')
+    async def get_file_content(self, path: str, ref: str) -> Tuple[str, str]:
+        """Return (blob SHA, content) of a file at the given ref."""
+        try:
+            payload = await self._content_flights.run(
+                ('contents', path, ref),
+                lambda: self.client.request(
+                    'GET', f"{self.repo_path}/contents/{quote(path)}", params={'ref': ref}
                 )
+            )
+            if payload.get('encoding') != 'base64':
+                # Files over 1 MB come without inline content
+                return payload['sha'], await self.get_blob(payload['sha'])
+            return payload['sha'], self._decode_content(payload)
+        except Exception as e:
+            logger.error(f"Error fetching {path} at {ref}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _decode_content(payload: Dict) -> str:
+        return base64.b64decode(payload['content']).decode('utf-8', errors='replace')
+
+    async def _list_commit_shas(self, limit: int) -> List[str]:
+        """List the SHAs of the most recent commits on the default branch."""
+        shas: List[str] = []
+        page = 1
+        per_page = min(max(limit, 1), 100)
+        while len(shas) < limit:
+            listing = await self.client.get_json(
+                f"{self.repo_path}/commits",
+                params={'per_page': per_page, 'page': page}
+            )
+            shas.extend(item['sha'] for item in listing)
+            if len(listing) < per_page:
+                break
+            page += 1
+        return shas[:limit]
+
+    @instrumented('github')
+    async def list_commit_shas(self, limit: int) -> List[str]:
+        """SHAs of up to `limit` commits on the default branch, newest first."""
+        try:
+            return await self._list_commit_shas(limit)
+        except Exception as e:
+            logger.error(f"Error listing commits: {str(e)}")
+            raise
+
+    @instrumented('github')
+    async def get_recent_commits(
+        self,
+        limit: int = 10,
+        backend: Optional[str] = None
+    ) -> List[CommitModel]:
+        """Get recent commits.
+
+        The graphql backend fetches up to 100 commits with stats per request;
+        the rest backend lists SHAs and then fetches each commit's details.
+        """
+        backend = backend or self.settings.github_commits_backend
+        try:
+            logger.info(f"Fetching {limit} recent commits via {backend}")
+            if backend == 'graphql':
+                commits = await self._get_recent_commits_graphql(limit)
+            elif backend == 'rest':
+                commits = await self._get_recent_commits_rest(limit)
+            else:
+                raise ValueError(f"Unknown commits backend: {backend}")
             logger.info(f"Successfully fetched {len(commits)} commits")
             return commits
         except Exception as e:
             logger.error(f"Error fetching recent commits: {str(e)}")
             raise
+
+    async def _get_recent_commits_rest(self, limit: int) -> List[CommitModel]:
+        shas = await self._list_commit_shas(limit)
+        # The listing has no stats, so commit details are fetched concurrently
+        payloads = await asyncio.gather(*(self._fetch_commit(sha) for sha in shas))
+        return [self._to_commit_model(payload) for payload in payloads]
+
+    async def _get_recent_commits_graphql(self, limit: int) -> List[CommitModel]:
+        owner, name = self.settings.repository_name.split('/', 1)
+        commits: List[CommitModel] = []
+        cursor = None
+        while len(commits) < limit:
+            data = await self.client.graphql(COMMIT_HISTORY_QUERY, {
+                'owner': owner,
+                'name': name,
+                'first': min(GRAPHQL_PAGE_SIZE, limit - len(commits)),
+                'after': cursor
+            })
+            branch = data['repository']['defaultBranchRef']
+            if branch is None:
+                break
+            history = branch['target']['history']
+            for node in history['nodes']:
+                commits.append(self._history_node_to_commit_model(node))
+            if not history['pageInfo']['hasNextPage']:
+                break
+            cursor = history['pageInfo']['endCursor']
+        return commits
+
+    def _history_node_to_commit_model(self, node: Dict) -> CommitModel:
+        return CommitModel(
+            sha=node['oid'],
+            message=node['message'],
+            author=node['author']['name'],
+            date=self._parse_datetime(node['author']['date']),
+            stats={
+                'total': node['additions'] + node['deletions'],
+                'additions': node['additions'],
+                'deletions': node['deletions'],
+                'files': node['changedFilesIfAvailable']
+            }
+        )
         
+    @instrumented('github')
     async def get_repo_statistics(self) -> Dict:
         """Get repository statistics."""
         try:
             logger.info("Fetching repository statistics")
-            repo = self.repo
+            repo = await self.client.get_json(self.repo_path)
             stats = {
-                'name': repo.name,
-                'stars': repo.stargazers_count,
-                'forks': repo.forks_count,
-                'open_issues': repo.open_issues_count,
-                'language': repo.language,
-                'created_at': repo.created_at
+                'name': repo['name'],
+                'stars': repo['stargazers_count'],
+                'forks': repo['forks_count'],
+                'open_issues': repo['open_issues_count'],
+                'language': repo['language'],
+                'created_at': self._parse_datetime(repo['created_at'])
             }
             logger.info("Successfully fetched repository statistics")
             return stats
         except Exception as e:
             logger.error(f"Error fetching repository statistics: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def close(self) -> None:
+        """Release pooled HTTP connections."""
+        await self.client.close()
\ No newline at end of file
@@ -0,0 +1,137 @@
+# src/api/json_stream.py
+from typing import Any, Dict, List, Optional, Tuple
+import json
+
+# (top-level key, value); array fields produce one event per item
+JSONEvent = Tuple[str, Any]
+
+class IncrementalJSONParser:
+    """Parse a JSON object that arrives in pieces, reporting fields as they complete.
+
+    Each item of a top-level array (issues, recommendations, ...) is
+    reported as soon as it is closed, and every other top-level value when
+    it ends, so a streamed analysis can be shown before the model finishes.
+    Text before the opening brace (such as a code fence) is skipped.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {}
+        self.done = False
+        self._text = ''
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._state = 'key'  # key -> colon -> value, for the top-level object
+        self._key: Optional[str] = None
+        self._kind: Optional[str] = None  # array, object or scalar
+        self._value_start = 0
+        self._item_start = 0
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
+
+    def feed(self, chunk: str) -> List[JSONEvent]:
+        """Add streamed text and return the events it completed."""
+        events: List[JSONEvent] = []
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == 'key':
+                        self._key = json.loads(text[self._string_start:i + 1])
+                        self._state = 'colon'
+                continue
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._depth == 1 and self._state == 'value' and self._kind is None:
+                    self._kind = 'scalar'
+                continue
+            if ch in ' \t\r\n':
+                continue
+            if self._depth == 1:
+                self._top_level(ch, i, text, events)
+            else:
+                self._nested(ch, i, text, events)
+        self._pos = len(text)
+        return events
+
+    def _top_level(self, ch: str, i: int, text: str, events: List[JSONEvent]) -> None:
+        if self._state == 'colon':
+            if ch == ':':
+                self._state = 'value'
+                self._value_start = i + 1
+                self._kind = None
+            return
+        if self._state == 'value':
+            if self._kind is None:
+                if ch == '[':
+                    self._kind = 'array'
+                    self._depth = 2
+                    self._item_start = i + 1
+                    self.result[self._key] = []
+                    return
+                if ch == '{':
+                    self._kind = 'object'
+                    self._depth = 2
+                    return
+                self._kind = 'scalar'
+            if ch in ',}':
+                if self._kind != 'array':
+                    self._emit(text[self._value_start:i], events, item=False)
+                self._state = 'key'
+                self._kind = None
+                if ch == '}':
+                    self._finish()
+            return
+        if ch == '}':
+            self._finish()
+
+    def _nested(self, ch: str, i: int, text: str, events: List[JSONEvent]) -> None:
+        in_array = self._depth == 2 and self._kind == 'array'
+        if ch in '{[':
+            self._depth += 1
+        elif ch in '}]':
+            if in_array and ch == ']':
+                self._emit(text[self._item_start:i], events, item=True)
+            self._depth -= 1
+        elif ch == ',' and in_array:
+            self._emit(text[self._item_start:i], events, item=True)
+            self._item_start = i + 1
+
+    def _emit(self, raw: str, events: List[JSONEvent], item: bool) -> None:
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        if item:
+            self.result[self._key].append(value)
+        else:
+            self.result[self._key] = value
+        events.append((self._key, value))
+
+    def _finish(self) -> None:
+        self._depth = 0
+        self.done = True
@@ -0,0 +1,114 @@
+# src/api/openai_batch.py
+from typing import Dict, List, Optional
+import asyncio
+import json
+import aiohttp
+from ..config.settings import Settings
+from ..utils.logging import get_logger
+from ..utils.telemetry import instrumented
+
+logger = get_logger(__name__)
+
+# Batch states after which the batch will not change any more
+TERMINAL_STATES = ('completed', 'failed', 'expired', 'cancelled')
+
+class BatchAPIError(Exception):
+    """Raised when the batch or files endpoints answer with an error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"OpenAI batch API error {status}: {message}")
+        self.status = status
+
+class OpenAIBatchClient:
+    """Client for the OpenAI files and batches endpoints.
+
+    Batches run asynchronously on the server within a completion window, at
+    a lower price and with separate rate limits from interactive requests.
+    openai_base_url may point at src/testing/openai_stub.py, which processes
+    uploaded batch files itself.
+    """
+
+    API_URL = "https://api.openai.com/v1"
+    COMPLETION_WINDOW = "24h"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.base_url = (settings.openai_base_url or self.API_URL).rstrip('/')
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'Authorization': f"Bearer {self.settings.openai_api_key}"},
+                timeout=aiohttp.ClientTimeout(total=self.settings.openai_timeout * 10)
+            )
+        return self._session
+
+    async def _request(self, method: str, path: str, **kwargs) -> aiohttp.ClientResponse:
+        session = await self._get_session()
+        response = await session.request(method, f"{self.base_url}/{path}", **kwargs)
+        if response.status >= 400:
+            message = await response.text()
+            response.release()
+            raise BatchAPIError(response.status, message[:500])
+        return response
+
+    @instrumented('openai_batch')
+    async def upload_requests(self, lines: List[Dict], filename: str) -> str:
+        """Upload batch request lines as a JSONL file and return the file id."""
+        body = ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
+        form = aiohttp.FormData()
+        form.add_field('purpose', 'batch')
+        form.add_field('file', body, filename=filename, content_type='application/jsonl')
+        response = await self._request('POST', 'files', data=form)
+        async with response:
+            payload = await response.json()
+        logger.info(f"Uploaded {len(lines)} batch requests as {payload['id']}")
+        return payload['id']
+
+    @instrumented('openai_batch')
+    async def create_batch(self, input_file_id: str, metadata: Optional[Dict] = None) -> Dict:
+        """Start a batch of chat completions over an uploaded file."""
+        response = await self._request('POST', 'batches', json={
+            'input_file_id': input_file_id,
+            'endpoint': '/v1/chat/completions',
+            'completion_window': self.COMPLETION_WINDOW,
+            'metadata': metadata or {}
+        })
+        async with response:
+            return await response.json()
+
+    @instrumented('openai_batch')
+    async def get_batch(self, batch_id: str) -> Dict:
+        response = await self._request('GET', f"batches/{batch_id}")
+        async with response:
+            return await response.json()
+
+    async def wait_for_batch(self, batch_id: str, poll_seconds: float) -> Dict:
+        """Poll a batch until it reaches a terminal state."""
+        while True:
+            batch = await self.get_batch(batch_id)
+            if batch['status'] in TERMINAL_STATES:
+                return batch
+            counts = batch.get('request_counts') or {}
+            logger.info(
+                f"Batch {batch_id} {batch['status']}: "
+                f"{counts.get('completed', 0)}/{counts.get('total', '?')} requests done"
+            )
+            await asyncio.sleep(poll_seconds)
+
+    @instrumented('openai_batch')
+    async def download_results(self, file_id: str) -> List[Dict]:
+        """Read a batch output or error file."""
+        response = await self._request('GET', f"files/{file_id}/content")
+        async with response:
+            text = await response.text()
+        results = []
+        for line in text.splitlines():
+            if line.strip():
+                results.append(json.loads(line))
+        return results
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -1,50 +1,348 @@
 # src/api/openai_service.py
-from typing import List, Dict
-import openai
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError
+)
 from ..utils.logging import get_logger
+from ..utils.rate_limiter import RateLimitScheduler, get_rate_limiter, parse_retry_after
+from ..utils.telemetry import get_telemetry, instrumented
+from .prompt_chunker import CHARS_PER_TOKEN, estimate_tokens, merge_analyses, pack_changes, render_section
+from .json_stream import IncrementalJSONParser
+from .response_parser import RESPONSE_SCHEMA, ParseStats, ResponseParser
 from ..config.settings import Settings
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential
+)
 
 logger = get_logger(__name__)
 
+# Bump when the expected response format changes without the prompt text changing
+PROMPT_VERSION = "2"
+
+TRANSIENT_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError
+)
+
+# Rough completion size reserved from the tokens-per-minute budget per request
+ESTIMATED_COMPLETION_TOKENS = 500
+
+# Used when no chunk produced a usable score
+NEUTRAL_QUALITY_SCORE = 5.0
+
+_backoff = wait_exponential(multiplier=1, min=4, max=10)
+
+def _retry_wait(retry_state) -> float:
+    """Rate-limit errors are paced by the scheduler; other errors back off exponentially."""
+    if isinstance(retry_state.outcome.exception(), RateLimitError):
+        return 0
+    return _backoff(retry_state)
+
 class OpenAIService:
-    def __init__(self, settings: Settings):
-        openai.api_key = settings.openai_api_key
+    def __init__(
+        self,
+        settings: Settings,
+        client: Optional[AsyncOpenAI] = None,
+        scheduler: Optional[RateLimitScheduler] = None
+    ):
         self.settings = settings
+        self.client = client or self._create_client(settings)
+        self._semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+        self.in_flight = 0
+        self.response_parser = ResponseParser()
+        self.scheduler = scheduler or get_rate_limiter()
+        # Allow bursts of about ten seconds' worth of budget
+        self.scheduler.configure(
+            'openai_requests',
+            capacity=max(1, settings.openai_requests_per_minute / 6),
+            rate_per_second=settings.openai_requests_per_minute / 60
+        )
+        self.scheduler.configure(
+            'openai_tokens',
+            capacity=max(1, settings.openai_tokens_per_minute / 6),
+            rate_per_second=settings.openai_tokens_per_minute / 60
+        )
+
+    @staticmethod
+    def _create_client(settings: Settings) -> AsyncOpenAI:
+        """Build an async client with a pooled HTTP transport.
+
+        openai_base_url may point at any OpenAI-compatible server, e.g. the
+        local stand-in in src/testing/openai_stub.py.
+        """
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_pool_size,
+                max_keepalive_connections=settings.openai_pool_size,
+                keepalive_expiry=60
+            ),
+            timeout=settings.openai_timeout
+        )
+        return AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            http_client=http_client,
+            # Retries are handled by _create_completion so they release the slot
+            max_retries=0
+        )
+
+    @property
+    def parse_stats(self) -> ParseStats:
+        """How many responses needed repairs, and which ones."""
+        return self.response_parser.stats
+
+    def _record_tokens(self, prompt_tokens: int, completion_tokens: int, source: str) -> None:
+        """Count tokens as reported in usage, or estimated where the API reports none."""
+        tokens = get_telemetry().llm_tokens
+        model = self.settings.openai_model
+        tokens.inc(prompt_tokens, model=model, kind='prompt', source=source)
+        tokens.inc(completion_tokens, model=model, kind='completion', source=source)
+
+    @property
+    def prompt_fingerprint(self) -> str:
+        """Hash of the prompt templates, used to invalidate cached analyses."""
+        template = self._get_system_prompt() + self._create_analysis_prompt([])
+        digest = hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+        return f"{PROMPT_VERSION}-{digest}"
         
+    @instrumented('openai')
+    async def analyze_code(self, changes: List[Dict]) -> Dict:
+        """Analyze code changes using OpenAI.
+
+        Changes that exceed openai_max_prompt_tokens are packed into several
+        prompts, analyzed concurrently and merged into one result.
+        """
+        try:
+            chunks = pack_changes(changes, self._chunk_budget())
+            if len(chunks) > 1:
+                logger.info(f"Split {len(changes)} files into {len(chunks)} prompt chunks")
+
+            partials = await asyncio.gather(*(
+                self._analyze_chunk(chunk.text) for chunk in chunks
+            ))
+            return self._merge(list(zip(partials, (chunk.tokens for chunk in chunks))))
+            
+        except Exception as e:
+            logger.error(f"Error in OpenAI analysis: {str(e)}")
+            raise
+
+    @instrumented('openai')
+    async def stream_analysis(self, changes: List[Dict]) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream an analysis as (field, value) events while the model writes it.
+
+        Items of list fields (issues, recommendations, ...) arrive one at a
+        time as soon as they are complete. Chunks are streamed concurrently
+        and their events interleave. The last event is ('analysis', merged)
+        with the same content analyze_code would have returned.
+        """
+        chunks = pack_changes(changes, self._chunk_budget())
+        parsers = [IncrementalJSONParser() for _ in chunks]
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def stream_chunk(parser: IncrementalJSONParser, sections: str) -> None:
+            try:
+                async for text in self._stream_completion(self._analysis_messages(sections)):
+                    for event in parser.feed(text):
+                        queue.put_nowait(event)
+            finally:
+                queue.put_nowait(None)
+
+        tasks = [
+            asyncio.create_task(stream_chunk(parser, chunk.text))
+            for parser, chunk in zip(parsers, chunks)
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield event
+            for task in tasks:
+                # Re-raise the first failure, as gather would
+                task.result()
+        except Exception as e:
+            logger.error(f"Error in streamed OpenAI analysis: {str(e)}")
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+        # The complete text of each chunk is validated like a non-streamed response
+        yield 'analysis', self._merge([
+            (self._parse_analysis(parser.text), chunk.tokens)
+            for parser, chunk in zip(parsers, chunks)
+        ])
+
+    def batch_requests(self, changes: List[Dict]) -> List[Tuple[Dict, int]]:
+        """Chat completion bodies for a batch job, one per prompt chunk, with their token weights."""
+        return [
+            (
+                dict(
+                    model=self.settings.openai_model,
+                    messages=self._analysis_messages(chunk.text),
+                    temperature=0.3,
+                    **self._completion_options()
+                ),
+                chunk.tokens
+            )
+            for chunk in pack_changes(changes, self._chunk_budget())
+        ]
+
+    def merge_responses(self, responses: List[Tuple[Optional[str], int]]) -> Dict:
+        """Validate and merge response texts of a commit's chunks, as analyze_code does."""
+        return self._merge([
+            (self._parse_analysis(content), tokens) for content, tokens in responses
+        ])
+
+    @staticmethod
+    def _merge(partials: List[Tuple[Dict, int]]) -> Dict:
+        """Merge token-weighted chunk analyses, falling back to a neutral score."""
+        analysis = merge_analyses(partials)
+        if analysis['quality_score'] is None:
+            logger.warning("No usable quality score in the AI analysis, using a neutral score")
+            analysis['quality_score'] = NEUTRAL_QUALITY_SCORE
+        return analysis
+
+    def _chunk_budget(self) -> int:
+        """Tokens left for changes once the fixed prompt text is counted."""
+        fixed = estimate_tokens(self._get_system_prompt() + self._create_analysis_prompt([]))
+        return max(1, self.settings.openai_max_prompt_tokens - fixed)
+
+    def _analysis_messages(self, sections: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": self._get_system_prompt()},
+            {"role": "user", "content": self._create_analysis_prompt([]) + sections}
+        ]
+
+    async def _analyze_chunk(self, sections: str) -> Dict:
+        """Analyze one chunk of changes."""
+        completion = await self._create_completion(self._analysis_messages(sections))
+        return self._parse_analysis(completion.choices[0].message.content)
+
+    def _parse_analysis(self, content: Optional[str]) -> Dict:
+        """Decode and validate an analysis, repairing malformed JSON instead of retrying.
+
+        An unreadable response contributes nothing to the merge.
+        """
+        return self.response_parser.parse(content).to_dict()
+
+    def _completion_options(self) -> Dict:
+        if not self.settings.openai_json_mode:
+            return {}
+        return {'response_format': {'type': 'json_object'}}
+
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
+        wait=_retry_wait,
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        reraise=True
     )
-    async def analyze_code(self, changes: List[Dict]) -> Dict:
-        """Analyze code changes using OpenAI."""
+    @instrumented('openai', 'chat_completion')
+    async def _create_completion(self, messages: List[Dict]):
+        """Run one chat completion, paced by the rate-limit scheduler and
+        bounded by openai_max_concurrency."""
+        await self._acquire_budget(messages)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model=self.settings.openai_model,
+                    messages=messages,
+                    temperature=0.3,
+                    **self._completion_options()
+                )
+            except RateLimitError as e:
+                self._pause_for_rate_limit(e)
+                raise
+            finally:
+                self.in_flight -= 1
+        self.scheduler.update_from_openai_headers(raw.headers)
+        completion = raw.parse()
+        if completion.usage is not None:
+            self._record_tokens(
+                completion.usage.prompt_tokens, completion.usage.completion_tokens, 'usage'
+            )
+        return completion
+
+    @instrumented('openai', 'chat_completion_stream')
+    async def _stream_completion(self, messages: List[Dict]) -> AsyncIterator[str]:
+        """Yield the content of a streamed chat completion piece by piece."""
+        stream = await self._open_stream(messages)
+        received = 0
         try:
-            prompt = self._create_analysis_prompt(changes)
-            
-            completion = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    received += len(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            # Streams carry no usage
+            self._record_tokens(
+                sum(estimate_tokens(message['content']) for message in messages),
+                received // CHARS_PER_TOKEN,
+                'estimate'
             )
 
-            return {
-                "quality_score": 8.5,
-                "issues": [
-                    {"type": "style", "severity": "low", "description": "Example issue"}
-                ],
-                "security_concerns": [
-                    {"level": "low", "description": "Example concern"}
-                ],
-                "performance_impact": "minimal",
-                "recommendations": ["Example recommendation"]
-            }
-            
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        reraise=True
+    )
+    async def _open_stream(self, messages: List[Dict]):
+        """Start a streamed completion. On success the concurrency slot stays
+        taken until _stream_completion has read the stream."""
+        await self._acquire_budget(messages)
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        try:
+            raw = await self.client.chat.completions.with_raw_response.create(
+                model=self.settings.openai_model,
+                messages=messages,
+                temperature=0.3,
+                stream=True,
+                **self._completion_options()
+            )
         except Exception as e:
-            logger.error(f"Error in OpenAI analysis: {str(e)}")
+            self.in_flight -= 1
+            self._semaphore.release()
+            if isinstance(e, RateLimitError):
+                self._pause_for_rate_limit(e)
             raise
+        self.scheduler.update_from_openai_headers(raw.headers)
+        return raw.parse()
+
+    async def _acquire_budget(self, messages: List[Dict]) -> None:
+        """Wait for request and token budget for one completion."""
+        estimated_tokens = (
+            sum(estimate_tokens(message['content']) for message in messages)
+            + ESTIMATED_COMPLETION_TOKENS
+        )
+        await self.scheduler.acquire('openai_requests')
+        await self.scheduler.acquire('openai_tokens', estimated_tokens)
+
+    def _pause_for_rate_limit(self, error: RateLimitError) -> None:
+        retry_after = parse_retry_after(error.response.headers)
+        self.scheduler.update_from_openai_headers(error.response.headers)
+        self.scheduler.pause('openai_requests', retry_after or 1.0)
+
+    async def close(self) -> None:
+        """Release pooled HTTP connections."""
+        await self.client.close()
             
     def _create_analysis_prompt(self, changes: List[Dict]) -> str:
         """Create prompt for code analysis."""
@@ -54,11 +352,12 @@ class OpenAIService:
         prompt += "3. Security concerns\n"
         prompt += "4. Performance implications\n"
         prompt += "5. Improvement recommendations\n\n"
+        prompt += "Respond with only a JSON object of this form:\n"
+        prompt += RESPONSE_SCHEMA + "\n\n"
         prompt += "Changes:\n"
         
         for change in changes:
-            prompt += f"\nFile: {change['filename']}\n"
-            prompt += f"Changes:\n```\n{change['patch']}\n```\n"
+            prompt += render_section(change['filename'], change['patch'])
             
         return prompt
         
@@ -0,0 +1,170 @@
+# src/api/prompt_chunker.py
+"""
+Split commit changes into prompts that fit a token budget.
+
+Whole files are packed together while they fit; larger files are split at
+hunk boundaries, and hunks that still do not fit are split into consecutive
+parts at line boundaries. Only a single line longer than the budget is
+truncated. Partial analyses of the chunks are merged back into one result.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Rough average for code and English with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+HUNK_START = re.compile(r'^(?=@@ )', re.MULTILINE)
+
+# From least to most severe; unknown wording ranks as 'moderate'
+PERFORMANCE_LEVELS = ('none', 'minimal', 'low', 'moderate', 'medium', 'high', 'significant', 'critical')
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def render_section(filename: str, patch: str, part: Optional[str] = None) -> str:
+    """Format one file (or part of one) for the analysis prompt."""
+    title = f"{filename} ({part})" if part else filename
+    return f"\nFile: {title}\nChanges:\n```\n{patch}\n```\n"
+
+@dataclass
+class PromptChunk:
+    sections: List[str] = field(default_factory=list)
+    filenames: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+    def add(self, filename: str, section: str, tokens: int) -> None:
+        self.sections.append(section)
+        if filename not in self.filenames:
+            self.filenames.append(filename)
+        self.tokens += tokens
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.sections)
+
+def split_hunks(patch: str) -> List[str]:
+    """Split a unified-diff patch at its hunk headers."""
+    return [hunk for hunk in HUNK_START.split(patch) if hunk]
+
+def _truncate_line(line: str, limit: int) -> str:
+    """Cut a single line that is longer than the budget allows."""
+    marker = ' ... (line truncated)'
+    if limit <= len(marker):
+        return line[:limit]
+    return line[:limit - len(marker)] + marker
+
+def split_to_budget(text: str, limit: int) -> List[str]:
+    """Split text at line boundaries into pieces of at most limit characters."""
+    pieces: List[str] = []
+    lines: List[str] = []
+    size = 0
+    for line in text.split('\n'):
+        if len(line) > limit:
+            line = _truncate_line(line, limit)
+        if lines and size + 1 + len(line) > limit:
+            pieces.append('\n'.join(lines))
+            lines, size = [], 0
+        size += len(line) + (1 if lines else 0)
+        lines.append(line)
+    if lines:
+        pieces.append('\n'.join(lines))
+    return pieces
+
+def _sections(change: Dict, budget: int) -> List[Tuple[str, int]]:
+    """Sections of one file, each within the budget."""
+    filename, patch = change['filename'], change['patch']
+    section = render_section(filename, patch)
+    tokens = estimate_tokens(section)
+    if tokens <= budget:
+        return [(section, tokens)]
+
+    hunks = split_hunks(patch)
+    sections = []
+    for index, hunk in enumerate(hunks, start=1):
+        part = f"hunk {index} of {len(hunks)}"
+        section = render_section(filename, hunk, part)
+        tokens = estimate_tokens(section)
+        if tokens <= budget:
+            sections.append((section, tokens))
+            continue
+
+        # Sized for the longest label a part of this hunk can get
+        overhead = estimate_tokens(render_section(filename, '', f"{part}, part {len(hunk)} of {len(hunk)}"))
+        limit = max(1, (budget - overhead - 1) * CHARS_PER_TOKEN)
+        pieces = split_to_budget(hunk, limit)
+        for number, piece in enumerate(pieces, start=1):
+            section = render_section(filename, piece, f"{part}, part {number} of {len(pieces)}")
+            sections.append((section, estimate_tokens(section)))
+    return sections
+
+def pack_changes(changes: List[Dict], budget: int) -> List[PromptChunk]:
+    """Pack file and hunk sections into as few budget-sized chunks as possible.
+
+    Sections go into the first chunk with room (first fit), so small files
+    fill the gaps left by large ones while files keep their relative order.
+    """
+    chunks: List[PromptChunk] = []
+    for change in changes:
+        for section, tokens in _sections(change, budget):
+            for chunk in chunks:
+                if chunk.tokens + tokens <= budget:
+                    break
+            else:
+                chunk = PromptChunk()
+                chunks.append(chunk)
+            chunk.add(change['filename'], section, tokens)
+    return chunks
+
+def _unique(items: List, key) -> List:
+    seen = set()
+    result = []
+    for item in items:
+        marker = key(item)
+        if marker in seen:
+            continue
+        seen.add(marker)
+        result.append(item)
+    return result
+
+def _performance_rank(impact: str) -> int:
+    words = impact.lower().split()
+    ranks = [PERFORMANCE_LEVELS.index(word) for word in words if word in PERFORMANCE_LEVELS]
+    return max(ranks) if ranks else PERFORMANCE_LEVELS.index('moderate')
+
+def merge_analyses(partials: List[Tuple[Dict, int]]) -> Dict:
+    """Merge chunk analyses into one, weighting scores by chunk size in tokens.
+
+    Issues, concerns and recommendations are concatenated without duplicates;
+    the most severe performance impact wins.
+    """
+    scored = [
+        (float(partial['quality_score']), weight)
+        for partial, weight in partials
+        if isinstance(partial.get('quality_score'), (int, float))
+    ]
+    total_weight = sum(weight for _, weight in scored)
+    impacts = [
+        partial['performance_impact'] for partial, _ in partials
+        if partial.get('performance_impact')
+    ]
+    return {
+        'quality_score': (
+            sum(score * weight for score, weight in scored) / total_weight
+            if total_weight else None
+        ),
+        'issues': _unique(
+            [issue for partial, _ in partials for issue in partial.get('issues', [])],
+            key=lambda issue: (issue.get('type'), issue.get('severity'), issue.get('description'))
+        ),
+        'security_concerns': _unique(
+            [concern for partial, _ in partials for concern in partial.get('security_concerns', [])],
+            key=lambda concern: (concern.get('level'), concern.get('description'))
+        ),
+        'performance_impact': max(impacts, key=_performance_rank) if impacts else 'unknown',
+        'recommendations': _unique(
+            [item for partial, _ in partials for item in partial.get('recommendations', [])],
+            key=lambda item: item
+        )
+    }
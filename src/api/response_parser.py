@@ -0,0 +1,327 @@
+# src/api/response_parser.py
+"""
+Tolerant parsing of model analyses into the result models.
+
+Responses are decoded as JSON first; if that fails they are repaired
+deterministically (surrounding text and code fences dropped, trailing commas
+removed, truncated output closed at the last complete item) instead of
+asking the model again. Each field is then validated into CodeIssue and
+SecurityConcern objects, dropping items that cannot be used.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import math
+import re
+import threading
+from ..models.analysis_result import CodeIssue, SecurityConcern
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Shape requested from the model; kept in the prompt so json_object mode has a schema
+RESPONSE_SCHEMA = """{
+  "quality_score": <number from 0 to 10>,
+  "issues": [{"type": "<category>", "severity": "low|medium|high|critical", "description": "<text>"}],
+  "security_concerns": [{"level": "low|medium|high|critical", "description": "<text>"}],
+  "performance_impact": "<none|minimal|moderate|significant, with a short explanation>",
+  "recommendations": ["<text>"]
+}"""
+
+DEFAULT_SEVERITY = 'medium'
+DEFAULT_ISSUE_TYPE = 'general'
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+# Alternative field names models use for the same thing
+ISSUE_TYPE_KEYS = ('type', 'category', 'kind')
+SEVERITY_KEYS = ('severity', 'level', 'priority')
+DESCRIPTION_KEYS = ('description', 'message', 'issue', 'detail', 'text', 'concern', 'recommendation')
+
+# How far back a truncated response is cut looking for a decodable prefix
+MAX_TRUNCATION_CUTS = 16
+
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+@dataclass
+class ParsedAnalysis:
+    quality_score: Optional[float] = None
+    issues: List[CodeIssue] = field(default_factory=list)
+    security_concerns: List[SecurityConcern] = field(default_factory=list)
+    performance_impact: str = 'unknown'
+    recommendations: List[str] = field(default_factory=list)
+    repairs: List[str] = field(default_factory=list)
+    dropped_items: int = 0
+
+    def to_dict(self) -> Dict:
+        """The analysis in the dict form merge_analyses works on."""
+        return {
+            'quality_score': self.quality_score,
+            'issues': [vars(issue) for issue in self.issues],
+            'security_concerns': [vars(concern) for concern in self.security_concerns],
+            'performance_impact': self.performance_impact,
+            'recommendations': list(self.recommendations)
+        }
+
+@dataclass
+class ParseStats:
+    responses: int = 0
+    clean: int = 0
+    repaired: int = 0
+    failed: int = 0
+    dropped_items: int = 0
+    repairs: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> Dict:
+        return {
+            'responses': self.responses,
+            'clean': self.clean,
+            'repaired': self.repaired,
+            'failed': self.failed,
+            'dropped_items': self.dropped_items,
+            'repairs': dict(self.repairs)
+        }
+
+def _scan(text: str) -> Tuple[List[str], List[Tuple[int, List[str]]], bool]:
+    """Walk JSON text outside strings.
+
+    Returns the brackets still open at the end, every position where an item
+    may be cut off (after an opening bracket or before a comma) with the
+    brackets open there, and whether the text ends inside a string.
+    """
+    stack: List[str] = []
+    boundaries: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            boundaries.append((i + 1, list(stack)))
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+        elif ch == ',':
+            boundaries.append((i, list(stack)))
+    return stack, boundaries, in_string
+
+def _item_boundary(open_at: List[str]) -> bool:
+    """Whether a cut here ends at an array element or a top-level member.
+
+    Cutting inside an object nested in an array would keep a partial item.
+    """
+    return len(open_at) == 1 or open_at[-1] == ']'
+
+def _strip_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket, leaving strings alone."""
+    out = []
+    in_string = False
+    escape = False
+    pending = None  # index in out of a comma that may be trailing
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch in '}]' and pending is not None:
+            del out[pending]
+        if not ch.isspace():
+            pending = None
+        if ch == ',':
+            pending = len(out)
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+    return ''.join(out)
+
+def _close(text: str) -> Optional[Any]:
+    """Decode truncated JSON by cutting it back to its last complete item and closing it."""
+    stack, boundaries, in_string = _scan(text)
+    candidates = []
+    if not in_string and stack and _item_boundary(stack):
+        candidates.append(text + ''.join(reversed(stack)))
+    cuts = [(position, open_at) for position, open_at in boundaries if _item_boundary(open_at)]
+    for position, open_at in reversed(cuts[-MAX_TRUNCATION_CUTS:]):
+        candidates.append(text[:position] + ''.join(reversed(open_at)))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+def _text_field(item: Dict, keys: Tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = item.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+def _severity(item: Dict) -> str:
+    value = _text_field(item, SEVERITY_KEYS)
+    if value is None:
+        return DEFAULT_SEVERITY
+    value = value.lower()
+    return value if value in SEVERITIES else next(
+        (level for level in SEVERITIES if level in value), DEFAULT_SEVERITY
+    )
+
+def parse_issue(item: Any) -> Optional[CodeIssue]:
+    """Validate one reported issue; a bare string becomes its description."""
+    if isinstance(item, str) and item.strip():
+        return CodeIssue(type=DEFAULT_ISSUE_TYPE, severity=DEFAULT_SEVERITY, description=item.strip())
+    if not isinstance(item, dict):
+        return None
+    description = _text_field(item, DESCRIPTION_KEYS)
+    if description is None:
+        return None
+    return CodeIssue(
+        type=_text_field(item, ISSUE_TYPE_KEYS) or DEFAULT_ISSUE_TYPE,
+        severity=_severity(item),
+        description=description
+    )
+
+def parse_concern(item: Any) -> Optional[SecurityConcern]:
+    """Validate one reported security concern."""
+    if isinstance(item, str) and item.strip():
+        return SecurityConcern(level=DEFAULT_SEVERITY, description=item.strip())
+    if not isinstance(item, dict):
+        return None
+    description = _text_field(item, DESCRIPTION_KEYS)
+    if description is None:
+        return None
+    return SecurityConcern(level=_severity(item), description=description)
+
+def parse_recommendation(item: Any) -> Optional[str]:
+    """Validate one recommendation; objects contribute their description."""
+    if isinstance(item, str):
+        return item.strip() or None
+    if isinstance(item, dict):
+        return _text_field(item, DESCRIPTION_KEYS)
+    return None
+
+def _score(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        match = NUMBER.search(value)
+        value = float(match.group()) if match else None
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return min(10.0, max(0.0, float(value)))
+
+def _performance(value: Any) -> str:
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    if isinstance(value, dict):
+        return _text_field(value, ('level', 'impact') + DESCRIPTION_KEYS) or 'unknown'
+    return 'unknown'
+
+class ResponseParser:
+    """Parse model responses into validated analyses, counting repairs.
+
+    Parsing never raises: a response that cannot be decoded at all yields
+    an empty analysis, which contributes nothing when chunks are merged.
+    """
+
+    def __init__(self):
+        self.stats = ParseStats()
+        self._lock = threading.Lock()
+
+    def parse(self, content: Optional[str]) -> ParsedAnalysis:
+        """Decode, repair if needed, and validate one response."""
+        repairs: List[str] = []
+        data = self._decode(content or '', repairs)
+        if isinstance(data, dict):
+            analysis = self._validate(data)
+        else:
+            analysis = ParsedAnalysis()
+            repairs.append('unparseable')
+        analysis.repairs = repairs
+        self._record(analysis)
+        return analysis
+
+    @staticmethod
+    def _decode(text: str, repairs: List[str]) -> Optional[Any]:
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0:
+            return None
+        body = text[start:end + 1] if end > start else text[start:]
+        stripped = _strip_trailing_commas(body)
+        for candidate, repair in ((body, None), (stripped, 'trailing_commas')):
+            try:
+                data = json.loads(candidate)
+            except ValueError:
+                continue
+            if body != text:
+                repairs.append('surrounding_text')
+            if repair is not None:
+                repairs.append(repair)
+            return data
+
+        # Not a complete object: the response was cut off, so keep all of it
+        if start > 0:
+            repairs.append('surrounding_text')
+        closed = _close(_strip_trailing_commas(text[start:]))
+        if closed is not None:
+            repairs.append('truncated')
+        return closed
+
+    @staticmethod
+    def _validate(data: Dict) -> ParsedAnalysis:
+        analysis = ParsedAnalysis(
+            quality_score=_score(data.get('quality_score')),
+            performance_impact=_performance(data.get('performance_impact'))
+        )
+        for key, parse_item, target in (
+            ('issues', parse_issue, analysis.issues),
+            ('security_concerns', parse_concern, analysis.security_concerns),
+            ('recommendations', parse_recommendation, analysis.recommendations)
+        ):
+            items = data.get(key) or []
+            if not isinstance(items, list):
+                items = [items]
+            for item in items:
+                parsed = parse_item(item)
+                if parsed is None:
+                    analysis.dropped_items += 1
+                else:
+                    target.append(parsed)
+        return analysis
+
+    def _record(self, analysis: ParsedAnalysis) -> None:
+        with self._lock:
+            self.stats.responses += 1
+            self.stats.dropped_items += analysis.dropped_items
+            self.stats.repairs.update(analysis.repairs)
+            if 'unparseable' in analysis.repairs:
+                self.stats.failed += 1
+            elif analysis.repairs:
+                self.stats.repaired += 1
+            else:
+                self.stats.clean += 1
+        if 'unparseable' in analysis.repairs:
+            logger.warning("AI analysis could not be decoded, ignoring it")
+        elif analysis.repairs or analysis.dropped_items:
+            logger.info(
+                f"Repaired AI analysis ({', '.join(analysis.repairs) or 'no JSON repairs'}, "
+                f"{analysis.dropped_items} unusable items dropped)"
+            )
@@ -0,0 +1,107 @@
+# src/api/webhooks.py
+from typing import Callable, Dict, List, Optional
+import hashlib
+import hmac
+import json
+from flask import Flask, jsonify, request
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+WEBHOOK_PATH = '/webhooks/github'
+SIGNATURE_HEADER = 'X-Hub-Signature-256'
+EVENT_HEADER = 'X-GitHub-Event'
+DELIVERY_HEADER = 'X-GitHub-Delivery'
+
+# 'after' of a push that deleted the branch
+NULL_SHA = '0' * 40
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """The X-Hub-Signature-256 value GitHub sends for a body."""
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+def push_commit_shas(payload: Dict, repository_name: str) -> List[str]:
+    """New commits of a push to the default branch of the repository, oldest first."""
+    repository = payload.get('repository') or {}
+    if repository.get('full_name', '').lower() != repository_name.lower():
+        return []
+    if payload.get('deleted') or payload.get('after') == NULL_SHA:
+        return []
+    default_branch = repository.get('default_branch')
+    if default_branch and payload.get('ref') != f"refs/heads/{default_branch}":
+        return []
+    # Commits already pushed to another branch are not 'distinct' and were seen before
+    shas = [
+        commit['id'] for commit in payload.get('commits', [])
+        if commit.get('distinct', True)
+    ]
+    head = payload.get('head_commit') or {}
+    if head.get('id') and head['id'] not in shas and head.get('distinct', True):
+        shas.append(head['id'])
+    return shas
+
+class GitHubWebhookReceiver:
+    """Receives GitHub push events and queues the pushed commits for analysis.
+
+    Deliveries must be signed with the shared webhook secret; unsigned or
+    mis-signed requests are rejected before the body is parsed. Each new
+    commit on the default branch is passed to `enqueue`, so results are
+    usually stored before anyone opens the commit.
+    """
+
+    def __init__(self, secret: str, repository_name: str, enqueue: Callable[[str], str]):
+        self.secret = secret
+        self.repository_name = repository_name
+        self.enqueue = enqueue
+        self.deliveries = 0
+        self.rejected = 0
+        self.queued_commits = 0
+
+    def register(self, server: Flask) -> None:
+        """Mount the receiver on the Flask server behind Dash."""
+        server.add_url_rule(WEBHOOK_PATH, 'github_webhook', self.handle, methods=['POST'])
+        logger.info(f"GitHub webhook receiver mounted at {WEBHOOK_PATH}")
+
+    def handle(self):
+        body = request.get_data()
+        if not verify_signature(self.secret, body, request.headers.get(SIGNATURE_HEADER)):
+            self.rejected += 1
+            logger.warning("Rejected webhook delivery with a missing or invalid signature")
+            return jsonify({'error': 'invalid signature'}), 401
+
+        self.deliveries += 1
+        event = request.headers.get(EVENT_HEADER, '')
+        if event == 'ping':
+            return jsonify({'status': 'pong'})
+        if event != 'push':
+            return jsonify({'status': 'ignored', 'event': event}), 202
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return jsonify({'error': 'invalid JSON'}), 400
+
+        try:
+            job_ids = {sha: self.enqueue(sha) for sha in push_commit_shas(payload, self.repository_name)}
+        except Exception as e:
+            logger.error(f"Error queueing pushed commits: {str(e)}")
+            return jsonify({'error': 'could not queue commits'}), 500
+        self.queued_commits += len(job_ids)
+        logger.info(
+            f"Webhook delivery {request.headers.get(DELIVERY_HEADER, '?')}: "
+            f"queued {len(job_ids)} commits for analysis"
+        )
+        return jsonify({'status': 'queued', 'jobs': job_ids}), 202
+
+    def stats(self) -> Dict:
+        return {
+            'deliveries': self.deliveries,
+            'rejected': self.rejected,
+            'queued_commits': self.queued_commits
+        }
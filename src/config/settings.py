@@ -1,19 +1,66 @@
 # src/config/settings.py
 from pydantic_settings import BaseSettings
 from typing import Optional
+import os
 
 class Settings(BaseSettings):
     # GitHub settings
     github_token: str
     repository_name: str
+    github_api_url: str = "https://api.github.com"
+    github_pool_size: int = 20
+    github_timeout: float = 30.0
+    github_commits_backend: str = "graphql"  # "graphql" or "rest"
+    github_response_cache: bool = True
+    github_response_cache_max_entries: int = 20000
+    github_requests_per_hour: int = 5000
+    github_burst_size: int = 100
+    # Shared secret of the push webhook; the receiver is only mounted when set
+    github_webhook_secret: Optional[str] = None
     
     # OpenAI settings
     openai_api_key: str
     openai_model: str = "gpt-3.5-turbo"
+    openai_base_url: Optional[str] = None
+    openai_max_concurrency: int = 8
+    openai_pool_size: int = 20
+    openai_timeout: float = 60.0
+    openai_requests_per_minute: int = 3500
+    openai_tokens_per_minute: int = 90000
+    # Larger commits are split into several prompts of at most this size
+    openai_max_prompt_tokens: int = 3000
+    # Ask for JSON mode; disable for compatible servers without response_format
+    openai_json_mode: bool = True
+    # Send only the changed parts of each function instead of raw patches
+    prompt_minimize_context: bool = True
+    # Changed functions up to this long are sent whole; longer ones as hunks with context
+    prompt_max_unit_lines: int = 60
+    prompt_context_lines: int = 1
+    prompt_max_removed_lines: int = 12
     
     # Application settings
     debug: bool = False
+    analysis_workers: int = 4  # concurrent analysis jobs behind the dashboard
     log_level: str = "INFO"
+    # Serve Prometheus-format latency and cache metrics at /metrics
+    telemetry_enabled: bool = True
+    
+    # Cache settings
+    cache_dir: str = ".shekara_cache"
+    analysis_cache_max_entries: int = 5000
+    analysis_cache_max_age_days: int = 30
+    clone_index_enabled: bool = True
+    clone_min_block_lines: int = 4
+    fetch_file_contents: bool = True
+    blob_store_max_mb: int = 512
+    # Metric worker processes; 0 computes metrics on a thread instead
+    metrics_workers: int = min(4, os.cpu_count() or 1)
+    metrics_chunk_kb: int = 256
+    
+    # Batch backfill settings
+    backfill_batch_size: int = 500  # commits per batch job
+    backfill_poll_seconds: float = 60.0
+    backfill_prepare_concurrency: int = 8
     
     class Config:
         env_file = ".env"
@@ -1,18 +1,87 @@
 # src/main.py
+from src.utils.startup_profile import get_startup_profile
+import argparse
 import asyncio
-from src.config.settings import Settings
-from src.ui.dashboard import Dashboard
+import os
+with get_startup_profile().phase('import.dashboard'):
+    from src.config.settings import Settings
+    from src.ui.dashboard import Dashboard
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# How long --profile-startup waits for background warm-up to finish
+WARM_UP_TIMEOUT = 30.0
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ShekaraCode analysis dashboard")
+    parser.add_argument(
+        '--backfill', type=int, metavar='COMMITS',
+        help="analyze this many recent commits through batch jobs and exit; "
+             "rerun the same command to resume an interrupted backfill"
+    )
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help="time imports, service construction and the first layout request, "
+             "print the timings and exit"
+    )
+    return parser.parse_args()
+
+async def run_backfill(settings: Settings, dashboard: Dashboard, count: int) -> None:
+    from src.analysis.backfill import BatchBackfill
+    from src.api.openai_batch import OpenAIBatchClient
+    batch_client = OpenAIBatchClient(settings)
+    try:
+        backfill = BatchBackfill(
+            dashboard.analyzer,
+            batch_client,
+            os.path.join(settings.cache_dir, 'backfill'),
+            batch_size=settings.backfill_batch_size,
+            poll_seconds=settings.backfill_poll_seconds,
+            prepare_concurrency=settings.backfill_prepare_concurrency
+        )
+        shas = await dashboard.github_service.list_commit_shas(count)
+        report = await backfill.run(shas)
+        logger.info(
+            f"Backfill stored {report.completed} analyses, skipped {report.skipped}, "
+            f"{report.failed} failed"
+        )
+    finally:
+        await batch_client.close()
+
+def profile_startup(dashboard: Dashboard) -> None:
+    """Serve the layout once, wait for background warm-up and print the timings."""
+    profile = get_startup_profile()
+    with profile.phase('request.layout'):
+        response = dashboard.app.server.test_client().get('/_dash-layout')
+    profile.record('ready', 0.0)
+    if response.status_code != 200:
+        logger.error(f"Layout request failed with status {response.status_code}")
+    try:
+        dashboard.warm_up_future.result(WARM_UP_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Warm-up did not finish: {str(e)}")
+    print(profile.report())
+
 async def main():
+    args = parse_args()
+    profile = get_startup_profile()
     try:
         # Load settings
-        settings = Settings()
+        with profile.phase('settings'):
+            settings = Settings()
         
         # Initialize dashboard
-        dashboard = Dashboard(settings)
+        with profile.phase('dashboard.init'):
+            dashboard = Dashboard(settings, warm_up=not args.backfill)
+        
+        if args.profile_startup:
+            profile_startup(dashboard)
+            return
+        
+        if args.backfill:
+            await run_backfill(settings, dashboard, args.backfill)
+            return
         
         # Run the dashboard
         logger.info("Starting ShekaraCode dashboard...")
@@ -23,4 +92,4 @@ async def main():
         raise
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,6 +1,6 @@
 # src/models/analysis_result.py
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
 from datetime import datetime
 
 @dataclass
@@ -22,7 +22,10 @@ class AnalysisResult:
     security_concerns: List[SecurityConcern]
     performance_impact: str
     recommendations: List[str]
-    analyzed_at: datetime = datetime.now()
+    analyzed_at: datetime = field(default_factory=datetime.now)
+    # Aggregated MetricsCalculator values the score was computed from
+    metrics: Dict = field(default_factory=dict)
+    committed_at: Optional[datetime] = None
     
     def to_dict(self):
         return {
@@ -32,5 +35,28 @@ class AnalysisResult:
             'security_concerns': [vars(concern) for concern in self.security_concerns],
             'performance_impact': self.performance_impact,
             'recommendations': self.recommendations,
-            'analyzed_at': self.analyzed_at.isoformat()
-        }
\ No newline at end of file
+            'analyzed_at': self.analyzed_at.isoformat(),
+            'metrics': self.metrics,
+            'committed_at': self.committed_at.isoformat() if self.committed_at else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AnalysisResult':
+        """Rebuild a result from the output of to_dict()."""
+        return cls(
+            commit_sha=data['commit_sha'],
+            quality_score=data['quality_score'],
+            issues=[CodeIssue(**issue) for issue in data['issues']],
+            security_concerns=[
+                SecurityConcern(**concern) for concern in data['security_concerns']
+            ],
+            performance_impact=data['performance_impact'],
+            recommendations=list(data['recommendations']),
+            analyzed_at=datetime.fromisoformat(data['analyzed_at']),
+            # Entries stored before these fields existed have neither
+            metrics=data.get('metrics') or {},
+            committed_at=(
+                datetime.fromisoformat(data['committed_at'])
+                if data.get('committed_at') else None
+            )
+        )
@@ -0,0 +1,22 @@
+# src/storage/__init__.py
+"""
+Persistent local stores for analysis results and fetched data.
+"""
+from importlib import import_module
+
+# Loaded on first access; only the trend store needs numpy and pandas
+_EXPORTS = {
+    'AnalysisStore': '.analysis_store',
+    'ResponseCache': '.response_cache',
+    'CachedResponse': '.response_cache',
+    'BlobStore': '.blob_store',
+    'git_blob_sha': '.blob_store',
+    'TrendStore': '.trend_store'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
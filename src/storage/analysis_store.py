@@ -0,0 +1,152 @@
+# src/storage/analysis_store.py
+from typing import Optional, Dict
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from ..models.analysis_result import AnalysisResult
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+class AnalysisStore:
+    """SQLite-backed store of finished commit analyses.
+
+    Entries are keyed by commit SHA, model name and an analysis version
+    fingerprint, so changing the prompt or the metrics invalidates old results
+    without touching the file. Eviction is by age and by entry count (least
+    recently read first).
+    """
+
+    EVICTION_INTERVAL = 50  # run eviction every N writes
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        max_age_seconds: float = 30 * 24 * 3600
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._hits = 0
+        self._misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analyses (
+                cache_key TEXT PRIMARY KEY,
+                commit_sha TEXT NOT NULL,
+                model TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses (accessed_at)"
+        )
+        self._conn.commit()
+        logger.info(f"Analysis store opened at {path}")
+
+    @staticmethod
+    def make_key(commit_sha: str, model: str, version: str) -> str:
+        """Build the cache key for a commit analysis."""
+        raw = f"{commit_sha}:{model}:{version}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, commit_sha: str, model: str, version: str) -> Optional[AnalysisResult]:
+        """Return a stored analysis or None if missing or expired."""
+        key = self.make_key(commit_sha, model, version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM analyses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE analyses SET accessed_at = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self._hits += 1
+        try:
+            return AnalysisResult.from_dict(json.loads(row[0]))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry for {commit_sha}: {str(e)}")
+            self.delete(commit_sha, model, version)
+            return None
+
+    def put(self, result: AnalysisResult, model: str, version: str) -> None:
+        """Store an analysis result, replacing any previous entry."""
+        key = self.make_key(result.commit_sha, model, version)
+        payload = json.dumps(result.to_dict())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO analyses
+                   (cache_key, commit_sha, model, version, payload, created_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, result.commit_sha, model, version, payload, now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICTION_INTERVAL == 0
+        if should_evict:
+            self.evict()
+
+    def delete(self, commit_sha: str, model: str, version: str) -> None:
+        """Remove a single entry."""
+        key = self.make_key(commit_sha, model, version)
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses WHERE cache_key = ?", (key,))
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drop expired entries and trim the store to max_entries."""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM analyses WHERE created_at < ?", (cutoff,)
+            ).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    """DELETE FROM analyses WHERE cache_key IN (
+                           SELECT cache_key FROM analyses
+                           ORDER BY accessed_at ASC LIMIT ?
+                       )""",
+                    (overflow,)
+                ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Evicted {removed} cached analyses")
+        return removed
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return {
+            'entries': count,
+            'hits': self._hits,
+            'misses': self._misses
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
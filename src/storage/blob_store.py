@@ -0,0 +1,142 @@
+# src/storage/blob_store.py
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+def git_blob_sha(content: str) -> str:
+    """Compute the git blob SHA-1 of a text file's content."""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+class BlobStore:
+    """Content-addressed store of file contents keyed by git blob SHA.
+
+    A blob never changes for a given SHA, so a file that is identical across
+    commits is downloaded once. Metrics computed from a blob are memoized next
+    to it, keyed by the metrics version. Eviction keeps the total stored size
+    under max_bytes, least recently used first.
+    """
+
+    EVICTION_INTERVAL = 100  # run eviction every N writes
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS blobs (
+                sha TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS blob_metrics (
+                sha TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (sha, version)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_accessed ON blobs (accessed_at)")
+        self._conn.commit()
+
+    def get(self, sha: str) -> Optional[str]:
+        """Return the content of a blob, or None if it is not stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM blobs WHERE sha = ?", (sha,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE blobs SET accessed_at = ? WHERE sha = ?", (time.time(), sha)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, sha: str, content: str) -> None:
+        """Store the content of a blob."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (sha, content, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (sha, content, len(content), time.time())
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICTION_INTERVAL == 0
+        if should_evict:
+            self.evict()
+
+    def get_metrics(self, sha: str, version: str) -> Optional[Dict]:
+        """Return memoized metrics for a blob."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM blob_metrics WHERE sha = ? AND version = ?",
+                (sha, version)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_metrics(self, sha: str, version: str, metrics: Dict) -> None:
+        """Memoize metrics computed from a blob."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blob_metrics (sha, version, payload) VALUES (?, ?, ?)",
+                (sha, version, json.dumps(metrics))
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drop least recently used blobs until the store fits in max_bytes."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            removed = 0
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT sha, size FROM blobs ORDER BY accessed_at ASC"
+                ).fetchall()
+                doomed = []
+                for sha, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((sha,))
+                    total -= size
+                self._conn.executemany("DELETE FROM blobs WHERE sha = ?", doomed)
+                self._conn.executemany("DELETE FROM blob_metrics WHERE sha = ?", doomed)
+                self._conn.commit()
+                removed = len(doomed)
+        if removed:
+            logger.info(f"Evicted {removed} cached blobs")
+        return removed
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the stored size."""
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        return {'blobs': count, 'bytes': size, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
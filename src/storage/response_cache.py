@@ -0,0 +1,138 @@
+# src/storage/response_cache.py
+from dataclasses import dataclass
+from typing import Optional, Dict
+import os
+import sqlite3
+import threading
+import time
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class CachedResponse:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+class ResponseCache:
+    """SQLite-backed HTTP response cache for conditional requests.
+
+    Bodies are stored with their ETag/Last-Modified validators so callers can
+    revalidate with If-None-Match/If-Modified-Since and reuse the body on a
+    304. Counters distinguish fresh hits, successful revalidations and misses.
+    """
+
+    EVICTION_INTERVAL = 200  # run eviction every N writes
+
+    def __init__(self, path: str, max_entries: int = 20000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                validated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_validated ON responses (validated_at)"
+        )
+        self._conn.commit()
+
+    def get(self, cache_key: str) -> Optional[CachedResponse]:
+        """Return the stored response for a key, fresh or stale."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def put(
+        self,
+        cache_key: str,
+        body: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        max_age: float = 0
+    ) -> None:
+        """Store a response body together with its validators."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO responses
+                   (cache_key, body, etag, last_modified, expires_at, validated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (cache_key, body, etag, last_modified, now + max_age, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICTION_INTERVAL == 0
+        if should_evict:
+            self.evict()
+
+    def refresh(self, cache_key: str, max_age: float = 0) -> None:
+        """Mark an entry as revalidated after a 304 response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, validated_at = ? WHERE cache_key = ?",
+                (now + max_age, now, cache_key)
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Trim the cache to max_entries, dropping least recently validated first."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            overflow = count - self.max_entries
+            removed = 0
+            if overflow > 0:
+                removed = self._conn.execute(
+                    """DELETE FROM responses WHERE cache_key IN (
+                           SELECT cache_key FROM responses
+                           ORDER BY validated_at ASC LIMIT ?
+                       )""",
+                    (overflow,)
+                ).rowcount
+                self._conn.commit()
+        if removed:
+            logger.info(f"Evicted {removed} cached responses")
+        return removed
+
+    def stats(self) -> Dict:
+        """Return hit/revalidate/miss counters."""
+        total = self.hits + self.revalidated + self.misses
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.revalidated) / total if total else 0.0
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,148 @@
+# src/storage/trend_store.py
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Optional
+import os
+import threading
+import numpy as np
+from ..models.analysis_result import AnalysisResult
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+MAGIC = b'SHKTRND1'
+
+# Metrics columns, as named in MetricsCalculator results
+METRIC_FIELDS = (
+    'avg_complexity',
+    'maintainability_index',
+    'duplication_percentage',
+    'complexity_delta',
+    'halstead_volume'
+)
+
+RECORD = np.dtype(
+    [
+        ('commit_sha', 'S40'),
+        ('committed_at', '<f8'),
+        ('analyzed_at', '<f8'),
+        ('quality_score', '<f4'),
+        ('total_lines', '<i4'),
+    ]
+    + [(name, '<f4') for name in METRIC_FIELDS]
+)
+
+class TrendStore:
+    """Append-only per-commit score and metric series in a fixed-width record file.
+
+    Each finished analysis appends one record. Readers map the file into a
+    numpy record array and only parse bytes appended since their last read,
+    so the pandas frame stays current without rescanning history. Frames
+    are sorted by commit date and deduplicated by SHA (latest analysis
+    wins), so date ranges are cheap sorted slices.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = np.empty(0, dtype=RECORD)
+        self._offset = len(MAGIC)
+        self._frame: Optional['pd.DataFrame'] = None
+        self.revision = 0
+        self._ensure_header()
+
+    def _ensure_header(self) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= len(MAGIC):
+            with open(self.path, 'rb') as f:
+                valid = f.read(len(MAGIC)) == MAGIC
+            if valid:
+                self._drop_torn_record()
+                return
+            # Written with another record layout; the series is rebuilt as analyses finish
+            os.replace(self.path, self.path + '.old')
+            logger.warning(f"Trend store {self.path} had an unknown format, starting a new one")
+        with open(self.path, 'wb') as f:
+            f.write(MAGIC)
+
+    def _drop_torn_record(self) -> None:
+        """Cut a partial record left by a crash mid-write, so later appends stay aligned."""
+        size = os.path.getsize(self.path)
+        aligned = len(MAGIC) + (size - len(MAGIC)) // RECORD.itemsize * RECORD.itemsize
+        if aligned != size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(aligned)
+            logger.warning(f"Dropped {size - aligned} bytes of a partial record from {self.path}")
+
+    def append(self, result: AnalysisResult) -> None:
+        """Record a finished analysis; results without a commit date are skipped."""
+        if result.committed_at is None:
+            return
+        record = np.zeros(1, dtype=RECORD)
+        record['commit_sha'] = result.commit_sha.encode('ascii')
+        record['committed_at'] = result.committed_at.timestamp()
+        record['analyzed_at'] = result.analyzed_at.timestamp()
+        record['quality_score'] = result.quality_score
+        record['total_lines'] = result.metrics.get('total_lines', 0)
+        for name in METRIC_FIELDS:
+            record[name] = result.metrics.get(name, np.nan)
+        with self._lock:
+            # A single write in append mode, so concurrent writers do not interleave records
+            with open(self.path, 'ab') as f:
+                f.write(record.tobytes())
+
+    def _refresh(self) -> None:
+        """Read records appended since the last call."""
+        size = os.path.getsize(self.path)
+        complete = (size - self._offset) // RECORD.itemsize
+        if complete <= 0:
+            return
+        new = np.fromfile(self.path, dtype=RECORD, count=complete, offset=self._offset)
+        self._offset += complete * RECORD.itemsize
+        self._records = np.concatenate([self._records, new])
+        self._frame = None
+        self.revision += 1
+
+    def contains(self, commit_sha: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return bool(np.any(self._records['commit_sha'] == commit_sha.encode('ascii')))
+
+    def frame(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> 'pd.DataFrame':
+        """Series for commits dated within [start, end], oldest first."""
+        with self._lock:
+            self._refresh()
+            if self._frame is None:
+                self._frame = self._build_frame(self._records)
+            frame = self._frame
+        dates = frame['committed_at'].values
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(_naive_utc(start), 'ns'), 'left')
+        hi = len(frame) if end is None else np.searchsorted(dates, np.datetime64(_naive_utc(end), 'ns'), 'right')
+        return frame.iloc[lo:hi]
+
+    @staticmethod
+    def _build_frame(records: np.ndarray) -> 'pd.DataFrame':
+        # pandas is only needed once a chart is drawn
+        import pandas as pd
+        frame = pd.DataFrame(records)
+        frame['commit_sha'] = frame['commit_sha'].str.decode('ascii')
+        frame['committed_at'] = pd.to_datetime(frame['committed_at'], unit='s')
+        frame['analyzed_at'] = pd.to_datetime(frame['analyzed_at'], unit='s')
+        # Records are in append order, so the last one per commit is the newest analysis
+        frame = frame.drop_duplicates('commit_sha', keep='last')
+        return frame.sort_values('committed_at', kind='stable').reset_index(drop=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {'records': len(self._records), 'bytes': self._offset}
+
+def _naive_utc(value: datetime) -> datetime:
+    """Dates in the frame are naive UTC, as produced from epoch seconds."""
+    if value.tzinfo is None:
+        return value
+    return datetime.fromtimestamp(value.timestamp(), timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,14 @@
+# src/testing/__init__.py
+"""
+Local stand-in servers and fixtures for development and benchmarking.
+"""
+from .openai_stub import create_openai_stub_app
+from .github_stub import create_github_stub_app
+from .synthetic import SyntheticChange, make_change
+
+__all__ = [
+    'create_openai_stub_app',
+    'create_github_stub_app',
+    'SyntheticChange',
+    'make_change'
+]
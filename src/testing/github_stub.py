@@ -0,0 +1,200 @@
+# src/testing/github_stub.py
+"""
+GitHub REST stand-in serving synthetic commits, with configurable latency.
+
+Run it with ``python -m src.testing.github_stub --port 8088 --latency 0.05``
+and set ``GITHUB_API_URL=http://localhost:8088`` and
+``GITHUB_COMMITS_BACKEND=rest`` to point the services at it. Any 40-character
+SHA is a valid commit: its files are generated from the SHA by
+``src.testing.synthetic`` inside the recorded commit payload in
+``fixtures/github_commit.json``, and the contents and blob endpoints serve the
+matching file versions. ``GET /stats`` reports request counts per route.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import base64
+import copy
+import hashlib
+import json
+import os
+from aiohttp import web
+from ..storage.blob_store import git_blob_sha
+from .synthetic import LANGUAGES, make_change
+
+COMMIT_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'github_commit.json')
+
+# Number of commits on the stub's default branch
+HISTORY_LENGTH = 1000
+
+def history_sha(index: int) -> str:
+    """SHA of the index-th commit of the stub's history, newest first."""
+    return hashlib.sha1(f"stub-commit-{index}".encode('utf-8')).hexdigest()
+
+class SyntheticRepository:
+    """Commits, file versions and blobs generated on demand from commit SHAs."""
+
+    def __init__(self, files_per_commit: int = 4, lines_per_file: int = 200):
+        self.files_per_commit = files_per_commit
+        self.lines_per_file = lines_per_file
+        with open(COMMIT_FIXTURE, encoding='utf-8') as f:
+            self.template = json.load(f)
+        self.commits: Dict[str, Dict] = {}
+        self.blobs: Dict[str, str] = {}
+        # (path, ref) -> (blob SHA, content) of files at a commit's parent
+        self.contents: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    def commit(self, sha: str) -> Dict:
+        if sha not in self.commits:
+            self.commits[sha] = self._generate(sha)
+        return self.commits[sha]
+
+    def _generate(self, sha: str) -> Dict:
+        seed = int(sha[:8], 16)
+        parent = hashlib.sha1(f"parent-of-{sha}".encode('utf-8')).hexdigest()
+        payload = copy.deepcopy(self.template)
+        files = []
+        for index in range(self.files_per_commit):
+            language = LANGUAGES[(seed + index) % len(LANGUAGES)]
+            change = make_change(language, self.lines_per_file, seed=seed % 10007 + index)
+            blob_after = git_blob_sha(change.after)
+            blob_before = git_blob_sha(change.before)
+            self.blobs[blob_after] = change.after
+            self.blobs[blob_before] = change.before
+            self.contents[(change.filename, parent)] = (blob_before, change.before)
+            self.contents[(change.filename, sha)] = (blob_after, change.after)
+            file = dict(payload['files'][0])
+            file.update(
+                sha=blob_after,
+                filename=change.filename,
+                status='modified',
+                additions=change.additions,
+                deletions=change.deletions,
+                changes=change.additions + change.deletions,
+                patch=change.patch
+            )
+            files.append(file)
+
+        date = datetime(2024, 1, 1) + timedelta(minutes=seed % 500000)
+        payload['sha'] = sha
+        payload['commit']['message'] = f"Synthetic commit {sha[:7]}"
+        for role in ('author', 'committer'):
+            payload['commit'][role]['date'] = date.strftime('%Y-%m-%dT%H:%M:%SZ')
+        payload['parents'] = [{'sha': parent}]
+        payload['files'] = files
+        additions = sum(file['additions'] for file in files)
+        deletions = sum(file['deletions'] for file in files)
+        payload['stats'] = {'total': additions + deletions, 'additions': additions, 'deletions': deletions}
+        return payload
+
+def _encoded(sha: str, content: str, path: Optional[str] = None) -> Dict:
+    payload = {
+        'sha': sha,
+        'size': len(content.encode('utf-8')),
+        'encoding': 'base64',
+        'content': base64.b64encode(content.encode('utf-8')).decode('ascii')
+    }
+    if path is not None:
+        payload.update(type='file', path=path, name=os.path.basename(path))
+    return payload
+
+def create_github_stub_app(
+    latency: float = 0.05,
+    files_per_commit: int = 4,
+    lines_per_file: int = 200
+) -> web.Application:
+    """Create the stand-in application."""
+    app = web.Application()
+    repository = SyntheticRepository(files_per_commit, lines_per_file)
+    state: Dict = {'requests': 0, 'routes': {}}
+    app['state'] = state
+    app['repository'] = repository
+
+    def counted(route: str, handler):
+        async def wrapper(request: web.Request) -> web.Response:
+            state['requests'] += 1
+            state['routes'][route] = state['routes'].get(route, 0) + 1
+            await asyncio.sleep(latency)
+            return await handler(request)
+        return wrapper
+
+    def not_found() -> web.Response:
+        return web.json_response({'message': 'Not Found'}, status=404)
+
+    async def user(request: web.Request) -> web.Response:
+        return web.json_response({'login': 'stub-user', 'id': 1, 'type': 'User'})
+
+    async def repo(request: web.Request) -> web.Response:
+        owner, name = request.match_info['owner'], request.match_info['name']
+        return web.json_response({
+            'name': name,
+            'full_name': f"{owner}/{name}",
+            'default_branch': 'main',
+            'stargazers_count': 42,
+            'forks_count': 7,
+            'open_issues_count': 3,
+            'language': 'Python',
+            'created_at': '2023-01-01T00:00:00Z'
+        })
+
+    async def list_commits(request: web.Request) -> web.Response:
+        per_page = min(int(request.query.get('per_page', 30)), 100)
+        page = max(int(request.query.get('page', 1)), 1)
+        start = (page - 1) * per_page
+        listing: List[Dict] = [
+            {'sha': history_sha(index)}
+            for index in range(start, min(start + per_page, HISTORY_LENGTH))
+        ]
+        return web.json_response(listing)
+
+    async def get_commit(request: web.Request) -> web.Response:
+        sha = request.match_info['sha']
+        if len(sha) != 40:
+            return not_found()
+        return web.json_response(repository.commit(sha), headers={'ETag': f'"{sha}"'})
+
+    async def get_contents(request: web.Request) -> web.Response:
+        path = request.match_info['path']
+        ref = request.query.get('ref', '')
+        found = repository.contents.get((path, ref))
+        if found is None:
+            return not_found()
+        return web.json_response(_encoded(found[0], found[1], path))
+
+    async def get_blob(request: web.Request) -> web.Response:
+        sha = request.match_info['sha']
+        if sha not in repository.blobs:
+            return not_found()
+        return web.json_response(_encoded(sha, repository.blobs[sha]))
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(state)
+
+    prefix = '/repos/{owner}/{name}'
+    app.router.add_get('/user', counted('user', user))
+    app.router.add_get(prefix, counted('repo', repo))
+    app.router.add_get(prefix + '/commits', counted('commits', list_commits))
+    app.router.add_get(prefix + '/commits/{sha}', counted('commit', get_commit))
+    app.router.add_get(prefix + '/contents/{path:.+}', counted('contents', get_contents))
+    app.router.add_get(prefix + '/git/blobs/{sha}', counted('blob', get_blob))
+    app.router.add_get('/stats', stats)
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GitHub REST stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8088)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="seconds to wait before answering each request")
+    parser.add_argument('--files', type=int, default=4, help="changed files per commit")
+    parser.add_argument('--lines', type=int, default=200, help="lines per changed file")
+    args = parser.parse_args()
+    web.run_app(
+        create_github_stub_app(args.latency, args.files, args.lines),
+        host=args.host,
+        port=args.port
+    )
+
+if __name__ == "__main__":
+    main()
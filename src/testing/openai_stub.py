@@ -0,0 +1,217 @@
+# src/testing/openai_stub.py
+"""
+OpenAI-compatible stand-in server with configurable latency.
+
+Run it with ``python -m src.testing.openai_stub --port 8089 --latency 0.5``
+and set ``OPENAI_BASE_URL=http://localhost:8089/v1`` to route analyses to it.
+``GET /stats`` reports request counts and peak concurrency. Requests with
+``"stream": true`` are answered as server-sent events, with the first piece
+after a fifth of the latency and the rest spread over the remainder.
+
+The files and batches endpoints accept JSONL batch uploads; a batch answers
+every request line with the canned analysis and completes after
+``--batch-latency`` seconds.
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import time
+from aiohttp import web
+
+CANNED_ANALYSIS = {
+    "quality_score": 7.5,
+    "issues": [
+        {"type": "style", "severity": "low", "description": "Stub issue"}
+    ],
+    "security_concerns": [
+        {"level": "low", "description": "Stub concern"}
+    ],
+    "performance_impact": "minimal",
+    "recommendations": ["Stub recommendation"]
+}
+
+def _completion_payload(model: str, content: str, prompt_chars: int) -> Dict:
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-stub-{time.monotonic_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+# Characters of the canned analysis per streamed chunk
+STREAM_PIECE_CHARS = 24
+
+def _chunk_payload(model: str, created: int, delta: Dict, finish_reason=None) -> Dict:
+    return {
+        "id": f"chatcmpl-stub-{created}",
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+async def _stream_completion(request: web.Request, model: str, latency: float) -> web.StreamResponse:
+    """Send the canned analysis as server-sent events, a few characters at a time."""
+    content = json.dumps(CANNED_ANALYSIS)
+    pieces = [
+        content[i:i + STREAM_PIECE_CHARS] for i in range(0, len(content), STREAM_PIECE_CHARS)
+    ]
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+    await response.prepare(request)
+    created = int(time.time())
+    await asyncio.sleep(latency * 0.2)
+    for index, piece in enumerate(pieces):
+        delta = {"content": piece}
+        if index == 0:
+            delta["role"] = "assistant"
+        await response.write(f"data: {json.dumps(_chunk_payload(model, created, delta))}\n\n".encode())
+        await asyncio.sleep(latency * 0.8 / len(pieces))
+    final = _chunk_payload(model, created, {}, finish_reason="stop")
+    await response.write(f"data: {json.dumps(final)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+def _batch_output(lines: List[Dict]) -> str:
+    """Answer each batch request line with the canned analysis."""
+    output = []
+    for index, line in enumerate(lines):
+        body = line.get('body', {})
+        prompt_chars = sum(len(m.get('content') or '') for m in body.get('messages', []))
+        output.append(json.dumps({
+            "id": f"batch_req_{index}",
+            "custom_id": line['custom_id'],
+            "response": {
+                "status_code": 200,
+                "request_id": f"req_{index}",
+                "body": _completion_payload(
+                    body.get('model', 'stub'), json.dumps(CANNED_ANALYSIS), prompt_chars
+                )
+            },
+            "error": None
+        }))
+    return ''.join(line + '\n' for line in output)
+
+def create_openai_stub_app(latency: float = 0.5, batch_latency: float = 2.0) -> web.Application:
+    """Create the stand-in application."""
+    app = web.Application()
+    state = {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0, 'batches': 0}
+    app['state'] = state
+    files: Dict[str, str] = {}
+    batches: Dict[str, Dict] = {}
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        state['requests'] += 1
+        state['in_flight'] += 1
+        state['peak_in_flight'] = max(state['peak_in_flight'], state['in_flight'])
+        try:
+            if body.get('stream'):
+                return await _stream_completion(request, body.get('model', 'stub'), latency)
+            await asyncio.sleep(latency)
+            prompt_chars = sum(len(m.get('content') or '') for m in body.get('messages', []))
+            payload = _completion_payload(
+                body.get('model', 'stub'), json.dumps(CANNED_ANALYSIS), prompt_chars
+            )
+            return web.json_response(payload)
+        finally:
+            state['in_flight'] -= 1
+
+    async def upload_file(request: web.Request) -> web.Response:
+        form = await request.post()
+        file_id = f"file-stub-{len(files) + 1}"
+        files[file_id] = form['file'].file.read().decode('utf-8')
+        return web.json_response({
+            "id": file_id,
+            "object": "file",
+            "bytes": len(files[file_id]),
+            "purpose": form.get('purpose', 'batch')
+        })
+
+    async def file_content(request: web.Request) -> web.Response:
+        file_id = request.match_info['file_id']
+        if file_id not in files:
+            return web.json_response({"error": {"message": "No such file"}}, status=404)
+        return web.Response(text=files[file_id], content_type='application/jsonl')
+
+    async def run_batch(batch: Dict) -> None:
+        lines = [json.loads(line) for line in files[batch['input_file_id']].splitlines() if line.strip()]
+        batch['request_counts']['total'] = len(lines)
+        await asyncio.sleep(batch_latency * 0.1)
+        batch['status'] = 'in_progress'
+        await asyncio.sleep(batch_latency * 0.9)
+        output_id = f"file-stub-{len(files) + 1}"
+        files[output_id] = _batch_output(lines)
+        batch.update(status='completed', output_file_id=output_id, completed_at=int(time.time()))
+        batch['request_counts']['completed'] = len(lines)
+        state['requests'] += len(lines)
+
+    async def create_batch(request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get('input_file_id') not in files:
+            return web.json_response({"error": {"message": "No such file"}}, status=400)
+        state['batches'] += 1
+        batch = {
+            "id": f"batch_stub_{state['batches']}",
+            "object": "batch",
+            "endpoint": body.get('endpoint'),
+            "input_file_id": body['input_file_id'],
+            "completion_window": body.get('completion_window'),
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get('metadata') or {}
+        }
+        batches[batch['id']] = batch
+        batch['task'] = asyncio.create_task(run_batch(batch))
+        return web.json_response({k: v for k, v in batch.items() if k != 'task'})
+
+    async def get_batch(request: web.Request) -> web.Response:
+        batch = batches.get(request.match_info['batch_id'])
+        if batch is None:
+            return web.json_response({"error": {"message": "No such batch"}}, status=404)
+        return web.json_response({k: v for k, v in batch.items() if k != 'task'})
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(state)
+
+    app.router.add_post('/v1/chat/completions', chat_completions)
+    app.router.add_post('/v1/files', upload_file)
+    app.router.add_get('/v1/files/{file_id}/content', file_content)
+    app.router.add_post('/v1/batches', create_batch)
+    app.router.add_get('/v1/batches/{batch_id}', get_batch)
+    app.router.add_get('/stats', stats)
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5,
+                        help="seconds to wait before answering each completion")
+    parser.add_argument('--batch-latency', type=float, default=2.0,
+                        help="seconds a batch job takes to complete")
+    args = parser.parse_args()
+    web.run_app(
+        create_openai_stub_app(args.latency, args.batch_latency),
+        host=args.host,
+        port=args.port
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# src/testing/post_webhook.py
+"""
+Replay a recorded GitHub webhook delivery against a running dashboard.
+
+``python -m src.testing.post_webhook --secret s3cret`` signs the bundled push
+event like GitHub does and posts it to ``/webhooks/github``. Pass
+``--repository`` to make the payload match REPOSITORY_NAME, and ``--payload``
+to replay another recorded delivery.
+"""
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import argparse
+import json
+import os
+import uuid
+from ..api.webhooks import (
+    DELIVERY_HEADER,
+    EVENT_HEADER,
+    SIGNATURE_HEADER,
+    WEBHOOK_PATH,
+    sign_payload
+)
+
+PUSH_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'push_event.json')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Post a signed GitHub webhook delivery")
+    parser.add_argument('--url', default=f"http://127.0.0.1:8050{WEBHOOK_PATH}")
+    parser.add_argument('--secret', required=True, help="GITHUB_WEBHOOK_SECRET of the dashboard")
+    parser.add_argument('--payload', default=PUSH_FIXTURE)
+    parser.add_argument('--event', default='push')
+    parser.add_argument('--repository', help="owner/name to put in the payload")
+    args = parser.parse_args()
+
+    with open(args.payload, encoding='utf-8') as f:
+        payload = json.load(f)
+    if args.repository:
+        payload['repository']['full_name'] = args.repository
+    body = json.dumps(payload).encode('utf-8')
+
+    request = Request(args.url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        EVENT_HEADER: args.event,
+        DELIVERY_HEADER: str(uuid.uuid4()),
+        SIGNATURE_HEADER: sign_payload(args.secret, body)
+    })
+    try:
+        with urlopen(request) as response:
+            print(response.status, response.read().decode('utf-8'))
+    except HTTPError as e:
+        print(e.code, e.read().decode('utf-8'))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# src/testing/synthetic.py
+"""
+Deterministic synthetic source files and unified-diff patches.
+
+Files are built from per-language function templates with branches, loops,
+comments and string literals, so every metric has something to count, and
+every ``DUPLICATE_EVERY``-th function repeats an earlier body so duplication
+and clone detection see copies too. Patches cover the whole file in one
+hunk and are consistent with the generated pre- and post-images, so
+``reconstruct_pre_image`` and the metrics treat them like real GitHub patches.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Every n-th function body is a copy of the first one
+DUPLICATE_EVERY = 7
+
+# Every n-th line of the post-image replaces a line of the pre-image
+CHANGE_EVERY = 6
+
+TEMPLATES: Dict[str, str] = {
+    'python': '''def handler_{n}(items, limit={n}):
+    # Filter items over the limit
+    total = 0
+    for item in items:
+        if item.value > limit and not item.skip:
+            total += item.value
+        elif item.value == {n}:
+            raise ValueError("unexpected value {n}")
+    return total
+''',
+    'javascript': '''function handler{n}(items, limit = {n}) {{
+  // Filter items over the limit
+  let total = 0;
+  for (const item of items) {{
+    if (item.value > limit && !item.skip) {{
+      total += item.value;
+    }} else if (item.value === {n}) {{
+      throw new Error("unexpected value {n}");
+    }}
+  }}
+  return total;
+}}
+''',
+    'java': '''  public int handler{n}(List<Item> items, int limit) {{
+    // Filter items over the limit
+    int total = 0;
+    for (Item item : items) {{
+      if (item.value > limit && !item.skip) {{
+        total += item.value;
+      }} else if (item.value == {n}) {{
+        throw new IllegalStateException("unexpected value {n}");
+      }}
+    }}
+    return total;
+  }}
+''',
+    'go': '''func handler{n}(items []Item, limit int) (int, error) {{
+	// Filter items over the limit
+	total := 0
+	for _, item := range items {{
+		if item.Value > limit && !item.Skip {{
+			total += item.Value
+		}} else if item.Value == {n} {{
+			return 0, errors.New("unexpected value {n}")
+		}}
+	}}
+	return total, nil
+}}
+''',
+    'cpp': '''int handler{n}(const std::vector<Item>& items, int limit) {{
+  // Filter items over the limit
+  int total = 0;
+  for (const auto& item : items) {{
+    if (item.value > limit && !item.skip) {{
+      total += item.value;
+    }} else if (item.value == {n}) {{
+      throw std::runtime_error("unexpected value {n}");
+    }}
+  }}
+  return total;
+}}
+'''
+}
+
+EXTENSIONS = {
+    'python': '.py',
+    'javascript': '.js',
+    'java': '.java',
+    'go': '.go',
+    'cpp': '.cpp'
+}
+
+LANGUAGES = tuple(TEMPLATES)
+
+@dataclass
+class SyntheticChange:
+    filename: str
+    before: str
+    after: str
+    patch: str
+    additions: int
+    deletions: int
+
+    def as_change(self, with_contents: bool = False) -> Dict:
+        """The change dict GitHubService and FileContentResolver produce."""
+        change = {
+            'filename': self.filename,
+            'patch': self.patch,
+            'additions': self.additions,
+            'deletions': self.deletions,
+            'status': 'modified',
+            'sha': None,
+            'previous_filename': None
+        }
+        if with_contents:
+            change['content_before'] = self.before
+            change['content_after'] = self.after
+        return change
+
+def source_lines(language: str, lines: int, seed: int = 0) -> List[str]:
+    """About `lines` lines of source in the language, without line endings."""
+    template = TEMPLATES[language]
+    result: List[str] = []
+    index = 0
+    while len(result) < lines:
+        n = seed * 100003 + (0 if index % DUPLICATE_EVERY == DUPLICATE_EVERY - 1 else index)
+        result.extend(template.format(n=n).splitlines())
+        result.append('')
+        index += 1
+    return result[:lines]
+
+def make_change(language: str, lines: int, seed: int = 0, path: str = 'src') -> SyntheticChange:
+    """A modified file of `lines` lines and the patch from its previous version."""
+    after = source_lines(language, lines, seed)
+    before: List[str] = []
+    patch = [f"@@ -1,{len(after)} +1,{len(after)} @@"]
+    deletions = additions = 0
+    for number, line in enumerate(after):
+        if number % CHANGE_EVERY == CHANGE_EVERY - 1 and line.strip():
+            old = line.replace('total', 'subtotal', 1) if 'total' in line else line + ' '
+            before.append(old)
+            patch.append('-' + old)
+            patch.append('+' + line)
+            deletions += 1
+            additions += 1
+        else:
+            before.append(line)
+            patch.append(' ' + line)
+    return SyntheticChange(
+        filename=f"{path}/module_{seed}{EXTENSIONS[language]}",
+        before='\n'.join(before) + '\n',
+        after='\n'.join(after) + '\n',
+        patch='\n'.join(patch),
+        additions=additions,
+        deletions=deletions
+    )
@@ -2,14 +2,22 @@
 from dash import html
 from ...models.analysis_result import AnalysisResult
 
-def create_analysis_display(analysis: AnalysisResult) -> html.Div:
+def create_analysis_display(analysis: AnalysisResult, in_progress: bool = False) -> html.Div:
+    """Render an analysis; while in progress the score is pending and findings may grow."""
     return html.Div([
         html.H3("Analysis Results", className="mb-4"),
+        html.P(
+            "Analysis in progress, findings appear as they arrive...",
+            className="text-gray-600 mb-4"
+        ) if in_progress else None,
         
         # Quality Score
         html.Div([
             html.H4("Quality Score"),
             html.Div(
+                "Pending",
+                className="text-gray-500 font-bold text-xl"
+            ) if in_progress else html.Div(
                 f"{analysis.quality_score:.1f}/10",
                 className=_get_score_class(analysis.quality_score)
             )
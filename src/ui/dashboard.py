@@ -1,43 +1,302 @@
 # src/ui/dashboard.py
-from dash import Dash, html, dcc
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, TypeVar
+from dash import Dash, html, dcc, no_update
 from dash.dependencies import Input, Output, State
 from ..config.settings import Settings
-from ..api.github_service import GitHubService
-from ..api.openai_service import OpenAIService
-from ..analysis.code_analyzer import CodeAnalyzer
-from ..analysis.metrics_calculator import MetricsCalculator
+from ..api.webhooks import GitHubWebhookReceiver
+from ..analysis.job_queue import BACKGROUND, FAILED, INTERACTIVE
 from .components.commit_selector import create_commit_selector
 from .components.analysis_display import create_analysis_display
 from ..utils.logging import get_logger
-import plotly.graph_objects as go
+from ..utils.event_loop import BackgroundEventLoop
+from ..utils.startup_profile import get_startup_profile
+from ..utils.telemetry import Telemetry, get_telemetry, timed_callback
 from datetime import datetime, timedelta
-import pandas as pd
+import os
+import threading
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+    from ..api.github_service import GitHubService
+    from ..api.openai_service import OpenAIService
+    from ..analysis.code_analyzer import CodeAnalyzer
+    from ..analysis.job_queue import AnalysisJobQueue
+    from ..analysis.metrics_calculator import MetricsCalculator
+    from ..storage.analysis_store import AnalysisStore
+    from ..storage.blob_store import BlobStore
+    from ..storage.trend_store import TrendStore
 
 logger = get_logger(__name__)
 
+T = TypeVar('T')
+
+# Seconds a callback waits for a GitHub request on the background loop
+CALLBACK_TIMEOUT = 30.0
+
+# Longer trend series are drawn with WebGL and without markers
+TREND_WEBGL_POINTS = 1000
+
 class Dashboard:
-    def __init__(self, settings: Settings):
-        self.app = Dash(
-            __name__,
-            external_stylesheets=[
-                'https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css'
-            ]
-        )
+    """The Dash app and the services behind it.
+
+    Services are built on first use, so the layout can be served before
+    openai, PyGithub, pandas or the local stores are loaded. Right after
+    start-up they are warmed on the background loop, and the GitHub token is
+    checked there too: a slow or failing GitHub no longer blocks start-up,
+    it only shows up in the log and in the callbacks that need it.
+    """
+
+    def __init__(self, settings: Settings, warm_up: bool = True):
+        profile = get_startup_profile()
+        with profile.phase('dashboard.app'):
+            self.app = Dash(
+                __name__,
+                external_stylesheets=[
+                    'https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css'
+                ]
+            )
         self.settings = settings
         
-        # Initialize services
-        self.github_service = GitHubService(settings)
-        self.openai_service = OpenAIService(settings)
-        self.metrics_calculator = MetricsCalculator()
+        # Built on first access by _service(); a reentrant lock because
+        # factories read other services
+        self._services: Dict[str, Any] = {}
+        self._services_lock = threading.RLock()
+        
+        # Callbacks are sync; all service coroutines run on one long-lived loop so
+        # connection pools and caches are shared across requests
+        self.event_loop = BackgroundEventLoop('dashboard-async')
+        
+        # Pushed commits are analyzed before anyone opens them
+        self.webhook_receiver = GitHubWebhookReceiver(
+            settings.github_webhook_secret,
+            settings.repository_name,
+            lambda sha: self.jobs.submit(sha, priority=BACKGROUND)
+        ) if settings.github_webhook_secret else None
+        if self.webhook_receiver is not None:
+            self.webhook_receiver.register(self.app.server)
+        
+        if settings.telemetry_enabled:
+            telemetry = get_telemetry()
+            telemetry.add_collector(self._collect_telemetry)
+            telemetry.register(self.app.server)
+        
+        with profile.phase('dashboard.layout'):
+            self.setup_layout()
+            self.setup_callbacks()
+        
+        self.warm_up_future = self.event_loop.submit(self._warm_up()) if warm_up else None
+
+    def _service(self, name: str, factory: Callable[[], T]) -> T:
+        """Return the named service, building it once on first use."""
+        if name in self._services:
+            return self._services[name]
+        with self._services_lock:
+            if name not in self._services:
+                with get_startup_profile().phase(f"service.{name}"):
+                    self._services[name] = factory()
+            return self._services[name]
+
+    async def _warm_up(self) -> None:
+        """Build the services and check the GitHub token off the request path."""
+        loop = self.event_loop.loop
+        try:
+            # Construction is synchronous (imports, SQLite) and the job queue
+            # waits on this loop, so it runs in a worker thread
+            await loop.run_in_executor(None, lambda: self.jobs)
+        except Exception as e:
+            logger.error(f"Error initializing services: {str(e)}")
+            return
+        try:
+            with get_startup_profile().phase('github.validate_credentials'):
+                await self.github_service.validate_credentials()
+        except Exception as e:
+            # Callbacks report their own GitHub errors; start-up carries on
+            logger.error(f"GitHub credentials could not be verified: {str(e)}")
+
+    def _collect_telemetry(self, telemetry: Telemetry) -> None:
+        """Copy the counters services keep into gauges; services not built yet are skipped."""
+        services = dict(self._services)
+        lookups = telemetry.gauge(
+            'cache_lookups', "Cache lookups since start, by result", ['cache', 'result']
+        )
+        hit_ratio = telemetry.gauge(
+            'cache_hit_ratio', "Share of cache lookups served without recomputing", ['cache']
+        )
+        caches = {}
+        github_service = services.get('github_service')
+        if github_service is not None:
+            caches['github_responses'] = github_service.cache_stats()
+        for name in ('blob_store', 'analysis_store'):
+            if name in services:
+                caches[name] = services[name].stats()
+        for cache, stats in caches.items():
+            if not stats:
+                continue
+            # Only the HTTP response cache revalidates
+            counts = {result: stats[key] for result, key in (
+                ('hit', 'hits'), ('revalidated', 'revalidated'), ('miss', 'misses')
+            ) if key in stats}
+            for result, count in counts.items():
+                lookups.set(count, cache=cache, result=result)
+            total = sum(counts.values())
+            hit_ratio.set((total - counts.get('miss', 0)) / total if total else 0.0, cache=cache)
         
-        self.analyzer = CodeAnalyzer(
-            self.github_service,
-            self.openai_service,
-            self.metrics_calculator
+        flights = {}
+        if github_service is not None:
+            flights.update(github_service.coalescing_stats())
+        if 'analyzer' in services:
+            flights['analyses'] = services['analyzer'].coalescing_stats()
+        coalesced = telemetry.gauge(
+            'coalesced_calls', "Calls that shared an identical call in flight", ['flight']
         )
+        flight_in_flight = telemetry.gauge(
+            'single_flight_in_flight', "Distinct calls currently in flight", ['flight']
+        )
+        for name, stats in flights.items():
+            coalesced.set(stats['coalesced'], flight=name)
+            flight_in_flight.set(stats['in_flight'], flight=name)
         
-        self.setup_layout()
-        self.setup_callbacks()
+        if 'openai_service' in services:
+            openai_service = services['openai_service']
+            telemetry.gauge(
+                'llm_requests_in_flight', "Chat completions currently holding a concurrency slot"
+            ).set(openai_service.in_flight)
+            responses = telemetry.gauge(
+                'llm_responses', "Model responses since start, by how they parsed", ['result']
+            )
+            stats = openai_service.parse_stats.as_dict()
+            for result in ('clean', 'repaired', 'failed'):
+                responses.set(stats[result], result=result)
+        if 'jobs' in services:
+            jobs = telemetry.gauge('analysis_jobs', "Retained analysis jobs by status", ['status'])
+            for status, count in services['jobs'].stats().items():
+                jobs.set(count, status=status)
+        if 'trend_store' in services:
+            telemetry.gauge(
+                'trend_records', "Records in the quality trend store"
+            ).set(services['trend_store'].stats()['records'])
+        if github_service is not None:
+            tokens = telemetry.gauge(
+                'rate_limit_tokens', "Tokens left in each rate-limit bucket", ['bucket']
+            )
+            for bucket, budget in github_service.scheduler.budget().items():
+                tokens.set(budget['tokens'], bucket=bucket)
+        if self.webhook_receiver is not None:
+            deliveries = telemetry.gauge(
+                'webhook_deliveries', "Webhook deliveries since start, by result", ['result']
+            )
+            stats = self.webhook_receiver.stats()
+            deliveries.set(stats['deliveries'], result='accepted')
+            deliveries.set(stats['rejected'], result='rejected')
+
+    @property
+    def github_service(self) -> 'GitHubService':
+        def create():
+            from ..api.github_service import GitHubService
+            return GitHubService(self.settings)
+        return self._service('github_service', create)
+
+    @property
+    def openai_service(self) -> 'OpenAIService':
+        def create():
+            from ..api.openai_service import OpenAIService
+            return OpenAIService(self.settings)
+        return self._service('openai_service', create)
+
+    @property
+    def blob_store(self) -> 'BlobStore':
+        def create():
+            from ..storage.blob_store import BlobStore
+            return BlobStore(
+                os.path.join(self.settings.cache_dir, 'blobs.sqlite3'),
+                max_bytes=self.settings.blob_store_max_mb * 1024 * 1024
+            )
+        return self._service('blob_store', create)
+
+    @property
+    def metrics_calculator(self) -> 'MetricsCalculator':
+        def create():
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            from ..analysis.clone_index import CloneIndex
+            from ..analysis.metrics_calculator import MetricsCalculator
+            settings = self.settings
+            clone_index = CloneIndex(
+                os.path.join(settings.cache_dir, 'clones.sqlite3'),
+                min_block_lines=settings.clone_min_block_lines
+            ) if settings.clone_index_enabled else None
+            # Forking would copy the dashboard's threads and event loop into
+            # the workers; start them from a clean interpreter instead
+            start_method = (
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+                else 'spawn'
+            )
+            executor = ProcessPoolExecutor(
+                max_workers=settings.metrics_workers,
+                mp_context=multiprocessing.get_context(start_method)
+            ) if settings.metrics_workers > 0 else None
+            return MetricsCalculator(
+                clone_index=clone_index,
+                blob_store=self.blob_store,
+                executor=executor,
+                chunk_bytes=settings.metrics_chunk_kb * 1024
+            )
+        return self._service('metrics_calculator', create)
+
+    @property
+    def analysis_store(self) -> 'AnalysisStore':
+        def create():
+            from ..storage.analysis_store import AnalysisStore
+            return AnalysisStore(
+                os.path.join(self.settings.cache_dir, 'analyses.sqlite3'),
+                max_entries=self.settings.analysis_cache_max_entries,
+                max_age_seconds=self.settings.analysis_cache_max_age_days * 24 * 3600
+            )
+        return self._service('analysis_store', create)
+
+    @property
+    def trend_store(self) -> 'TrendStore':
+        def create():
+            from ..storage.trend_store import TrendStore
+            return TrendStore(os.path.join(self.settings.cache_dir, 'trends.bin'))
+        return self._service('trend_store', create)
+
+    @property
+    def analyzer(self) -> 'CodeAnalyzer':
+        def create():
+            from ..analysis.code_analyzer import CodeAnalyzer
+            from ..analysis.file_contents import FileContentResolver
+            from ..analysis.prompt_context import PromptContextBuilder
+            settings = self.settings
+            return CodeAnalyzer(
+                self.github_service,
+                self.openai_service,
+                self.metrics_calculator,
+                result_store=self.analysis_store,
+                content_resolver=FileContentResolver(
+                    self.github_service, self.blob_store
+                ) if settings.fetch_file_contents else None,
+                context_builder=PromptContextBuilder(
+                    context_lines=settings.prompt_context_lines,
+                    max_removed_lines=settings.prompt_max_removed_lines,
+                    max_unit_lines=settings.prompt_max_unit_lines
+                ) if settings.prompt_minimize_context else None,
+                trend_store=self.trend_store
+            )
+        return self._service('analyzer', create)
+
+    @property
+    def jobs(self) -> 'AnalysisJobQueue':
+        """Analyses run as jobs on the background loop; callbacks only poll them."""
+        def create():
+            from ..analysis.job_queue import AnalysisJobQueue
+            return AnalysisJobQueue(
+                self.analyzer,
+                self.event_loop.loop,
+                workers=self.settings.analysis_workers
+            )
+        return self._service('jobs', create)
 
     def setup_layout(self):
         """Setup the dashboard layout."""
@@ -80,20 +339,22 @@ class Dashboard:
                 
                 # Right panel - Analysis results
                 html.Div([
-                    dcc.Loading(
-                        id="loading-analysis",
-                        children=[
-                            html.Div(id='analysis-results')
-                        ],
-                        type="circle"
-                    )
+                    html.Div(id='analysis-results'),
+                    dcc.Store(id='analysis-job'),
+                    dcc.Interval(id='analysis-poll', interval=500, disabled=True)
                 ], className="w-2/3 p-4")
             ], className="flex"),
             
             # Trends and metrics
             html.Div([
                 html.H2("Code Quality Trends", className="text-xl mb-4"),
-                dcc.Graph(id='quality-trends')
+                dcc.DatePickerRange(id='trend-range', clearable=True, className="mb-4"),
+                html.P(id='trends-progress', className="text-gray-600"),
+                dcc.Graph(id='quality-trends'),
+                dcc.Store(id='trend-jobs'),
+                dcc.Store(id='trend-revision'),
+                # New analyses (including webhook-triggered ones) appear without a reload
+                dcc.Interval(id='trends-poll', interval=5000)
             ], className="mt-8 p-4"),
             
             # Footer
@@ -117,10 +378,13 @@ class Dashboard:
             Output('repo-stats', 'children'),
             Input('repo-stats', 'id')
         )
-        async def update_repo_stats(_):
+        @timed_callback('update_repo_stats')
+        def update_repo_stats(_):
             """Update repository statistics."""
             try:
-                stats = await self.github_service.get_repo_statistics()
+                stats = self.event_loop.run(
+                    self.github_service.get_repo_statistics(), timeout=CALLBACK_TIMEOUT
+                )
                 return html.Div([
                     html.Div([
                         html.Strong("Stars: "),
@@ -151,10 +415,13 @@ class Dashboard:
             Output('commit-selector', 'options'),
             Input('commit-selector', 'id')
         )
-        async def update_commit_list(_):
+        @timed_callback('update_commit_list')
+        def update_commit_list(_):
             """Update the list of commits."""
             try:
-                commits = await self.github_service.get_recent_commits()
+                commits = self.event_loop.run(
+                    self.github_service.get_recent_commits(), timeout=CALLBACK_TIMEOUT
+                )
                 return [
                     {'label': commit.summary, 'value': commit.sha}
                     for commit in commits
@@ -166,67 +433,125 @@ class Dashboard:
     def setup_analysis_callback(self):
         @self.app.callback(
             Output('analysis-results', 'children'),
+            Output('analysis-job', 'data'),
+            Output('analysis-poll', 'disabled'),
             Input('analyze-button', 'n_clicks'),
             State('commit-selector', 'value'),
             prevent_initial_call=True
         )
-        async def analyze_commit(n_clicks, commit_sha):
-            """Perform analysis when a commit is selected."""
+        @timed_callback('analyze_commit')
+        def analyze_commit(n_clicks, commit_sha):
+            """Queue a streamed analysis of the selected commit ahead of background work."""
             if not commit_sha:
-                return "Please select a commit to analyze"
+                return "Please select a commit to analyze", None, True
                 
-            try:
-                analysis = await self.analyzer.analyze_commit(commit_sha)
-                return create_analysis_display(analysis)
-            except Exception as e:
-                logger.error(f"Error analyzing commit: {str(e)}")
+            job_id = self.jobs.submit(commit_sha, priority=INTERACTIVE, stream=True)
+            return html.Div("Analyzing...", className="text-gray-600"), job_id, False
+
+        @self.app.callback(
+            Output('analysis-results', 'children', allow_duplicate=True),
+            Output('analysis-poll', 'disabled', allow_duplicate=True),
+            Input('analysis-poll', 'n_intervals'),
+            State('analysis-job', 'data'),
+            prevent_initial_call=True
+        )
+        @timed_callback('poll_analysis')
+        def poll_analysis(n_intervals, job_id):
+            """Render the job's progress and the findings received so far."""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return no_update, True
+            if job.status == FAILED:
                 return html.Div(
                     "Error performing analysis",
                     className="text-red-500"
-                )
+                ), True
+            if job.result is None:
+                return html.Div(f"{job.progress}...", className="text-gray-600"), False
+            return create_analysis_display(job.result, in_progress=not job.finished), job.finished
 
     def setup_trends_callback(self):
         @self.app.callback(
-            Output('quality-trends', 'figure'),
+            Output('trend-jobs', 'data'),
             Input('quality-trends', 'id')
         )
-        async def update_trends(_):
-            """Update quality trends graph."""
+        @timed_callback('start_trends')
+        def start_trends(_):
+            """Queue background analyses of recent commits so the trend store stays current."""
             try:
-                # Get recent commits and their analysis
-                commits = await self.github_service.get_recent_commits(20)
-                analyses = await self.analyzer.analyze_multiple_commits(
-                    [c.sha for c in commits]
-                )
-                
-                # Prepare data for visualization
-                dates = [c.date for c in commits]
-                scores = [a.quality_score for a in analyses]
-                
-                # Create trend line
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=scores,
-                    mode='lines+markers',
-                    name='Code Quality Score',
-                    line=dict(color='#3B82F6')
-                ))
-                
-                fig.update_layout(
-                    title='Code Quality Trend',
-                    xaxis_title='Date',
-                    yaxis_title='Quality Score',
-                    yaxis_range=[0, 10],
-                    template='plotly_white'
+                commits = self.event_loop.run(
+                    self.github_service.get_recent_commits(20), timeout=CALLBACK_TIMEOUT
                 )
+                # History only feeds the chart; the clone index tracks new pushes
+                return [
+                    self.jobs.submit(c.sha, priority=BACKGROUND, update_index=False)
+                    for c in commits
+                ]
+            except Exception as e:
+                logger.error(f"Error fetching commits for trends: {str(e)}")
+                return []
+
+        @self.app.callback(
+            Output('quality-trends', 'figure'),
+            Output('trends-progress', 'children'),
+            Output('trend-revision', 'data'),
+            Input('trends-poll', 'n_intervals'),
+            Input('trend-range', 'start_date'),
+            Input('trend-range', 'end_date'),
+            State('trend-jobs', 'data'),
+            State('trend-revision', 'data')
+        )
+        @timed_callback('update_trends')
+        def update_trends(n_intervals, start_date, end_date, trend_jobs, rendered):
+            """Draw the stored trend series for the selected date range."""
+            pending = sum(
+                1 for job in map(self.jobs.get, trend_jobs or [])
+                if job is not None and not job.finished
+            )
+            progress = f"Analyzing {pending} recent commits..." if pending else ""
+            try:
+                revision = [self.trend_store.stats()['records'], start_date, end_date]
+                if revision == rendered:
+                    return no_update, progress, no_update
                 
-                return fig
+                start = datetime.fromisoformat(start_date) if start_date else None
+                # The picker's end date is inclusive
+                end = datetime.fromisoformat(end_date) + timedelta(days=1) if end_date else None
+                series = self.trend_store.frame(start, end)
+                return self._trend_figure(series), progress, revision
                 
             except Exception as e:
                 logger.error(f"Error updating trends: {str(e)}")
-                return {}
+                return {}, progress, no_update
+
+    @staticmethod
+    def _trend_figure(series: 'pd.DataFrame') -> 'go.Figure':
+        import plotly.graph_objects as go
+        # WebGL keeps long series responsive
+        scatter = go.Scattergl if len(series) > TREND_WEBGL_POINTS else go.Scatter
+        fig = go.Figure()
+        
+        fig.add_trace(scatter(
+            x=series['committed_at'],
+            y=series['quality_score'],
+            customdata=series['commit_sha'].str.slice(0, 7),
+            hovertemplate='%{customdata}<br>%{x}<br>Score %{y:.1f}<extra></extra>',
+            mode='lines+markers' if len(series) <= TREND_WEBGL_POINTS else 'lines',
+            name='Code Quality Score',
+            line=dict(color='#3B82F6')
+        ))
+        
+        fig.update_layout(
+            title='Code Quality Trend',
+            xaxis_title='Date',
+            yaxis_title='Quality Score',
+            yaxis_range=[0, 10],
+            template='plotly_white',
+            # Keep the user's zoom when new points arrive
+            uirevision='quality-trends'
+        )
+        
+        return fig
 
     def run(self, debug: bool = False, port: int = 8050):
         """Run the dashboard server."""
@@ -4,5 +4,24 @@ Utility functions and helpers.
 """
 from .logging import get_logger
 from .retry import async_retry
+from .rate_limiter import RateLimitScheduler, TokenBucket, get_rate_limiter
+from .single_flight import SingleFlight
+from .event_loop import BackgroundEventLoop
+from .startup_profile import StartupProfile, get_startup_profile
+from .telemetry import Telemetry, get_telemetry, instrumented, timed_callback
 
-__all__ = ['get_logger', 'async_retry']
\ No newline at end of file
+__all__ = [
+    'get_logger',
+    'async_retry',
+    'RateLimitScheduler',
+    'TokenBucket',
+    'get_rate_limiter',
+    'SingleFlight',
+    'BackgroundEventLoop',
+    'StartupProfile',
+    'get_startup_profile',
+    'Telemetry',
+    'get_telemetry',
+    'instrumented',
+    'timed_callback'
+]
\ No newline at end of file
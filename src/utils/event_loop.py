@@ -0,0 +1,56 @@
+# src/utils/event_loop.py
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Optional, TypeVar
+import asyncio
+import threading
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+class BackgroundEventLoop:
+    """A long-lived event loop on a daemon thread, for calling async code from sync code.
+
+    Dash runs callbacks in plain request threads. Running their coroutines
+    here instead of in a fresh asyncio.run() per request keeps aiohttp and
+    httpx connection pools, single-flight tasks and rate-limit state alive
+    across requests, and avoids creating and closing a loop every time.
+    """
+
+    def __init__(self, name: str = 'async-bridge'):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[T]) -> 'Future[T]':
+        """Schedule a coroutine on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block the calling thread for its result."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run() would deadlock when called from the loop's own thread")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def call_soon(self, callback: Any, *args: Any) -> None:
+        """Run a plain callback on the loop thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        if not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        logger.info(f"Event loop {self.name} stopped")
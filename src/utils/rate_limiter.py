@@ -0,0 +1,183 @@
+# src/utils/rate_limiter.py
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+import asyncio
+import re
+import threading
+import time
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations such as '20ms', '1s' or '6m0s' into seconds."""
+    parts = _DURATION_PART.findall(value or '')
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the Retry-After delay in seconds, if the server sent one."""
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Token bucket whose refill rate follows the server's reported budget.
+
+    Without server feedback it refills at the configured default rate. Once a
+    response reports the remaining budget and reset time, the rate becomes
+    remaining / seconds-until-reset, so requests are spread evenly over the
+    window instead of bursting into a 403/429.
+    """
+
+    def __init__(self, name: str, capacity: float, rate_per_second: float):
+        self.name = name
+        self.capacity = capacity
+        self.default_rate = rate_per_second
+        self.rate = rate_per_second
+        self.tokens = capacity
+        self.remaining: Optional[float] = None
+        self._updated_at = time.monotonic()
+        self._reset_at: Optional[float] = None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self._reset_at is not None and now >= self._reset_at:
+            # The server window rolled over; fall back to the default pace
+            self._reset_at = None
+            self.remaining = None
+            self.rate = self.default_rate
+            self.tokens = self.capacity
+        else:
+            elapsed = now - self._updated_at
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, cost: float = 1.0) -> float:
+        """Wait until cost tokens are available and take them; returns the time waited."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= min(cost, self.capacity):
+                    # Costs above capacity go into debt rather than waiting forever
+                    self.tokens -= cost
+                    return now - started
+                elif self.rate > 0:
+                    wait = (min(cost, self.capacity) - self.tokens) / self.rate
+                elif self._reset_at is not None:
+                    wait = self._reset_at - now
+                else:
+                    wait = 1.0
+            await asyncio.sleep(max(wait, 0.001))
+
+    def update(self, remaining: float, reset_in: Optional[float]) -> None:
+        """Align the bucket with the budget reported by the server."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.remaining = remaining
+            self.tokens = min(self.tokens, remaining)
+            if reset_in is None or reset_in <= 0:
+                return
+            self._reset_at = now + reset_in
+            self.rate = max(remaining, 0) / reset_in
+            if remaining <= 0:
+                self._paused_until = max(self._paused_until, self._reset_at)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limit on {self.name}: pausing for {seconds:.1f}s")
+
+    def budget(self) -> Dict:
+        """Return a snapshot of the bucket state."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'tokens': self.tokens,
+                'capacity': self.capacity,
+                'rate_per_second': self.rate,
+                'remaining': self.remaining,
+                'reset_in': max(0.0, self._reset_at - now) if self._reset_at else None,
+                'paused_for': max(0.0, self._paused_until - now)
+            }
+
+class RateLimitScheduler:
+    """Shared registry of token buckets for GitHub and OpenAI calls."""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name: str, capacity: float, rate_per_second: float) -> TokenBucket:
+        """Return the named bucket, creating it with the given limits if missing."""
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                bucket = TokenBucket(name, capacity, rate_per_second)
+                self._buckets[name] = bucket
+            return bucket
+
+    def bucket(self, name: str) -> TokenBucket:
+        # Unconfigured buckets only pace on what the server reports
+        return self.configure(name, capacity=100, rate_per_second=10)
+
+    async def acquire(self, name: str, cost: float = 1.0) -> float:
+        """Wait for capacity in the named bucket."""
+        return await self.bucket(name).acquire(cost)
+
+    def pause(self, name: str, seconds: float) -> None:
+        self.bucket(name).pause(seconds)
+
+    def update_from_github_headers(self, headers: Mapping[str, str]) -> None:
+        """Read X-RateLimit-Remaining/Reset from a GitHub response (lower-cased keys)."""
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = headers.get('x-ratelimit-reset')
+        if remaining is None or reset is None:
+            return
+        resource = headers.get('x-ratelimit-resource', 'core')
+        name = 'github' if resource == 'core' else f"github_{resource}"
+        self.bucket(name).update(float(remaining), float(reset) - time.time())
+
+    def update_from_openai_headers(self, headers: Mapping[str, str]) -> None:
+        """Read the requests and tokens per minute budget from an OpenAI response."""
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            reset_in = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ''))
+            self.bucket(f"openai_{kind}").update(float(remaining), reset_in)
+
+    def budget(self) -> Dict[str, Dict]:
+        """Return the current state of every bucket."""
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {bucket.name: bucket.budget() for bucket in buckets}
+
+_shared_scheduler: Optional[RateLimitScheduler] = None
+
+def get_rate_limiter() -> RateLimitScheduler:
+    """Return the process-wide scheduler shared by all services."""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = RateLimitScheduler()
+    return _shared_scheduler
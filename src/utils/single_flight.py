@@ -0,0 +1,68 @@
+# src/utils/single_flight.py
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+import asyncio
+import threading
+
+T = TypeVar('T')
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task and get its result or exception.
+    Nothing is cached once the task finishes. A caller that is cancelled
+    does not cancel the shared task. Calls are only shared within one event
+    loop, since tasks cannot be awaited from another.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executed = 0
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def coalesced(self) -> int:
+        """Calls that joined another call instead of doing the work."""
+        return self.calls - self.executed
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return fn()'s result, sharing a call already in flight for the key."""
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> 'asyncio.Task[T]':
+        """Return the task in flight for the key, starting fn() if there is none.
+
+        Must be called on the running loop. The task is shared, so callers
+        wait on it without cancelling it.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(flight_key)
+            if task is None:
+                self.executed += 1
+                task = loop.create_task(fn())
+                self._tasks[flight_key] = task
+                task.add_done_callback(lambda done: self._finish(flight_key, done))
+        return task
+
+    def _finish(self, flight_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(flight_key) is task:
+                del self._tasks[flight_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._tasks)
+        return {
+            'calls': self.calls,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': in_flight
+        }
@@ -0,0 +1,71 @@
+# src/utils/startup_profile.py
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+import threading
+import time
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class StartupPhase:
+    name: str
+    started: float  # seconds since the profile began
+    seconds: float
+    thread: str
+
+class StartupProfile:
+    """Wall-clock timings of imports and service construction since process start.
+
+    Phases may nest and may run on other threads (background warm-up), so
+    each is reported with its start offset and the thread it ran on rather
+    than as a share of a total.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._phases: List[StartupPhase] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, started)
+
+    def record(self, name: str, seconds: float, started: Optional[float] = None) -> None:
+        if started is None:
+            started = time.perf_counter() - seconds
+        phase = StartupPhase(name, started - self.origin, seconds, threading.current_thread().name)
+        with self._lock:
+            self._phases.append(phase)
+        logger.debug(f"Startup phase {name} took {seconds * 1000:.1f} ms")
+
+    @property
+    def phases(self) -> List[StartupPhase]:
+        with self._lock:
+            return sorted(self._phases, key=lambda phase: phase.started)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def report(self) -> str:
+        lines = [f"{'phase':<36} {'start ms':>9} {'took ms':>9}  thread"]
+        for phase in self.phases:
+            lines.append(
+                f"{phase.name:<36} {phase.started * 1000:>9.1f} {phase.seconds * 1000:>9.1f}  {phase.thread}"
+            )
+        lines.append(f"{'total':<36} {'':>9} {self.elapsed() * 1000:>9.1f}")
+        return '\n'.join(lines)
+
+_shared_profile: Optional[StartupProfile] = None
+
+def get_startup_profile() -> StartupProfile:
+    """Return the process-wide profile; its clock starts on first call."""
+    global _shared_profile
+    if _shared_profile is None:
+        _shared_profile = StartupProfile()
+    return _shared_profile
@@ -0,0 +1,291 @@
+# src/utils/telemetry.py
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import functools
+import inspect
+import math
+import threading
+import time
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+PREFIX = 'shekara_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+
+# Seconds; spans range from cache lookups to multi-chunk LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items: List[Tuple[LabelKey, Any]]) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in items]
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_items(self, items: List[Tuple[LabelKey, Any]]) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = self._labels(key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+class Telemetry:
+    """Process-wide registry of counters, gauges and histograms.
+
+    Analysis stages and service calls record into it as they run; state that
+    components already keep (cache counters, queue sizes) is copied into
+    gauges by collectors just before each scrape. render() produces the
+    Prometheus text format served at /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[['Telemetry'], None]] = []
+        self._lock = threading.Lock()
+
+        self.stage_seconds = self.histogram(
+            'analysis_stage_seconds', "Time spent in each stage of a commit analysis", ['stage']
+        )
+        self.stage_errors = self.counter(
+            'analysis_stage_errors_total', "Analysis stages that raised", ['stage']
+        )
+        self.service_call_seconds = self.histogram(
+            'service_call_seconds', "Duration of GitHub and OpenAI service calls",
+            ['service', 'operation', 'outcome']
+        )
+        self.service_calls_in_flight = self.gauge(
+            'service_calls_in_flight', "Service calls currently running", ['service', 'operation']
+        )
+        self.llm_tokens = self.counter(
+            'llm_tokens_total', "Tokens sent to and received from the model",
+            ['model', 'kind', 'source']
+        )
+        self.callback_seconds = self.histogram(
+            'dash_callback_seconds', "Duration of dashboard callbacks", ['callback']
+        )
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[['Telemetry'], None]) -> None:
+        """Call collector(telemetry) before every render to refresh gauges."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time one stage of an analysis."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.stage_errors.inc(stage=stage)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stage_seconds.observe(elapsed, stage=stage)
+            logger.debug(f"Stage {stage} took {elapsed * 1000:.1f} ms")
+
+    @contextmanager
+    def service_call(self, service: str, operation: str) -> Iterator[None]:
+        """Time one service call and count it as in flight while it runs."""
+        self.service_calls_in_flight.inc(service=service, operation=operation)
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except Exception:
+            outcome = 'error'
+            raise
+        except BaseException:
+            # Cancelled, or an abandoned stream
+            outcome = 'cancelled'
+            raise
+        finally:
+            self.service_calls_in_flight.dec(service=service, operation=operation)
+            self.service_call_seconds.observe(
+                time.perf_counter() - started, service=service, operation=operation, outcome=outcome
+            )
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                logger.warning(f"Telemetry collector failed: {str(e)}")
+        # Collectors may register gauges on first use
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def register(self, server) -> None:
+        """Serve render() at /metrics on the Flask server behind Dash."""
+        from flask import Response
+        server.add_url_rule(
+            METRICS_PATH, 'metrics', lambda: Response(self.render(), content_type=CONTENT_TYPE)
+        )
+        logger.info(f"Telemetry exposed at {METRICS_PATH}")
+
+def instrumented(service: str, operation: Optional[str] = None) -> Callable:
+    """Record each call of an async function or async generator as a service call."""
+    def decorate(fn: Callable) -> Callable:
+        name = operation or fn.__name__
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def stream_wrapper(*args, **kwargs):
+                with get_telemetry().service_call(service, name):
+                    async for item in fn(*args, **kwargs):
+                        yield item
+            return stream_wrapper
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with get_telemetry().service_call(service, name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def timed_callback(name: str) -> Callable:
+    """Record the duration of a synchronous dashboard callback."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                get_telemetry().callback_seconds.observe(time.perf_counter() - started, callback=name)
+        return wrapper
+    return decorate
+
+_shared_telemetry: Optional[Telemetry] = None
+
+def get_telemetry() -> Telemetry:
+    """Return the process-wide registry shared by all components."""
+    global _shared_telemetry
+    if _shared_telemetry is None:
+        _shared_telemetry = Telemetry()
+    return _shared_telemetry
@@ -0,0 +1,47 @@
+# tests/test_clone_index.py
+import pytest
+from src.analysis.clone_index import CloneIndex
+
+SHARED = '\n'.join(f'total_{i} = accumulate(values, {i})' for i in range(12))
+OTHER = '\n'.join(f'legacy_{i} = convert(items, {i})' for i in range(12))
+
+@pytest.fixture
+def index(tmp_path):
+    clone_index = CloneIndex(str(tmp_path / 'clones.sqlite3'))
+    yield clone_index
+    clone_index.close()
+
+def numbered(text):
+    return list(enumerate(text.split('\n'), start=1))
+
+def test_copy_in_another_file_is_found(index):
+    index.index_file('src/a.py', SHARED, committed_at=100.0)
+    matches = index.find_clones('src/b.py', numbered(SHARED), exclude_path='src/b.py')
+    assert [match.path for match in matches] == ['src/a.py']
+    # Winnowing keeps a subset of k-grams, so the match spans most of the copy
+    assert 1 <= matches[0].start_line and matches[0].end_line <= 12
+    assert matches[0].end_line - matches[0].start_line >= 6
+
+def test_older_commit_does_not_replace_newer_rows(index):
+    index.index_file('src/a.py', SHARED, committed_at=200.0)
+    assert index.index_file('src/a.py', OTHER, committed_at=100.0) == 0
+    assert index.find_clones('src/b.py', numbered(SHARED))
+    assert not index.find_clones('src/b.py', numbered(OTHER))
+
+def test_fragments_do_not_replace_whole_file_of_same_commit(index):
+    index.index_file('src/a.py', SHARED, committed_at=100.0)
+    assert index.index_segments('src/a.py', [numbered(OTHER)], committed_at=100.0) == 0
+    assert index.index_segments('src/a.py', [numbered(OTHER)], committed_at=150.0) > 0
+
+def test_removal_is_not_undone_by_history(index):
+    index.index_file('src/a.py', SHARED, committed_at=100.0)
+    index.remove_file('src/a.py', committed_at=300.0)
+    assert index.index_file('src/a.py', SHARED, committed_at=200.0) == 0
+    assert index.stats() == {'files': 0, 'fingerprints': 0}
+
+def test_lookup_spans_more_hashes_than_one_query_holds(index):
+    large = '\n'.join(f'row_{i} = transform(source, {i} * {i})' for i in range(3000))
+    index.index_file('src/a.py', large, committed_at=100.0)
+    matches = index.find_clones('src/b.py', numbered(large))
+    assert [match.path for match in matches] == ['src/a.py']
+    assert matches[0].end_line - matches[0].start_line > 2500
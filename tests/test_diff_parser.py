@@ -0,0 +1,33 @@
+# tests/test_diff_parser.py
+from src.analysis.diff_parser import parse_patch, reconstruct_pre_image
+
+BEFORE = 'import os\n\ndef main():\n    print("old")\n    return 0\n\nmain()'
+AFTER = 'import os\nimport sys\n\ndef main():\n    print("new")\n    return 0\n\nmain()'
+PATCH = (
+    '@@ -1,5 +1,6 @@\n'
+    ' import os\n'
+    '+import sys\n'
+    ' \n'
+    ' def main():\n'
+    '-    print("old")\n'
+    '+    print("new")\n'
+    '     return 0'
+)
+
+def test_parse_patch_line_numbers():
+    hunks = parse_patch(PATCH)
+    assert len(hunks) == 1
+    hunk = hunks[0]
+    assert (hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count) == (1, 5, 1, 6)
+    assert hunk.added_lines() == [(2, 'import sys'), (5, '    print("new")')]
+    assert hunk.new_end == 6
+
+def test_reconstruct_pre_image():
+    assert reconstruct_pre_image(AFTER, PATCH) == BEFORE
+
+def test_reconstruct_pure_deletion():
+    patch = '@@ -2,2 +1,0 @@\n-b\n-c'
+    assert reconstruct_pre_image('a\nd', patch) == 'a\nb\nc\nd'
+
+def test_mismatched_patch_is_rejected():
+    assert reconstruct_pre_image(AFTER.replace('import sys', 'import re'), PATCH) is None
@@ -0,0 +1,23 @@
+# tests/test_duplication.py
+import pytest
+from src.analysis.duplication import DuplicationDetector
+
+def test_repeated_block_is_found():
+    block = ['a = 1', 'b = 2', 'c = 3']
+    lines = block + ['x = 0'] + block
+    assert DuplicationDetector(min_block_lines=3).duplicated_lines(lines) == {0, 1, 2, 4, 5, 6}
+
+def test_whitespace_is_normalized():
+    detector = DuplicationDetector(min_block_lines=2)
+    assert detector.duplicated_lines(['a = 1', 'b = 2', '  a  =  1', 'b = 2 ']) == {0, 1, 2, 3}
+    strict = DuplicationDetector(min_block_lines=2, normalize_whitespace=False)
+    assert strict.duplicated_lines(['a = 1', 'b = 2', '  a  =  1', 'b = 2 ']) == set()
+
+def test_score_is_a_percentage():
+    detector = DuplicationDetector(min_block_lines=2)
+    assert detector.duplication_score('a\nb\na\nb') == 100
+    assert detector.duplication_score('a\nb\nc\nd') == 0
+
+def test_block_size_must_be_positive():
+    with pytest.raises(ValueError):
+        DuplicationDetector(min_block_lines=0)
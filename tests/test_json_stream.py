@@ -0,0 +1,37 @@
+# tests/test_json_stream.py
+from src.api.json_stream import IncrementalJSONParser
+
+RESPONSE = (
+    '```json\n{"quality_score": 7, "issues": [{"type": "bug", "description": "a, b"}], '
+    '"recommendations": ["one", "t\\"wo"], "performance_impact": "low"}\n```'
+)
+
+def feed_in_pieces(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+def test_events_arrive_per_item():
+    parser, events = feed_in_pieces(RESPONSE, 3)
+    assert events == [
+        ('quality_score', 7),
+        ('issues', {'type': 'bug', 'description': 'a, b'}),
+        ('recommendations', 'one'),
+        ('recommendations', 't"wo'),
+        ('performance_impact', 'low')
+    ]
+    assert parser.done
+
+def test_result_does_not_depend_on_chunking():
+    whole, _ = feed_in_pieces(RESPONSE, len(RESPONSE))
+    single, _ = feed_in_pieces(RESPONSE, 1)
+    assert whole.result == single.result
+    assert single.result['recommendations'] == ['one', 't"wo']
+
+def test_unfinished_item_is_not_reported():
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"recommendations": ["one", "tw')
+    assert events == [('recommendations', 'one')]
+    assert not parser.done
@@ -0,0 +1,71 @@
+# tests/test_metric_engine.py
+import pytest
+from src.analysis.metric_engine import function_spans, scan_file, scan_source
+
+# One function per language with two branches, a short-circuit operator and a comment
+SAMPLES = {
+    'sample.py': (
+        'def f(x):\n    # note\n    if x and x > 1:\n        return 1\n'
+        '    for i in range(x):\n        pass\n    return 0\n',
+        (1, 7)
+    ),
+    'sample.js': (
+        'function f(x) {\n  // note\n  if (x && x > 1) {\n    return 1;\n  }\n'
+        '  for (let i = 0; i < x; i++) {}\n  return 0;\n}\n',
+        (1, 8)
+    ),
+    'sample.ts': (
+        'function f(x: number): number {\n  // note\n  if (x && x > 1) {\n    return 1;\n  }\n'
+        '  for (let i = 0; i < x; i++) {}\n  return 0;\n}\n',
+        (1, 8)
+    ),
+    'Sample.java': (
+        'class A {\n  int f(int x) {\n    // note\n    if (x > 1 && x < 5) {\n      return 1;\n    }\n'
+        '    for (int i = 0; i < x; i++) {}\n    return 0;\n  }\n}\n',
+        (2, 9)
+    ),
+    'Sample.cs': (
+        'class A {\n  int F(int x) {\n    // note\n    if (x > 1 && x < 5) {\n      return 1;\n    }\n'
+        '    for (int i = 0; i < x; i++) {}\n    return 0;\n  }\n}\n',
+        (2, 9)
+    ),
+    'sample.cpp': (
+        'int f(int x) {\n  // note\n  if (x > 1 && x < 5) {\n    return 1;\n  }\n'
+        '  for (int i = 0; i < x; i++) {}\n  return 0;\n}\n',
+        (1, 8)
+    ),
+    'sample.go': (
+        'func f(x int) int {\n\t// note\n\tif x > 1 && x < 5 {\n\t\treturn 1\n\t}\n'
+        '\tfor i := 0; i < x; i++ {\n\t}\n\treturn 0\n}\n',
+        (1, 9)
+    ),
+}
+
+@pytest.mark.parametrize('filename', sorted(SAMPLES))
+def test_function_complexity(filename):
+    code, _ = SAMPLES[filename]
+    stats = scan_file(filename, code)
+    assert stats.complexity == 4
+    assert stats.function_complexities == [4]
+    assert stats.comment_lines == 1
+
+@pytest.mark.parametrize('filename', sorted(SAMPLES))
+def test_function_spans(filename):
+    code, span = SAMPLES[filename]
+    assert function_spans(filename, code) == [span]
+
+@pytest.mark.parametrize('filename, code', [
+    ('strings.py', 'x = "# not a comment"\ny = "if and or"\n'),
+    ('strings.js', 'const s = "// no";\nconst t = "if && ||";\n'),
+    ('strings.go', 'var s = "// no && if"\n'),
+])
+def test_strings_hide_comments_and_decisions(filename, code):
+    stats = scan_file(filename, code)
+    assert stats.comment_lines == 0
+    assert stats.decisions == 0
+
+def test_patch_scan_ignores_removed_lines():
+    patch = '@@ -1,2 +1,2 @@\n-if a:\n-    pass\n+x = 1\n+y = 2'
+    stats = scan_source(patch, is_patch=True)
+    assert stats.decisions == 0
+    assert stats.lines_of_code == 2
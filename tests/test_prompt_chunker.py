@@ -0,0 +1,56 @@
+# tests/test_prompt_chunker.py
+from src.api.prompt_chunker import estimate_tokens, merge_analyses, pack_changes, split_hunks
+
+def added_file(lines):
+    body = '\n'.join(f'+value_{i} = compute({i})' for i in range(lines))
+    return f'@@ -0,0 +1,{lines} @@\n{body}'
+
+def test_small_files_share_a_chunk():
+    changes = [{'filename': f'f{i}.py', 'patch': added_file(5)} for i in range(3)]
+    chunks = pack_changes(changes, 3000)
+    assert len(chunks) == 1
+    assert chunks[0].filenames == ['f0.py', 'f1.py', 'f2.py']
+
+def test_large_file_is_split_at_hunks():
+    patch = added_file(300) + '\n' + added_file(300).replace('-0,0 +1,', '-400,0 +401,')
+    assert len(split_hunks(patch)) == 2
+    chunks = pack_changes([{'filename': 'big.py', 'patch': patch}], 2500)
+    text = ''.join(chunk.text for chunk in chunks)
+    assert '(hunk 1 of 2)' in text and '(hunk 2 of 2)' in text
+
+def test_oversized_hunk_is_split_into_parts():
+    budget = 500
+    chunks = pack_changes([{'filename': 'new.py', 'patch': added_file(2000)}], budget)
+    assert len(chunks) > 1
+    assert all(chunk.tokens <= budget for chunk in chunks)
+    text = ''.join(chunk.text for chunk in chunks)
+    assert 'hunk 1 of 1, part 1 of' in text
+    assert 'truncated' not in text
+    # Every line of the diff reaches some chunk, in order
+    lines = [line for line in text.split('\n') if line.startswith('+value_')]
+    assert lines == [f'+value_{i} = compute({i})' for i in range(2000)]
+
+def test_only_an_overlong_line_is_truncated():
+    patch = '@@ -0,0 +1,2 @@\n+' + 'x' * 10000 + '\n+short = 1'
+    chunks = pack_changes([{'filename': 'long.py', 'patch': patch}], 300)
+    text = ''.join(chunk.text for chunk in chunks)
+    assert '(line truncated)' in text
+    assert '+short = 1' in text
+    assert all(chunk.tokens <= 300 for chunk in chunks)
+
+def test_merge_weights_scores_and_deduplicates():
+    issue = {'type': 'bug', 'severity': 'high', 'description': 'Off by one'}
+    merged = merge_analyses([
+        ({'quality_score': 8, 'issues': [issue], 'performance_impact': 'minimal',
+          'recommendations': ['Add tests']}, 300),
+        ({'quality_score': 4, 'issues': [issue], 'performance_impact': 'significant slowdown',
+          'recommendations': ['Add tests']}, 100)
+    ])
+    assert merged['quality_score'] == 7.0
+    assert merged['issues'] == [issue]
+    assert merged['recommendations'] == ['Add tests']
+    assert merged['performance_impact'] == 'significant slowdown'
+
+def test_estimate_tokens_grows_with_text():
+    assert estimate_tokens('') == 1
+    assert estimate_tokens('x' * 400) == 101
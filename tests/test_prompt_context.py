@@ -0,0 +1,126 @@
+# tests/test_prompt_context.py
+from src.analysis.prompt_context import PromptContextBuilder
+
+BEFORE = '\n'.join([
+    'import os',
+    'import sys',
+    '',
+    'def helper(a, b):',
+    '    return a + b',
+    '',
+    'def main():',
+    '    x = 1',
+    '    y = 2',
+    '    z = helper(x, y)',
+    '    print(z)',
+    '    return z',
+])
+AFTER = '\n'.join([
+    'import os',
+    '',
+    'def helper(a, b):',
+    '    return a + b',
+    '',
+    'def main():',
+    '    x = 1',
+    '    w = 5',
+    '    z = helper(x, w)',
+    '    print(z)',
+    '    return z',
+])
+PATCH = (
+    '@@ -1,2 +1 @@\n'
+    ' import os\n'
+    '-import sys\n'
+    '@@ -8,4 +7,4 @@ def main():\n'
+    '     x = 1\n'
+    '-    y = 2\n'
+    '-    z = helper(x, y)\n'
+    '+    w = 5\n'
+    '+    z = helper(x, w)\n'
+    '     print(z)'
+)
+
+def test_changed_function_is_sent_whole():
+    minimized = PromptContextBuilder().minimize_patch('app.py', PATCH, AFTER)
+    assert (
+        '@@ -7,6 +6,6 @@\n'
+        ' def main():\n'
+        '     x = 1\n'
+        '-    y = 2\n'
+        '-    z = helper(x, y)\n'
+        '+    w = 5\n'
+        '+    z = helper(x, w)\n'
+        '     print(z)\n'
+        '     return z'
+    ) in minimized
+    # Module-level changes keep the hunk-with-context form
+    assert minimized.startswith('@@ -1,2 +1,1 @@\n import os\n-import sys')
+
+def test_called_functions_are_referenced_by_signature():
+    minimized = PromptContextBuilder().minimize_patch('app.py', PATCH, AFTER)
+    assert minimized.endswith('Referenced definitions:\nline 3: def helper(a, b):')
+
+def test_long_function_falls_back_to_context_lines():
+    minimized = PromptContextBuilder(max_unit_lines=3).minimize_patch('app.py', PATCH, AFTER)
+    assert '@@ -8,4 +7,4 @@ def main():' in minimized
+    assert '    return z' not in minimized
+
+def test_without_contents_only_hunks_are_trimmed():
+    minimized = PromptContextBuilder().minimize_patch('app.py', PATCH, None)
+    assert 'def main():\n     x = 1' not in minimized
+    assert '+    w = 5' in minimized
+
+def test_build_reports_token_savings():
+    builder = PromptContextBuilder()
+    large = '\n'.join(f' line_{i} = {i}' for i in range(200))
+    patch = f'@@ -1,201 +1,201 @@\n{large}\n-old = 1\n+new = 1'
+    changes, stats = builder.build([{'filename': 'data.txt', 'patch': patch}])
+    assert stats.tokens_saved > 0
+    assert changes[0]['patch'].endswith('-old = 1\n+new = 1')
+
+def test_nested_function_is_sent_inside_its_outer_function():
+    after = '\n'.join([
+        'def outer():',
+        '    def inner():',
+        '        return 2',
+        '    x = inner()',
+        '    return x + 1',
+    ])
+    patch = (
+        '@@ -1,5 +1,5 @@\n'
+        ' def outer():\n'
+        '     def inner():\n'
+        '-        return 1\n'
+        '+        return 2\n'
+        '     x = inner()\n'
+        '-    return x\n'
+        '+    return x + 1'
+    )
+    minimized = PromptContextBuilder().minimize_patch('app.py', patch, after)
+    assert minimized == (
+        '@@ -1,5 +1,5 @@\n'
+        ' def outer():\n'
+        '     def inner():\n'
+        '-        return 1\n'
+        '+        return 2\n'
+        '     x = inner()\n'
+        '-    return x\n'
+        '+    return x + 1'
+    )
+
+def test_unit_larger_than_patch_falls_back_to_context_lines():
+    body = '\n'.join(f'    value_{i} = compute_something_long({i})' for i in range(40))
+    after = f'def build():\n{body}\n    return 1'
+    patch = (
+        '@@ -41,2 +41,2 @@ def build():\n'
+        '     value_39 = compute_something_long(39)\n'
+        '-    return 0\n'
+        '+    return 1'
+    )
+    builder = PromptContextBuilder()
+    minimized = builder.minimize_patch('app.py', patch, after)
+    assert 'value_0 = ' not in minimized
+    assert minimized.endswith('-    return 0\n+    return 1')
+    _, stats = builder.build([{'filename': 'app.py', 'patch': patch, 'content_after': after}])
+    assert stats.tokens_saved >= 0
@@ -0,0 +1,70 @@
+# tests/test_response_parser.py
+import pytest
+from src.api.response_parser import ResponseParser
+
+@pytest.fixture
+def parser():
+    return ResponseParser()
+
+def test_clean_response(parser):
+    analysis = parser.parse(
+        '{"quality_score": 8, "issues": [{"type": "style", "severity": "low", "description": "Long line"}], '
+        '"security_concerns": [], "performance_impact": "none", "recommendations": ["Split it"]}'
+    )
+    assert analysis.repairs == []
+    assert analysis.quality_score == 8.0
+    assert [issue.description for issue in analysis.issues] == ["Long line"]
+    assert analysis.recommendations == ["Split it"]
+    assert parser.stats.clean == 1
+
+def test_fenced_response_with_trailing_comma(parser):
+    analysis = parser.parse('Here you go:\n```json\n{"quality_score": 7, "recommendations": ["a",],}\n```')
+    assert analysis.quality_score == 7.0
+    assert analysis.recommendations == ["a"]
+    assert analysis.repairs == ['surrounding_text', 'trailing_commas']
+
+def test_truncated_string_item_is_dropped(parser):
+    analysis = parser.parse('{"quality_score": 6, "recommendations": ["one", "tw')
+    assert analysis.recommendations == ["one"]
+    assert analysis.repairs == ['truncated']
+
+def test_truncated_array_keeps_complete_items(parser):
+    analysis = parser.parse('{"quality_score": 6, "recommendations": ["one", "two"')
+    assert analysis.recommendations == ["one", "two"]
+
+def test_truncated_object_item_is_dropped(parser):
+    analysis = parser.parse(
+        '{"quality_score": 6, "issues": [{"type": "bug", "description": "kept"}, '
+        '{"type": "bug", "description": "partial", "severity": "hi'
+    )
+    assert [issue.description for issue in analysis.issues] == ["kept"]
+
+def test_truncated_top_level_value_is_dropped(parser):
+    analysis = parser.parse('{"quality_score": 6, "performance_impact": "hig')
+    assert analysis.quality_score == 6.0
+    assert analysis.performance_impact == 'unknown'
+
+@pytest.mark.parametrize('score', ['NaN', 'Infinity', '-Infinity'])
+def test_non_finite_score_is_rejected(parser, score):
+    assert parser.parse(f'{{"quality_score": {score}}}').quality_score is None
+
+def test_score_is_clamped_and_read_from_text(parser):
+    assert parser.parse('{"quality_score": 14}').quality_score == 10.0
+    assert parser.parse('{"quality_score": "7/10"}').quality_score == 7.0
+
+def test_alternative_field_names_and_unusable_items(parser):
+    analysis = parser.parse(
+        '{"issues": [{"category": "perf", "priority": "High priority", "message": "Slow loop"}, 42, {}], '
+        '"security_concerns": ["Hardcoded key"]}'
+    )
+    assert len(analysis.issues) == 1
+    issue = analysis.issues[0]
+    assert (issue.type, issue.severity, issue.description) == ('perf', 'high', 'Slow loop')
+    assert analysis.security_concerns[0].level == 'medium'
+    assert analysis.dropped_items == 2
+
+def test_unparseable_response(parser):
+    analysis = parser.parse('Sorry, I cannot help with that.')
+    assert analysis.repairs == ['unparseable']
+    assert analysis.issues == []
+    assert parser.stats.failed == 1